@@ -0,0 +1,47 @@
+# benchmarks/compare.py
+import argparse
+import json
+import sys
+
+THRESHOLD = 0.10  # Median slowdown (or speedup) beyond which a change is reported
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Rows for every (benchmark, scale) in both results files, with the median time ratio."""
+    old = {(r["name"], r["scale"]): r for r in baseline.get("results", []) if "median" in r}
+    rows = []
+    for result in current.get("results", []):
+        before = old.get((result["name"], result["scale"]))
+        if not before or "median" not in result:
+            continue
+        ratio = result["median"] / before["median"] if before["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({"name": result["name"], "scale": result["scale"], "before": before["median"],
+                     "after": result["median"], "ratio": ratio, "status": status})
+    return rows
+
+def print_comparison(rows):
+    icons = {"regression": "🔺", "improvement": "🟢", "unchanged": "  "}
+    print(f"\n{'benchmark':<24}{'scale':>6}{'before ms':>12}{'after ms':>12}{'ratio':>8}")
+    for row in rows:
+        print(f"{row['name']:<24}{row['scale']:>5}x{row['before'] * 1000:>12.1f}{row['after'] * 1000:>12.1f}"
+              f"{row['ratio']:>8.2f} {icons[row['status']]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files; exits 1 on a regression.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Relative median change to report (default 0.10)")
+    args = parser.parse_args()
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
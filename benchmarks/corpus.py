@@ -0,0 +1,342 @@
+# benchmarks/corpus.py
+import argparse
+import hashlib
+import json
+import os
+import random
+from processors.ioc_extractor import IOC_TYPES
+
+CORPUS_VERSION = 1  # Bump when the generated files change, so cached corpora are rebuilt
+
+# Sizes at scale 1, roughly those of the checked-in data/ files. Every count
+# is multiplied by the scale, so 10x and 100x keep the same shape.
+BASE_COUNTS = {
+    "rss": 250,
+    "github": 150,
+    "domain": 2500,
+    "md5": 500,
+    "sha": 550,
+    "url": 850,
+    "ip": 1350,
+    "c2": 950,
+    "osint": 40,
+    "bitcoin": 1150,
+    "queries": 1000,
+}
+SUMMARIZED_SHARE = 0.8   # Articles that already have a summary; the rest are pending
+SYNDICATED_SHARE = 0.05  # RSS articles re-published by a second outlet with small edits
+LISTED_SHARE = 0.5       # Planted indicators (and lookup queries) drawn from the feeds
+DEFANG_SHARE = 0.2
+
+FEED_FILES = {
+    "osint": "osint.txt",
+    "c2": "c2.txt",
+    "ip": "ip_blocklist.txt",
+    "domain": "domain_blocklist.txt",
+    "md5": "md5.txt",
+    "url": "url.txt",
+    "bitcoin": "bitcoin.txt",
+    "sha": "sha.txt",
+}
+
+RSS_SOURCES = (
+    "https://www.darkreading.com/rss.xml",
+    "https://feeds.feedburner.com/TheHackersNews",
+    "https://www.bleepingcomputer.com/feed/",
+    "https://blog.talosintelligence.com/rss/",
+    "https://unit42.paloaltonetworks.com/feed/",
+    "https://research.checkpoint.com/feed/",
+    "https://securelist.com/feed/",
+    "https://www.cisa.gov/news.xml",
+)
+TLDS = ("com", "net", "org", "info", "xyz", "top", "ru", "cn", "io", "biz", "online", "site")
+ACTORS = ("APT28", "Lazarus Group", "Sandworm", "FIN7", "Kimsuky", "Turla", "Scattered Spider", "Volt Typhoon")
+MALWARE = ("Emotet", "QakBot", "Cobalt Strike", "AsyncRAT", "LummaC2", "IcedID", "PlugX", "RedLine")
+SECTORS = ("healthcare", "energy", "finance", "government", "telecom", "manufacturing", "education")
+WORDS = (
+    "attackers", "campaign", "payload", "loader", "phishing", "exploit", "vulnerability", "patch",
+    "ransomware", "infrastructure", "server", "credentials", "researchers", "observed", "delivered",
+    "persistence", "lateral", "movement", "exfiltration", "encrypted", "victims", "malicious", "domain",
+    "backdoor", "dropper", "stealer", "botnet", "command", "control", "update", "advisory", "threat",
+    "actor", "windows", "linux", "firmware", "driver", "privilege", "escalation", "remote", "code",
+    "execution", "supply", "chain", "cloud", "tenant", "token", "session", "detection", "signature",
+)
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# ================== Indicators ===================
+def random_ip(rng):
+    return f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+def random_domain(rng):
+    labels = [f"{rng.choice(WORDS)}{rng.randint(0, 9999)}" for _ in range(rng.randint(1, 2))]
+    return ".".join(labels) + "." + rng.choice(TLDS)
+
+def random_hex(rng, chars):
+    return f"{rng.getrandbits(chars * 4):0{chars}x}"
+
+def random_url(rng):
+    host = random_ip(rng) + f":{rng.randint(1024, 65535)}" if rng.random() < 0.5 else random_domain(rng)
+    return f"http://{host}/{rng.choice(('i', 'bin.sh', 'mozi.m', 'update.exe', 'gate.php'))}"
+
+def random_btc(rng):
+    # Valid base58check P2PKH address, so the extractor accepts it
+    raw = b"\x00" + rng.getrandbits(160).to_bytes(20, "big")
+    raw += hashlib.sha256(hashlib.sha256(raw).digest()).digest()[:4]
+    num = int.from_bytes(raw, "big")
+    encoded = ""
+    while num:
+        num, rem = divmod(num, 58)
+        encoded = BASE58[rem] + encoded
+    return "1" + encoded
+
+def defang(value):
+    return value.replace("http://", "hxxp://").replace(".", "[.]")
+
+def make_feeds(rng, scale):
+    """{feed key: [indicator values]} for every data/*.txt feed."""
+    count = lambda key: BASE_COUNTS[key] * scale
+    feeds = {
+        "domain": [random_domain(rng) for _ in range(count("domain"))],
+        "md5": [random_hex(rng, 32) for _ in range(count("md5"))],
+        "sha": [random_hex(rng, 40 if rng.random() < 0.8 else 64) for _ in range(count("sha"))],
+        "url": [random_url(rng) for _ in range(count("url"))],
+        "ip": [random_ip(rng) for _ in range(count("ip"))],
+        "c2": [(random_ip(rng), random_domain(rng)) for _ in range(count("c2"))],
+        "osint": [random_ip(rng) for _ in range(count("osint"))],
+        "bitcoin": [random_btc(rng) for _ in range(count("bitcoin"))],
+    }
+    # Blocklists also carry CIDR blocks and ranges
+    for i in range(0, len(feeds["ip"]), 50):
+        feeds["ip"][i] = f"{random_ip(rng).rsplit('.', 1)[0]}.0/24"
+    return feeds
+
+def write_feeds(feeds, data_dir):
+    for key, name in FEED_FILES.items():
+        with open(os.path.join(data_dir, name), "w") as f:
+            if key == "c2":
+                f.write("#IP,Date of Detection,Host,Protocol,Beacon Config,Comment\n")
+                for ip, host in feeds[key]:
+                    f.write(f'{ip},19 November 2024 05:39 PM UTC,{host},https,"{host},/ku",Generated by Threatview[.]io\n')
+            else:
+                f.write("\n".join(feeds[key]) + "\n")
+
+def indicator_pool(feeds):
+    """{ioc type: [values listed in some feed]} to plant in articles and query."""
+    return {
+        "ipv4": feeds["ip"][1::50] + [ip for ip, _ in feeds["c2"]] + feeds["osint"],
+        "domain": feeds["domain"] + [host for _, host in feeds["c2"]],
+        "hash": feeds["md5"] + feeds["sha"],
+        "url": feeds["url"],
+        "btc": feeds["bitcoin"],
+    }
+
+FRESH = {
+    "ipv4": random_ip,
+    "domain": random_domain,
+    "hash": lambda rng: random_hex(rng, rng.choice((32, 40, 64))),
+    "url": random_url,
+    "btc": random_btc,
+}
+
+def pick_indicator(rng, pool):
+    ioc_type = rng.choice(tuple(FRESH))
+    if rng.random() < LISTED_SHARE and pool[ioc_type]:
+        return ioc_type, rng.choice(pool[ioc_type])
+    return ioc_type, FRESH[ioc_type](rng)
+
+# ================== Articles ===================
+def sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+def prose(rng, chars, pool, planted):
+    """Paragraphs of about `chars` characters with indicators sprinkled in; planted iocs are recorded."""
+    paragraphs, size = [], 0
+    while size < chars:
+        parts = []
+        for _ in range(rng.randint(2, 5)):
+            parts.append(sentence(rng))
+            if rng.random() < 0.3:
+                ioc_type, value = pick_indicator(rng, pool)
+                planted.setdefault(ioc_type, {})[value.lower() if ioc_type == "hash" else value] = None
+                parts.append(f"The {rng.choice(WORDS)} contacted {defang(value) if rng.random() < DEFANG_SHARE else value}.")
+        paragraphs.append(" ".join(parts))
+        size += len(paragraphs[-1])
+    return "\n\n".join(paragraphs)
+
+def content_size(rng):
+    # Most feed items are a one-line teaser; a few carry the full report
+    roll = rng.random()
+    if roll < 0.7:
+        return rng.randint(100, 400)
+    if roll < 0.95:
+        return rng.randint(1000, 8000)
+    return rng.randint(20000, 140000)
+
+def make_rss(rng, scale, pool):
+    """({url: article}, {url: planted iocs})"""
+    articles, planted = {}, {}
+    for i in range(BASE_COUNTS["rss"] * scale):
+        source = rng.choice(RSS_SOURCES)
+        host = source.split("/")[2]
+        url = f"https://{host}/news/{i}-{rng.choice(ACTORS).lower().replace(' ', '-')}-{rng.choice(WORDS)}/"
+        iocs = {}
+        articles[url] = {
+            "title": f"{rng.choice(ACTORS)} targets {rng.choice(SECTORS)} with {rng.choice(MALWARE)} ({i})",
+            "link": url,
+            "published": f"Thu, {rng.randint(1, 28):02d} Jul 2025 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00 GMT",
+            "content": prose(rng, content_size(rng), pool, iocs),
+            "source": source,
+        }
+        planted[url] = iocs
+
+    # The same story picked up by another outlet: tracking parameters and a reworded first sentence
+    for n, url in enumerate(rng.sample(sorted(articles), int(len(articles) * SYNDICATED_SHARE))):
+        original = articles[url]
+        copy_url = f"https://syndicated.example.com/story/{n}?utm_source=rss"
+        body = original["content"].split(". ", 1)
+        articles[copy_url] = dict(original, link=copy_url, source=rng.choice(RSS_SOURCES),
+                                  content=f"{sentence(rng)} {body[-1]}")
+        planted[copy_url] = planted[url]
+    return articles, planted
+
+def trail_file(rng, pool, iocs):
+    lines = [f"# Reference: https://{random_domain(rng)}/analysis", ""]
+    for _ in range(rng.randint(50, 1500)):
+        ioc_type = rng.choice(("domain", "ipv4"))
+        value = rng.choice(pool[ioc_type]) if rng.random() < LISTED_SHARE else FRESH[ioc_type](rng)
+        iocs.setdefault(ioc_type, {})[value] = None
+        lines.append(value)
+    return "\n".join(lines)
+
+def galaxy_file(rng, iocs):
+    values = []
+    for i in range(rng.randint(20, 300)):
+        name = f"{rng.choice(ACTORS)} {i}"
+        values.append({
+            "value": name,
+            "description": sentence(rng) + " " + sentence(rng),
+            "meta": {"synonyms": [f"{name} alias {n}" for n in range(rng.randint(0, 4))],
+                     "refs": [f"https://{random_domain(rng)}/report/{n}" for n in range(rng.randint(1, 3))]},
+            "uuid": f"{rng.getrandbits(128):032x}",
+        })
+    return json.dumps({"name": "Threat Actor", "type": "threat-actor", "uuid": f"{rng.getrandbits(128):032x}", "values": values}, indent=2)
+
+def yara_file(rng, pool, iocs):
+    rules = []
+    for i in range(rng.randint(3, 30)):
+        sha256 = random_hex(rng, 64)
+        domain = rng.choice(pool["domain"])
+        iocs.setdefault("hash", {})[sha256] = None
+        iocs.setdefault("domain", {})[domain] = None
+        rules.append(
+            f"rule {rng.choice(MALWARE).replace(' ', '_')}_{i} : {rng.choice(('apt', 'crime', 'loader'))}\n"
+            "{\n    meta:\n"
+            f'        description = "{sentence(rng)}"\n'
+            f'        hash = "{sha256}"\n'
+            "    strings:\n"
+            f'        $s1 = "{domain}" ascii wide\n'
+            f'        $s2 = "{rng.choice(WORDS)}.dll" ascii\n'
+            "    condition:\n        uint16(0) == 0x5a4d and any of them\n}"
+        )
+    return "\n\n".join(rules)
+
+def ioc_list_file(rng, pool, iocs):
+    lines = [f"{rng.choice(MALWARE)} IOCs", ""]
+    for _ in range(rng.randint(10, 400)):
+        ioc_type, value = pick_indicator(rng, pool)
+        iocs.setdefault(ioc_type, {})[value.lower() if ioc_type == "hash" else value] = None
+        lines.append(defang(value) if rng.random() < DEFANG_SHARE else value)
+    return "\n".join(lines)
+
+GITHUB_FILES = (
+    # (repo, branch, path template, generator)
+    ("stamparm/maltrail", "master", "trails/static/malware/{name}.txt", lambda rng, pool, iocs: trail_file(rng, pool, iocs)),
+    ("MISP/misp-galaxy", "main", "clusters/{name}.json", lambda rng, pool, iocs: galaxy_file(rng, iocs)),
+    ("Neo23x0/signature-base", "master", "yara/{name}.yar", yara_file),
+    ("executemalware/Malware-IOCs", "main", "2025-07-{name}.txt", ioc_list_file),
+    ("executemalware/Malware-IOCs", "main", "README-{name}.md", lambda rng, pool, iocs: prose(rng, rng.randint(500, 6000), pool, iocs)),
+)
+
+def make_github(rng, scale, pool):
+    """({url: article}, {url: planted iocs}) shaped like github_fetcher.sync_repo output."""
+    articles, planted = {}, {}
+    for i in range(BASE_COUNTS["github"] * scale):
+        repo, branch, template, generate = GITHUB_FILES[i % len(GITHUB_FILES)]
+        path = template.format(name=f"{rng.choice(MALWARE).lower().replace(' ', '_')}_{i}")
+        url = f"https://raw.githubusercontent.com/{repo}/{branch}/{path}"
+        iocs = {}
+        articles[url] = {
+            "title": os.path.basename(path),
+            "link": url,
+            "published": "2025-07-10T15:24:47Z",
+            "content": generate(rng, pool, iocs),
+            "source": f"github:{repo}",
+        }
+        planted[url] = iocs
+    return articles, planted
+
+def make_summaries(rng, articles, planted):
+    """Entries shaped like generate_summaries.build_entry for SUMMARIZED_SHARE of the articles."""
+    summaries = {}
+    for url, article in articles.items():
+        if rng.random() >= SUMMARIZED_SHARE:
+            continue
+        found = planted.get(url, {})
+        summaries[url] = {
+            "title": article["title"],
+            "link": url,
+            "summary": "\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(3, 4))),
+            "iocs": {ioc_type: list(found.get(ioc_type, {})) for ioc_type in IOC_TYPES},
+            "llm_meta": {
+                "model": "llama2",
+                "prompt_version": "v1.1",
+                "content_hash": hashlib.sha256(article["content"].encode("utf-8")).hexdigest(),
+                "generated_on": f"2025-07-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+            },
+        }
+    return summaries
+
+def make_queries(rng, pool, scale):
+    """Indicators to look up: half listed in a feed, half not."""
+    return [pick_indicator(rng, pool)[1] for _ in range(BASE_COUNTS["queries"] * scale)]
+
+def write_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def generate_corpus(out_dir, scale=1, seed=0):
+    """
+    Write a deterministic synthetic corpus to `out_dir`: data/raw_articles.json,
+    data/github_articles.json, data/summaries.json and the data/*.txt feeds, in
+    the layout the pipeline expects, plus queries.txt for the lookup
+    benchmarks. The same (scale, seed) always produces the same files.
+    """
+    rng = random.Random(f"{seed}:{scale}")
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    feeds = make_feeds(rng, scale)
+    write_feeds(feeds, data_dir)
+    pool = indicator_pool(feeds)
+
+    rss, rss_iocs = make_rss(rng, scale, pool)
+    github, github_iocs = make_github(rng, scale, pool)
+    write_json(rss, os.path.join(data_dir, "raw_articles.json"))
+    write_json(github, os.path.join(data_dir, "github_articles.json"))
+    write_json(make_summaries(rng, {**rss, **github}, {**rss_iocs, **github_iocs}), os.path.join(data_dir, "summaries.json"))
+
+    with open(os.path.join(out_dir, "queries.txt"), "w") as f:
+        f.write("\n".join(make_queries(rng, pool, scale)) + "\n")
+    write_json({"version": CORPUS_VERSION, "scale": scale, "seed": seed, "counts": {key: n * scale for key, n in BASE_COUNTS.items()}},
+               os.path.join(out_dir, "corpus.json"))
+    return out_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SentinelStream corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier on the checked-in data sizes (1, 10, 100)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.out_dir, args.scale, args.seed)
+    print(f"✅ Corpus at scale {args.scale}x written to {args.out_dir}")
@@ -0,0 +1,90 @@
+# benchmarks/ollama_stub.py
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_MODEL = "llama2"
+STREAM_CHUNKS = 4  # Streamed message pieces per reply, like a (very fast) model
+
+def stub_reply(messages):
+    """A deterministic 3-bullet "summary" derived from the prompt."""
+    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    words = user.split()
+    bullets = [f"- {' '.join(words[i * 12:(i + 1) * 12]) or 'No content.'}" for i in range(3)]
+    return "\n".join(bullets)
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0  # Seconds per /api/chat request, to emulate model time
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self.send_json(200, {"models": [{"name": f"{STUB_MODEL}:latest", "model": f"{STUB_MODEL}:latest"}]})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/chat":
+            self.send_json(404, {"error": "not found"})
+            return
+        if self.latency:
+            time.sleep(self.latency)
+
+        reply = stub_reply(payload.get("messages", []))
+        model = payload.get("model", STUB_MODEL)
+        if not payload.get("stream", True):
+            self.send_json(200, {"model": model, "message": {"role": "assistant", "content": reply}, "done": True})
+            return
+
+        # NDJSON stream, chunked like Ollama's
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        step = max(1, len(reply) // STREAM_CHUNKS + 1)
+        pieces = [reply[i:i + step] for i in range(0, len(reply), step)]
+        lines = [{"model": model, "message": {"role": "assistant", "content": piece}, "done": False} for piece in pieces]
+        lines.append({"model": model, "message": {"role": "assistant", "content": ""}, "done": True})
+        for line in lines:
+            data = json.dumps(line).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+def start_stub(host="127.0.0.1", port=0, latency=0.0, handler_class=StubHandler):
+    """
+    Serve the stub on a background thread. Returns (server, base URL);
+    stop it with server.shutdown(). Port 0 picks a free port; tests can pass
+    a StubHandler subclass to script slow or failing replies.
+    """
+    handler = type("Handler", (handler_class,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="ollama-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Ollama /api/chat endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request")
+    args = parser.parse_args()
+    server, url = start_stub(args.host, args.port, args.latency)
+    print(f"🧪 Ollama stub listening on {url} (set OLLAMA_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
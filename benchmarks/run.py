@@ -0,0 +1,184 @@
+# benchmarks/run.py
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Benchmarks run from a scratch directory, so the repo must be importable from anywhere
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.compare import compare, print_comparison
+from benchmarks.corpus import CORPUS_VERSION, generate_corpus
+from benchmarks.ollama_stub import start_stub
+from benchmarks.suite import BENCHMARKS, BenchContext
+
+RESULTS_FORMAT = 1
+CORPUS_DIR = os.path.join(REPO_ROOT, "benchmarks", ".corpus")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 3
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def ensure_corpus(scale, seed, corpus_root=CORPUS_DIR):
+    """Path of the corpus for (scale, seed), generated on first use and kept for later runs."""
+    path = os.path.join(corpus_root, f"{scale}x-seed{seed}")
+    try:
+        with open(os.path.join(path, "corpus.json"), "r") as f:
+            if json.load(f).get("version") == CORPUS_VERSION:
+                return path
+    except (OSError, json.JSONDecodeError):
+        pass
+    print(f"🧪 Generating {scale}x corpus (seed {seed})...")
+    shutil.rmtree(path, ignore_errors=True)
+    started = time.monotonic()
+    generate_corpus(path, scale, seed)
+    print(f"🧪 Corpus ready in {time.monotonic() - started:.1f}s")
+    return path
+
+@contextlib.contextmanager
+def workdir(corpus_dir):
+    """A scratch directory whose data/ links to the corpus files, made the cwd for the duration."""
+    path = tempfile.mkdtemp(prefix="sentinelstream-bench-")
+    os.makedirs(os.path.join(path, "data"))
+    for name in os.listdir(os.path.join(corpus_dir, "data")):
+        os.symlink(os.path.join(corpus_dir, "data", name), os.path.join(path, "data", name))
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def build_store(corpus_dir):
+    """Import the corpus into a SQLite store once; every repeat starts from a copy of it."""
+    from storage import article_store
+    with workdir(corpus_dir) as path, contextlib.redirect_stdout(io.StringIO()):
+        article_store.connect().close()
+        template = tempfile.NamedTemporaryFile(prefix="sentinelstream-bench-", suffix=".db", delete=False).name
+        shutil.copyfile(os.path.join(path, article_store.DB_PATH), template)
+    return template
+
+def reset_caches():
+    # Module-level caches keyed on relative paths must not leak between repeats
+    feed_lookup = sys.modules.get("processors.feed_lookup")
+    if feed_lookup:
+        feed_lookup._FEED_CACHE.clear()
+        feed_lookup._IP_INDEX_CACHE.update(signature=None, index=None)
+    ui = sys.modules.get("ui")
+    if ui:
+        ui._DATA_CACHE.clear()
+        ui._STORE.conn = None
+
+def missing_modules(requires):
+    return [name for name in requires if importlib.util.find_spec(name) is None]
+
+def run_benchmark(name, corpus_dir, template_db, shared, repeat, ollama_url):
+    setup, requires = BENCHMARKS[name]
+    missing = missing_modules(requires)
+    if missing:
+        return {"skipped": f"missing {', '.join(missing)}"}
+
+    times = []
+    for _ in range(repeat):
+        reset_caches()
+        with workdir(corpus_dir) as path, contextlib.redirect_stdout(io.StringIO()):
+            case = setup(BenchContext(corpus_dir, path, template_db, shared, ollama_url))
+            started = time.perf_counter()
+            case.run()
+            times.append(time.perf_counter() - started)
+
+    median = statistics.median(times)
+    result = {"items": case.items, "times": [round(t, 6) for t in times], "min": round(min(times), 6),
+              "median": round(median, 6), "items_per_sec": round(case.items / median, 1) if median else None}
+    if case.bytes is not None:
+        result["bytes"] = case.bytes
+        result["mb_per_sec"] = round(case.bytes / 1e6 / median, 2) if median else None
+    return result
+
+def run_suite(names, scales, repeat=DEFAULT_REPEAT, seed=0, corpus_root=CORPUS_DIR, ollama_latency=0.0):
+    server, ollama_url = start_stub(latency=ollama_latency)
+    results = []
+    try:
+        for scale in scales:
+            corpus_dir = ensure_corpus(scale, seed, corpus_root)
+            template_db = build_store(corpus_dir)
+            shared = {}
+            try:
+                for name in names:
+                    print(f"⏱️ {name} @ {scale}x...", end=" ", flush=True)
+                    result = {"name": name, "scale": scale,
+                              **run_benchmark(name, corpus_dir, template_db, shared, repeat, ollama_url)}
+                    print(f"⏭️ skipped ({result['skipped']})" if "skipped" in result
+                          else f"{result['median'] * 1000:.1f} ms ({result['items_per_sec']} items/s)")
+                    results.append(result)
+            finally:
+                os.remove(template_db)
+    finally:
+        server.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the pipeline's hot paths on a synthetic corpus.")
+    parser.add_argument("--scale", type=int, nargs="+", default=list(DEFAULT_SCALES), help="Corpus sizes (multiples of the checked-in data)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run just these benchmarks")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark; the median is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR, help="Where generated corpora are kept between runs")
+    parser.add_argument("--ollama-latency", type=float, default=0.0, help="Seconds the stub Ollama server waits per request")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against an earlier results file")
+    args = parser.parse_args()
+
+    info = git_info()
+    started = datetime.utcnow().isoformat()
+    results = run_suite(args.only or list(BENCHMARKS), args.scale, max(1, args.repeat), args.seed,
+                        os.path.abspath(args.corpus_dir), args.ollama_latency)
+    report = {
+        "format": RESULTS_FORMAT,
+        **info,
+        "started": started,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(info['commit'] or 'unknown')[:12]}{'-dirty' if info['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report)
+        print_comparison(rows)
+        if any(row["status"] == "regression" for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
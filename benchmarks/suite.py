@@ -0,0 +1,234 @@
+# benchmarks/suite.py
+import json
+import os
+import shutil
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+# What a benchmark's setup returns: run() is the timed part; items (and
+# bytes, when it makes sense) turn the time into a throughput
+Case = namedtuple("Case", "run items bytes", defaults=(None,))
+# name -> (setup(ctx) returning a Case, modules it needs)
+BENCHMARKS = {}
+
+CARD_QUERIES = ("", "ransomware", "lazarus group", "cobalt strike", "healthcare")
+CARD_PAGES = 5
+INCREMENTAL_SHARE = 0.01  # Summaries rewritten before the incremental IOC index run
+
+def benchmark(name, requires=()):
+    def register(func):
+        BENCHMARKS[name] = (func, tuple(requires))
+        return func
+    return register
+
+class BenchContext:
+    """
+    One benchmark repeat's view of a corpus. The process runs inside `workdir`,
+    whose data/ links to the corpus files, so every module's relative
+    data/... paths resolve there. `shared` holds parsed corpus data reused
+    across repeats.
+    """
+
+    def __init__(self, corpus_dir, workdir, template_db, shared, ollama_url=None):
+        self.corpus_dir = corpus_dir
+        self.workdir = workdir
+        self.template_db = template_db
+        self.shared = shared
+        self.ollama_url = ollama_url
+
+    def load(self, key, build):
+        if key not in self.shared:
+            self.shared[key] = build()
+        return self.shared[key]
+
+    def read_json(self, name):
+        def build():
+            with open(os.path.join(self.corpus_dir, "data", name), "r") as f:
+                return json.load(f)
+        return self.load(name, build)
+
+    def articles(self):
+        return self.load("articles", lambda: {**self.read_json("raw_articles.json"), **self.read_json("github_articles.json")})
+
+    def queries(self):
+        def build():
+            with open(os.path.join(self.corpus_dir, "queries.txt"), "r") as f:
+                return [line.strip() for line in f if line.strip()]
+        return self.load("queries", build)
+
+    def feed_lines(self):
+        from processors.feed_lookup import FEED_FILES
+        def build():
+            total = 0
+            for path in FEED_FILES.values():
+                with open(path, "r") as f:
+                    total += sum(1 for _ in f)
+            return total
+        return self.load("feed_lines", build)
+
+    def connect(self):
+        """A private copy of the corpus store (articles and summaries already imported)."""
+        from storage import article_store
+        shutil.copyfile(self.template_db, article_store.DB_PATH)
+        return article_store.connect()
+
+# ================== Threat feeds ===================
+@benchmark("feed_parse")
+def feed_parse(ctx):
+    from processors import feed_lookup
+    def run():
+        for name, path in feed_lookup.FEED_FILES.items():
+            feed_lookup.parse_feed(name, path)
+        feed_lookup.build_ip_index()
+    return Case(run, ctx.feed_lines())
+
+@benchmark("feed_load_cold")
+def feed_load_cold(ctx):
+    # First start after a feed update: parse, compile and map every feed
+    from processors import feed_lookup
+    from storage.feed_sets import COMPILED_DIR
+    shutil.rmtree(COMPILED_DIR, ignore_errors=True)
+    def run():
+        for name in feed_lookup.FEED_FILES:
+            feed_lookup.load_feed(name)
+    return Case(run, ctx.feed_lines())
+
+@benchmark("feed_load_warm")
+def feed_load_warm(ctx):
+    # Any later start: the compiled files are only mapped
+    from processors import feed_lookup
+    for name in feed_lookup.FEED_FILES:
+        feed_lookup.load_feed(name)
+    feed_lookup._FEED_CACHE.clear()
+    def run():
+        for name in feed_lookup.FEED_FILES:
+            feed_lookup.load_feed(name)
+    return Case(run, ctx.feed_lines())
+
+@benchmark("feed_lookup")
+def feed_lookup_bench(ctx):
+    from processors import feed_lookup
+    queries = ctx.queries()
+    feed_lookup.lookup(queries[0])
+    def run():
+        for value in queries:
+            feed_lookup.lookup(value)
+    return Case(run, len(queries))
+
+@benchmark("check_if_malicious", requires=("gradio",))
+def check_if_malicious(ctx):
+    import ui
+    queries = ctx.queries()
+    ui.check_if_malicious(ui.ALL_FEEDS, queries[0])
+    def run():
+        for value in queries:
+            ui.check_if_malicious(ui.ALL_FEEDS, value)
+    return Case(run, len(queries))
+
+# ================== Articles ===================
+@benchmark("rss_parse", requires=("feedparser", "requests"))
+def rss_parse(ctx):
+    import feedparser
+    from feeds.fetcher import entry_to_article
+    # One RSS document per source, as the fetcher receives them
+    by_source = {}
+    for article in ctx.read_json("raw_articles.json").values():
+        by_source.setdefault(article["source"], []).append(article)
+    documents = []
+    for source, articles in by_source.items():
+        items = "".join(
+            f"<item><title>{escape(a['title'])}</title><link>{escape(a['link'])}</link>"
+            f"<pubDate>{escape(a['published'])}</pubDate><description>{escape(a['content'])}</description></item>"
+            for a in articles
+        )
+        documents.append((source, f'<?xml version="1.0"?><rss version="2.0"><channel><title>{escape(source)}</title>{items}</channel></rss>'.encode("utf-8")))
+    def run():
+        for source, document in documents:
+            for entry in feedparser.parse(document).entries:
+                entry_to_article(entry, source)
+    return Case(run, sum(len(a) for a in by_source.values()), sum(len(d) for _, d in documents))
+
+@benchmark("extract_iocs")
+def extract_iocs_bench(ctx):
+    from processors.ioc_extractor import extract_iocs
+    contents = [article.get("content", "") for article in ctx.articles().values()]
+    def run():
+        for content in contents:
+            extract_iocs(content)
+    return Case(run, len(contents), sum(len(c) for c in contents))
+
+# ================== Summaries ===================
+@benchmark("summary_checkpoint")
+def summary_checkpoint(ctx):
+    # What generate_summaries.py does per finished article, then once at the end
+    from storage import article_store
+    conn = ctx.connect()
+    entries = article_store.load_summaries(conn)
+    for entry in entries.values():
+        entry["llm_meta"]["generated_on"] = "2025-08-01T00:00:00"
+    def run():
+        for url, entry in entries.items():
+            article_store.upsert_summary(conn, url, entry)
+        article_store.export_json(article_store.load_summaries(conn), article_store.SUMMARY_PATH)
+    return Case(run, len(entries))
+
+@benchmark("generate_summaries", requires=("requests",))
+def generate_summaries_bench(ctx):
+    # Incremental run: the corpus leaves some articles unsummarized, which go to the stub server
+    import generate_summaries
+    from processors import summarizer
+    summarizer.OLLAMA_URL = ctx.ollama_url
+    conn = ctx.connect()
+    def run():
+        generate_summaries.run(conn)
+    return Case(run, len(ctx.articles()))
+
+# ================== IOC index ===================
+@benchmark("ioc_index_full")
+def ioc_index_full(ctx):
+    from generate_ioc_index import generate_ioc_index
+    conn = ctx.connect()
+    def run():
+        generate_ioc_index(conn=conn, full=True)
+    return Case(run, len(ctx.read_json("summaries.json")))
+
+@benchmark("ioc_index_incremental")
+def ioc_index_incremental(ctx):
+    from generate_ioc_index import generate_ioc_index
+    from storage import article_store
+    conn = ctx.connect()
+    generate_ioc_index(conn=conn, full=True)
+    summaries = article_store.load_summaries(conn)
+    changed = {}
+    for url in list(summaries)[::max(1, int(1 / INCREMENTAL_SHARE))]:
+        entry = summaries[url]
+        entry["iocs"]["cve"] = entry["iocs"].get("cve", []) + ["CVE-2025-0001"]
+        changed[url] = entry
+    article_store.upsert_summaries(conn, changed)
+    def run():
+        generate_ioc_index(conn=conn)
+    return Case(run, len(changed))
+
+# ================== Dashboard ===================
+@benchmark("summary_view", requires=("gradio",))
+def summary_view_bench(ctx):
+    import ui
+    summaries = ctx.read_json("summaries.json")
+    def run():
+        ui.build_summary_view(summaries)
+    return Case(run, len(summaries))
+
+@benchmark("generate_cards", requires=("gradio",))
+def generate_cards(ctx):
+    import ui
+    from generate_ioc_index import generate_ioc_index
+    from processors.search_index import SORT_ORDERS
+    generate_ioc_index(conn=ctx.connect(), full=True)
+    view = ui.build_summary_view(ctx.read_json("summaries.json"))
+    ioc_index = ui.load_ioc_index()
+    def run():
+        for query in CARD_QUERIES:
+            for sort_order in SORT_ORDERS:
+                for page in range(CARD_PAGES):
+                    ui.generate_cards(view, ioc_index, query, sort_order, page)
+    return Case(run, len(CARD_QUERIES) * len(SORT_ORDERS) * CARD_PAGES)
@@ -0,0 +1,22 @@
+import argparse
+import sys
+import time
+from processors.bulk_lookup import triage_file
+from processors.feed_lookup import FEED_FILES
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every indicator in a file against all feeds and article IOCs.")
+    parser.add_argument("input", help="Indicator list or log export ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Report path ('-' for stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--feed", action="append", choices=list(FEED_FILES), help="Limit to this feed (repeatable)")
+    parser.add_argument("--hits-only", action="store_true", help="Only report indicators seen in a feed or article")
+    args = parser.parse_args()
+
+    start = time.time()
+    total, malicious = triage_file(args.input, args.output, args.format, args.feed, args.hits_only)
+
+    print(f"✅ Triaged {total} unique indicators in {time.time() - start:.1f}s: {malicious} malicious.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
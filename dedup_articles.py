@@ -0,0 +1,88 @@
+import sys
+from processors.dedup import DedupIndex, fingerprint, group_members
+from storage import article_store
+
+WATERMARK_KEY = "dedup_seq"  # Last articles.seq fingerprinted
+# News is what gets syndicated; GitHub files are tracked per path and identical
+# ones already share one summary in generate_summaries.py.
+KIND = "rss"
+
+def member_map(fingerprints):
+    """{canonical url: {member url: None}} for every group, the canonical itself left out."""
+    members = {}
+    for url, fp in fingerprints.items():
+        if fp["canonical"] != url:
+            members.setdefault(fp["canonical"], {})[url] = None
+    return members
+
+def repoint(fingerprints, members, old, new):
+    """Move every member of `old`'s group to `new` (or to the oldest remaining member if None)."""
+    moved = list(members.pop(old, ()))
+    if new is None and moved:
+        new = moved[0]
+    for url in moved:
+        fingerprints[url]["canonical"] = new
+        if url != new:
+            members.setdefault(new, {})[url] = None
+    return moved
+
+def dedup_articles(conn=None, full=False):
+    """
+    Fingerprint articles written since the stored watermark and assign each to
+    a group: the canonical article is the first one seen, later copies of the
+    same story point at it. `full` re-fingerprints everything.
+    """
+    conn = conn or article_store.connect()
+    watermark = 0 if full else int(article_store.get_meta(conn, WATERMARK_KEY, 0))
+    changed, deleted, high = article_store.changes_since(conn, "articles", watermark, KIND)
+    if watermark and high == watermark:
+        print(f"✅ Fingerprints already up to date (seq {watermark}).")
+        return
+
+    rss_urls = article_store.article_urls(conn, KIND)
+    fingerprints = article_store.load_fingerprints(conn)
+    deleted |= fingerprints.keys() - rss_urls
+    members = member_map(fingerprints)
+
+    touched = set()
+    for url in deleted:
+        fp = fingerprints.pop(url, None)
+        if fp is not None:
+            members.get(fp["canonical"], {}).pop(url, None)
+            touched.update(repoint(fingerprints, members, url, None))
+            article_store.delete_fingerprint(conn, url)
+
+    index = DedupIndex()
+    for url, fp in fingerprints.items():
+        if url not in changed:
+            index.add(url, fp, fp["canonical"])
+
+    found = {"url": 0, "exact": 0, "near": 0}
+    for url, article in changed.items():
+        fp = fingerprint(url, article)
+        canonical, how = index.find(fp)
+        if canonical:
+            found[how] += 1
+        canonical = canonical or url
+        if url in fingerprints:
+            members.get(fingerprints[url]["canonical"], {}).pop(url, None)
+            if canonical != url:
+                # It led a group of its own until now: its members follow it
+                touched.update(repoint(fingerprints, members, url, canonical))
+        fp["canonical"] = canonical
+        fingerprints[url] = fp
+        if canonical != url:
+            members.setdefault(canonical, {})[url] = None
+        index.add(url, fp, canonical)
+        touched.add(url)
+
+    article_store.upsert_fingerprints(conn, {url: fingerprints[url] for url in touched if url in fingerprints})
+    article_store.set_meta(conn, WATERMARK_KEY, high)
+
+    groups = group_members(fingerprints)
+    print(f"🧬 Fingerprinted {len(changed)} articles since seq {watermark}: "
+          f"{found['url']} same link, {found['exact']} same text, {found['near']} near-duplicates.")
+    print(f"📰 {len(groups)} stories carried by {sum(len(m) for m in groups.values())} articles.")
+
+if __name__ == "__main__":
+    dedup_articles(full="--full" in sys.argv[1:])
@@ -1,62 +1,173 @@
 import feedparser
+import hashlib
 import json
 import os
+import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from processors.dedup import normalize_url
+from storage import article_store
 
-RAW_PATH = "data/raw_articles.json"
 FEED_LIST = "feeds/sources.json"
+FEED_STATE_PATH = "data/feed_state.json"
+MAX_WORKERS = 8      # Feeds fetched in parallel
+FEED_TIMEOUT = 20    # Seconds allowed per feed (connect + read)
+MAX_SEEN_IDS = 500   # Entry IDs remembered per feed
+
+HEADERS = {
+    "User-Agent": "SentinelStream"
+}
 
 def load_feed_urls(file_path=FEED_LIST):
     with open(file_path, "r") as f:
         return json.load(f)
 
-def load_existing_articles(path=RAW_PATH):
+def load_existing_articles(conn=None):
+    conn = conn or article_store.connect()
+    return article_store.load_articles(conn, "rss")
+
+def load_feed_state(path=FEED_STATE_PATH):
     if not os.path.exists(path):
         return {}
     with open(path, "r") as f:
         try:
             data = json.load(f)
-            if isinstance(data, dict):
-                return data
-            else:
-                print("⚠️ Existing raw_articles.json is not a dictionary. Reinitializing.")
-                return {}
+            return data if isinstance(data, dict) else {}
         except json.JSONDecodeError:
-            print("❌ Error parsing raw_articles.json. Reinitializing.")
+            print("⚠️ Error parsing feed_state.json. Starting with empty state.")
             return {}
 
-def fetch_articles():
+def save_feed_state(state, path=FEED_STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def entry_id(entry):
+    return entry.get("id") or entry.get("link")
+
+def fetch_feed(feed_url, state=None, timeout=FEED_TIMEOUT):
+    """
+    Download and parse a single feed.
+    `state` holds what we remember about the feed (ETag, Last-Modified, body hash,
+    seen entry IDs). Conditional headers are sent from it, and a 304 or an
+    unchanged body skips parsing entirely.
+    Returns (new_entries, updated_state).
+    """
+    state = dict(state or {})
+    headers = dict(HEADERS)
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    started = time.monotonic()
+    try:
+        res = requests.get(feed_url, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Failed to fetch {feed_url}: {e}")
+        state["last_status"] = "error"
+        return [], state
+    finally:
+        state["last_duration"] = round(time.monotonic() - started, 3)
+        state["last_fetched"] = datetime.utcnow().isoformat()
+
+    state["last_status"] = res.status_code
+    if res.status_code == 304:
+        return [], state
+    if res.status_code != 200:
+        print(f"⚠️ Skipped {feed_url} — {res.status_code}")
+        return [], state
+
+    state["etag"] = res.headers.get("ETag")
+    state["last_modified"] = res.headers.get("Last-Modified")
+
+    # Servers without conditional GET support still let us skip the parse
+    body_hash = hashlib.sha256(res.content).hexdigest()
+    if body_hash == state.get("body_hash"):
+        return [], state
+    state["body_hash"] = body_hash
+
+    parsed = feedparser.parse(res.content)
+    seen = state.get("seen_ids", [])
+    seen_set = set(seen)
+    new_entries = [e for e in parsed.entries if entry_id(e) not in seen_set]
+
+    current_ids = [entry_id(e) for e in parsed.entries if entry_id(e)]
+    current_set = set(current_ids)
+    state["seen_ids"] = (current_ids + [i for i in seen if i not in current_set])[:MAX_SEEN_IDS]
+    return new_entries, state
+
+def entry_to_article(entry, feed_url):
+    content = entry.get("summary", "") or entry.get("content", [{}])[0].get("value", "")
+    return {
+        "title": entry.get("title", "Untitled"),
+        "link": entry.get("link"),
+        "published": entry.get("published", datetime.utcnow().isoformat()),
+        "content": content,
+        "source": feed_url
+    }
+
+def fetch_new_articles(known_urls, max_workers=MAX_WORKERS, timeout=FEED_TIMEOUT, feed_state=None):
+    """
+    Fetch every feed concurrently and return {url: article} for links not in `known_urls`.
+    Links are compared normalized, so "?utm_source=rss" or a trailing slash is not a new article.
+    `feed_state` (from load_feed_state()) is updated in place but never saved
+    here: callers save it after the articles are stored, so a crash in between
+    never marks entries as seen. Without one, a throwaway copy is used.
+    """
     feeds = load_feed_urls()
-    existing = load_existing_articles()
-    new_articles = 0
+    if feed_state is None:
+        feed_state = load_feed_state()
+
+    # Fetch concurrently, but keep results keyed by feed so merging below
+    # happens in sources.json order no matter which feed finished first.
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(fetch_feed, feed_url, feed_state.get(feed_url), timeout): feed_url
+            for feed_url in feeds
+        }
+        for future in as_completed(futures):
+            feed_url = futures[future]
+            try:
+                results[feed_url], feed_state[feed_url] = future.result()
+            except Exception as e:
+                print(f"❌ Error parsing {feed_url}: {e}")
+                results[feed_url] = []
 
+    new_articles = {}
+    seen = {normalize_url(url) for url in known_urls}
     for feed_url in feeds:
-        parsed = feedparser.parse(feed_url)
-        for entry in parsed.entries:
+        for entry in results.get(feed_url, []):
             url = entry.get("link")
-            if not url or url in existing:
+            if not url or normalize_url(url) in seen:
                 continue  # Skip already saved article
 
-            content = entry.get("summary", "") or entry.get("content", [{}])[0].get("value", "")
-            article = {
-                "title": entry.get("title", "Untitled"),
-                "link": url,
-                "published": entry.get("published", datetime.utcnow().isoformat()),
-                "content": content,
-                "source": feed_url
-            }
+            seen.add(normalize_url(url))
+            new_articles[url] = entry_to_article(entry, feed_url)
 
-            existing[url] = article
-            new_articles += 1
+    return new_articles
 
-    return existing, new_articles
+def fetch_articles(max_workers=MAX_WORKERS, timeout=FEED_TIMEOUT, feed_state=None):
+    existing = load_existing_articles()
+    new_articles = fetch_new_articles(existing, max_workers, timeout, feed_state)
+    existing.update(new_articles)
+    return existing, len(new_articles)
 
-def save_articles(articles, path=RAW_PATH):
-    with open(path, "w") as f:
-        json.dump(articles, f, indent=2)
+def save_articles(articles, conn=None):
+    """Upsert articles into the store; only new or changed rows are written."""
+    conn = conn or article_store.connect()
+    return article_store.upsert_articles(conn, articles, "rss")
 
 if __name__ == "__main__":
     print("📡 Fetching articles...")
-    data, added = fetch_articles()
-    save_articles(data)
-    print(f"✅ Fetched and saved {len(data)} articles ({added} new).")
+    conn = article_store.connect()
+    state = load_feed_state()
+    new_articles = fetch_new_articles(article_store.article_urls(conn, "rss"), feed_state=state)
+    save_articles(new_articles, conn)
+    save_feed_state(state)
+    article_store.export_articles(conn, "rss")
+    total = len(article_store.article_urls(conn, "rss"))
+    print(f"✅ Fetched and saved {total} articles ({len(new_articles)} new).")
@@ -1,18 +1,23 @@
 import requests
 import json
 import os
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from storage import article_store
 
 GITHUB_API = "https://api.github.com/repos"
 RAW_URL = "https://raw.githubusercontent.com"
-SAVE_PATH = "data/github_articles.json"
+STATE_PATH = "data/github_state.json"
 
 REPOS = {
     "MISP/misp-galaxy": "main",
      "stamparm/maltrail": "master",
      "executemalware/Malware-IOCs": "main",
     "Neo23x0/signature-base": "master"
-    
+
 }
 
 HEADERS = {
@@ -20,80 +25,230 @@ HEADERS = {
     "User-Agent": "SentinelStream"
 }
 
-ALLOWED_EXTENSIONS = (".md", ".txt", ".json")
+ALLOWED_EXTENSIONS = (".md", ".txt", ".json", ".yar", ".yara")
+
+MAX_WORKERS = 16        # Concurrent raw file downloads
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+BACKOFF_BASE = 2        # Seconds, doubled on every retry
+MAX_BACKOFF = 300
+
+def make_session(pool_size=MAX_WORKERS):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    if os.environ.get("GITHUB_TOKEN"):
+        session.headers["Authorization"] = f"token {os.environ['GITHUB_TOKEN']}"
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), or None if unparseable."""
+    value = (value or "").strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(int(when.timestamp() - (time.time() if now is None else now)), 1)
+
+def backoff_delay(res, attempt):
+    """
+    How long to wait before retrying `res`, or None if it should not be retried.
+    Honours Retry-After and the GitHub rate-limit reset header before falling
+    back to exponential backoff.
+    """
+    if res.status_code == 429 or (res.status_code == 403 and res.headers.get("X-RateLimit-Remaining") == "0"):
+        retry_after = retry_after_seconds(res.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, MAX_BACKOFF)
+        reset = res.headers.get("X-RateLimit-Reset")
+        if reset:
+            return min(max(int(reset) - int(time.time()), 1), MAX_BACKOFF)
+        return min(BACKOFF_BASE ** attempt, MAX_BACKOFF)
+    if res.status_code >= 500:
+        return min(BACKOFF_BASE ** attempt, MAX_BACKOFF)
+    return None
+
+def get_with_backoff(session, url):
+    res = None
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            res = session.get(url, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"⚠️ {url} failed ({e}), retrying...")
+            time.sleep(min(BACKOFF_BASE ** attempt, MAX_BACKOFF))
+            continue
+
+        delay = backoff_delay(res, attempt)
+        if delay is None or attempt == MAX_RETRIES:
+            return res
+        print(f"⏳ {res.status_code} from {url}, backing off {delay}s")
+        time.sleep(delay)
+    return res
+
+def get_tree_sha(session, owner_repo, branch):
+    # Non-recursive listing is tiny and already carries the root tree SHA
+    url = f"{GITHUB_API}/{owner_repo}/git/trees/{branch}"
+    res = get_with_backoff(session, url)
+    if res.status_code == 200:
+        return res.json().get("sha")
+    print(f"❌ Failed to read tree of {owner_repo}: {res.status_code}")
+    return None
 
-def list_repo_files(owner_repo, branch):
-    url = f"{GITHUB_API}/{owner_repo}/git/trees/{branch}?recursive=1"
-    res = requests.get(url, headers=HEADERS)
+def list_repo_files(session, owner_repo, tree_sha):
+    url = f"{GITHUB_API}/{owner_repo}/git/trees/{tree_sha}?recursive=1"
+    res = get_with_backoff(session, url)
     if res.status_code == 200:
         return res.json().get("tree", [])
     else:
         print(f"❌ Failed to list {owner_repo}: {res.status_code}")
         return []
 
-def fetch_raw_file(owner_repo, branch, path):
+def fetch_raw_file(session, owner_repo, branch, path):
+    """
+    The file's text; "" when it is empty or permanently unavailable (404 and
+    other client errors), None when it should be retried on the next sync
+    (server errors and rate limiting that outlasted the backoff).
+    """
     raw_url = f"{RAW_URL}/{owner_repo}/{branch}/{path}"
-    res = requests.get(raw_url)
+    res = get_with_backoff(session, raw_url)
     if res.status_code == 200:
         return res.text
-    else:
-        print(f"⚠️ Skipped {path} — {res.status_code}")
-        return None
-
-def load_existing_articles():
-    if os.path.exists(SAVE_PATH):
-        with open(SAVE_PATH, "r") as f:
-            return json.load(f)
-    return {}
+    print(f"⚠️ Skipped {path} — {res.status_code}")
+    return None if backoff_delay(res, 1) is not None else ""
 
-def save_articles(data):
-    with open(SAVE_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+def is_wanted(repo, path):
+    # Filter by extension
+    if not path.endswith(ALLOWED_EXTENSIONS):
+        return False
 
-def main():
-    print("🐙 Fetching GitHub threat intel files...")
-    all_articles = load_existing_articles()
-    new_count = 0
+    # Focused folder filter for specific repos
+    if repo == "MISP/misp-galaxy" and not path.startswith("clusters/"):
+        return False
 
-    for repo, branch in REPOS.items():
-        print(f"\n🔍 Scanning {repo}...")
-        files = list_repo_files(repo, branch)
+    if repo == "stamparm/maltrail" and not (
+        path.startswith("blacklists/") or path.startswith("trails/")
+    ):
+        return False
 
-        for file in files:
-            path = file.get("path", "")
-            # Filter by extension
-            if not path.endswith(ALLOWED_EXTENSIONS):
-                continue
+    return True
 
-            # Focused folder filter for specific repos
-            if repo == "MISP/misp-galaxy" and not path.startswith("clusters/"):
-                continue
+def load_existing_articles(conn=None):
+    conn = conn or article_store.connect()
+    return article_store.load_articles(conn, "github")
 
-            if repo == "stamparm/maltrail" and not (
-                path.startswith("blacklists/") or path.startswith("trails/")
-            ):
-                continue
+def save_articles(data, conn=None):
+    """Upsert articles into the store; only new or changed rows are written."""
+    conn = conn or article_store.connect()
+    return article_store.upsert_articles(conn, data, "github")
 
+def load_sync_state(path=STATE_PATH):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
 
-            full_url = f"{RAW_URL}/{repo}/{branch}/{path}"
-            if full_url in all_articles:
+def save_sync_state(state, path=STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def sync_repo(session, repo, branch, repo_state, known_urls, max_workers=MAX_WORKERS):
+    """
+    Bring one repo up to date.
+    `repo_state` is {"tree_sha": ..., "blobs": {path: blob_sha}, "empty": [paths]}
+    from the last run; "empty" lists files that were empty or gone, so they
+    are not fetched again until their blob changes.
+    Only added or changed blobs are downloaded. Returns (new_state, {url: article}).
+    """
+    fetched = {}
+    tree_sha = get_tree_sha(session, repo, branch)
+    if not tree_sha:
+        return repo_state, fetched
+    if tree_sha == repo_state.get("tree_sha"):
+        print(f"⏭️ {repo} unchanged since last sync.")
+        return repo_state, fetched
+
+    old_blobs = repo_state.get("blobs", {})
+    old_empty = set(repo_state.get("empty", ()))
+    blobs = {}
+    empty = set()
+    to_fetch = []
+    for file in list_repo_files(session, repo, tree_sha):
+        path = file.get("path", "")
+        if file.get("type") != "blob" or not is_wanted(repo, path):
+            continue
+
+        blobs[path] = file.get("sha")
+        full_url = f"{RAW_URL}/{repo}/{branch}/{path}"
+        if old_blobs.get(path) == blobs[path]:
+            if full_url in known_urls:
                 continue
-
-            content = fetch_raw_file(repo, branch, path)
-            if not content:
+            if path in old_empty:
+                empty.add(path)
+                continue
+        to_fetch.append(path)
+
+    print(f"📥 {len(to_fetch)} added/changed files in {repo}")
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(fetch_raw_file, session, repo, branch, path): path for path in to_fetch}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                content = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ Skipped {path} — {e}")
+                content = None
+
+            if content is None:
+                # Forget the SHA so the file is retried on the next sync
+                blobs.pop(path, None)
+                failed += 1
+                continue
+            if not content.strip():
+                # Nothing to store, but this blob is done with
+                empty.add(path)
                 continue
 
-            all_articles[full_url] = {
+            full_url = f"{RAW_URL}/{repo}/{branch}/{path}"
+            fetched[full_url] = {
                 "title": os.path.basename(path),
                 "link": full_url,
                 "published": datetime.utcnow().isoformat() + "Z",
                 "content": content,
                 "source": f"github:{repo}"
             }
-            new_count += 1
 
-    save_articles(all_articles)
+    # A sync with failed downloads must not record the new tree SHA, or the
+    # missing files would be skipped until the repo changes again.
+    return {"tree_sha": None if failed else tree_sha, "blobs": blobs, "empty": sorted(empty)}, fetched
+
+def main():
+    print("🐙 Fetching GitHub threat intel files...")
+    conn = article_store.connect()
+    known_urls = article_store.article_urls(conn, "github")
+    state = load_sync_state()
+    session = make_session()
+    new_count = 0
+
+    for repo, branch in REPOS.items():
+        print(f"\n🔍 Scanning {repo}...")
+        state[repo], fetched = sync_repo(session, repo, branch, state.get(repo, {}), known_urls)
+        # Checkpoint per repo so an interrupted sync keeps what it already downloaded
+        save_articles(fetched, conn)
+        save_sync_state(state)
+        new_count += len(fetched)
+
+    article_store.export_articles(conn, "github")
     print(f"\n✅ Done. Fetched {new_count} new GitHub articles.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,67 @@
+import json
+import os
+import random
+import time
+
+SCHEDULE_PATH = "data/ingest_schedule.json"
+
+# (default, min, max) polling interval in seconds per source kind. GitHub
+# checks cost API quota, so they run less often than conditional RSS GETs.
+INTERVALS = {
+    "rss": (15 * 60, 2 * 60, 60 * 60),
+    "github": (60 * 60, 15 * 60, 6 * 60 * 60),
+}
+JITTER = 0.1             # +/- share of the interval, so sources drift apart instead of firing together
+RATE_SMOOTHING = 0.3     # Weight of the latest poll in the publish-rate average
+ITEMS_PER_POLL = 0.5     # Poll about twice per expected new item
+
+def load_schedule(path=SCHEDULE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        try:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except json.JSONDecodeError:
+            return {}
+
+def save_schedule(schedule, path=SCHEDULE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(schedule, f, indent=2)
+    os.replace(tmp_path, path)
+
+def jittered(interval):
+    return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+def new_entry(kind, now=None):
+    """Schedule state of a source never polled before: due right away."""
+    default, _, _ = INTERVALS[kind]
+    return {"kind": kind, "interval": default, "rate": None, "last_polled": None, "next_due": now or time.time()}
+
+def record_poll(entry, new_items, now=None):
+    """
+    Update `entry` after a poll that found `new_items`, and schedule the next one.
+    The interval follows a smoothed estimate of how many items the source
+    publishes per second: busy sources are polled often, quiet ones back off
+    towards the maximum.
+    """
+    now = now or time.time()
+    default, low, high = INTERVALS[entry["kind"]]
+    if entry.get("last_polled"):
+        observed = new_items / max(1.0, now - entry["last_polled"])
+        rate = entry.get("rate")
+        entry["rate"] = observed if rate is None else RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * rate
+        interval = ITEMS_PER_POLL / entry["rate"] if entry["rate"] > 0 else high
+    else:
+        interval = default
+    entry["interval"] = min(high, max(low, interval))
+    entry["last_polled"] = now
+    entry["next_due"] = now + jittered(entry["interval"])
+    return entry
+
+def record_failure(entry, now=None):
+    """A failed poll is retried after the current interval, without touching the rate."""
+    now = now or time.time()
+    entry["next_due"] = now + jittered(entry["interval"])
+    return entry
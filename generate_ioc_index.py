@@ -1,34 +1,57 @@
-import json
-import os
+import sys
+from processors.ioc_extractor import IOC_TYPES
+from processors.ioc_pivot import article_date
+from storage import article_store
 
-SUMMARY_PATH = "data/summaries.json"
 OUTPUT_PATH = "data/ioc_index.json"
-
-def generate_ioc_index(summary_path, output_path):
-    if not os.path.exists(summary_path):
-        raise FileNotFoundError(f"Missing file: {summary_path}")
-
-    with open(summary_path, "r") as f:
-        summaries = json.load(f)
-
-    index = {}
-    for url, entry in summaries.items():
-        iocs = entry.get("iocs", {})
-        ipv4 = iocs.get("ipv4", [])
-        urls = iocs.get("url", [])
-        hashes = iocs.get("hash", [])
-
-        if ipv4 or urls or hashes:
-            index[url] = {
-                "ipv4": ipv4,
-                "url": urls,
-                "hash": hashes
-            }
-
-    with open(output_path, "w") as f:
-        json.dump(index, f, indent=2)
-
-    print(f"✅ IOC index created at {output_path} with {len(index)} articles.")
+WATERMARK_KEY = "ioc_reverse_seq"  # Last summaries.seq reflected in the iocs and ioc_articles tables
+
+def typed_iocs(entry):
+    iocs = entry.get("iocs", {})
+    typed = {ioc_type: iocs.get(ioc_type, []) for ioc_type in IOC_TYPES}
+    return typed if any(typed.values()) else None
+
+def generate_ioc_index(conn=None, full=False, export=False, output_path=OUTPUT_PATH):
+    """
+    Bring the IOC index (url -> iocs) and the reverse index (ioc -> articles)
+    in the store up to date with the summaries table. Only summaries written
+    or deleted since the stored watermark are read, and only their rows are
+    rewritten, so a refresh costs the number of changed articles, not the
+    corpus size; `full` rebuilds from watermark 0. The UI and bulk triage
+    query the store; `export` also writes ioc_index.json for other tools.
+    """
+    conn = conn or article_store.connect()
+    watermark = 0 if full else int(article_store.get_meta(conn, WATERMARK_KEY, 0))
+
+    changed, deleted, high = article_store.changes_since(conn, "summaries", watermark)
+    if watermark and high == watermark:
+        print(f"✅ IOC index already up to date (seq {watermark}).")
+    else:
+        if watermark == 0:
+            # Rebuilding: entries whose summary is gone must go too
+            deleted |= article_store.ioc_urls(conn) - changed.keys()
+            article_store.clear_ioc_articles(conn)
+
+        forward, dates, removed = {}, {}, set()
+        for url in changed.keys() | deleted:
+            iocs = typed_iocs(changed[url]) if url in changed else None
+            if iocs:
+                forward[url] = iocs
+                dates[url] = article_date(article_store.get_article(conn, url), changed[url])
+            else:
+                removed.add(url)
+
+        article_store.upsert_ioc_index(conn, forward)
+        for url in removed:
+            if article_store.get_iocs(conn, url) is not None:
+                article_store.delete_iocs(conn, url)
+        article_store.replace_ioc_articles(conn, forward, dates, removed)
+        article_store.set_meta(conn, WATERMARK_KEY, high)
+        print(f"✅ IOC index updated: {len(changed)} changed, {len(deleted)} removed summaries since seq {watermark}.")
+
+    if export:
+        article_store.export_json(article_store.load_ioc_index(conn), output_path)
+        print(f"📤 Exported IOC index to {output_path}")
 
 if __name__ == "__main__":
-    generate_ioc_index(SUMMARY_PATH, OUTPUT_PATH)
\ No newline at end of file
+    generate_ioc_index(full="--full" in sys.argv[1:], export="--export" in sys.argv[1:])
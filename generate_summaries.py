@@ -1,100 +1,273 @@
-import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from processors.ioc_extractor import extract_iocs
-from processors.summarizer import summarize_article
+from processors.dedup import group_members
+from processors.summarizer import summarize_article, make_session, MODEL_NAME, CHUNK_PROMPT_VERSION, FAILED_PREFIX
+from processors.triage import ROUTE_LLM, TRIAGE_VERSION, triage
+from storage import article_store
+from storage.summary_cache import SummaryCache, content_hash
 
-RAW_PATH = "data/raw_articles.json"
-GITHUB_PATH = "data/github_articles.json"
 SUMMARY_PATH = "data/summaries.json"
-PROMPT_VERSION = "v1.0"
-MODEL_NAME = "llama2"
+PROMPT_VERSION = "v1.1"
 
-def load_json(path):
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)
-    return {}
+# Keep as many requests in flight as the Ollama server has parallel slots
+PARALLEL_REQUESTS = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+MAX_RETRIES = 3
+RETRY_BACKOFF = 5  # Seconds, doubled on every retry
 
-def save_json(data, path):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+def build_entry(article, url, summary_text, iocs, text_hash=None, route=ROUTE_LLM, kind=None, entities=None):
+    meta = {
+        "model": MODEL_NAME,
+        "prompt_version": PROMPT_VERSION,
+        "content_hash": text_hash or content_hash(article.get("content", "")),
+        "generated_on": datetime.utcnow().isoformat()
+    }
+    if route != ROUTE_LLM:
+        # Summarized without the model: record how, so rule changes re-route it
+        meta.update(route=route, kind=kind, triage_version=TRIAGE_VERSION)
+    entry = {
+        "title": article.get("title", ""),
+        "link": url,
+        "summary": summary_text,
+        "iocs": iocs,
+        "llm_meta": meta
+    }
+    if entities:
+        # Threat actors, malware and rules parsed from structured files
+        entry["entities"] = entities
+    return entry
+
+def attach_sources(entry, sources):
+    """Record the other copies of the story on the canonical article's entry."""
+    if sources:
+        entry["sources"] = sources
+    else:
+        entry.pop("sources", None)
+    return entry
+
+def is_cacheable(summary_text):
+    return not summary_text.startswith(("❌", "⚠️"))
+
+def is_current(entry, text_hash):
+    """
+    True if `entry` was produced from this content by the current model and prompt.
+    Entries written before content hashes were recorded are trusted on model/prompt alone.
+    """
+    meta = entry.get("llm_meta", {})
+    return (
+        meta.get("model") == MODEL_NAME
+        and meta.get("prompt_version") == PROMPT_VERSION
+        and meta.get("content_hash", text_hash) == text_hash
+        and meta.get("triage_version", TRIAGE_VERSION) == TRIAGE_VERSION
+    )
+
+def summarize_with_retry(article, url, session=None, retries=MAX_RETRIES, backoff=RETRY_BACKOFF, chunk_cache=None):
+    summary_text = ""
+    for attempt in range(retries + 1):
+        summary_text = summarize_article(
+            text=article.get("content", ""),
+            title=article.get("title", ""),
+            source_url=url,
+            session=session,
+            chunk_cache=chunk_cache
+        )
+        if not summary_text.startswith(FAILED_PREFIX):
+            break
+        if attempt < retries:
+            delay = backoff * (2 ** attempt)
+            print(f"⏳ Retrying {article.get('title', url)} in {delay}s ({summary_text})")
+            time.sleep(delay)
+    return summary_text
+
+def summarize_job(url, article, iocs, session, chunk_cache=None):
+    summary_text = summarize_with_retry(article, url, session, chunk_cache=chunk_cache)
+    return build_entry(article, url, summary_text, iocs)
+
+def summarize_pending(pending, on_done, workers=PARALLEL_REQUESTS, session=None, chunk_cache=None):
+    """
+    Summarize [(url, article, iocs)] with at most `workers` requests in flight.
+    on_done(url, entry) is called in the original order of `pending`, so the
+    checkpointed prefix is always contiguous and a resumed run picks up cleanly.
+    """
+    workers = max(1, workers)
+    # Long articles fan out into chunk requests, so pool a few extra connections
+    session = session or make_session(workers * 2)
+    results = {}
+    next_to_flush = 0
+    next_to_submit = 0
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while next_to_flush < len(pending):
+            while next_to_submit < len(pending) and len(in_flight) < workers:
+                url, article, iocs = pending[next_to_submit]
+                in_flight[pool.submit(summarize_job, url, article, iocs, session, chunk_cache)] = next_to_submit
+                next_to_submit += 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[in_flight.pop(future)] = future.result()
+
+            while next_to_flush in results:
+                url = pending[next_to_flush][0]
+                on_done(url, results.pop(next_to_flush))
+                next_to_flush += 1
 
 def main():
-    raw_articles = load_json(RAW_PATH)
-    github_articles = load_json(GITHUB_PATH)
-    summaries = load_json(SUMMARY_PATH)
+    conn = article_store.connect()
+    try:
+        run(conn)
+    finally:
+        # The UI reads summaries.json, so publish whatever was checkpointed,
+        # even if the run was interrupted.
+        article_store.export_json(article_store.load_summaries(conn), SUMMARY_PATH)
+
+def load_scope(conn, urls, fingerprints):
+    """
+    (articles, summaries) for just `urls`, plus the canonical article of each
+    one's story so new copies of it update its source list.
+    """
+    scope = dict.fromkeys(urls)
+    for url in urls:
+        scope[fingerprints.get(url, {}).get("canonical", url)] = None
+    articles, summaries = {}, {}
+    for url in scope:
+        article = article_store.get_article(conn, url)
+        if article:
+            articles[url] = article
+        entry = article_store.get_summary(conn, url)
+        if entry:
+            summaries[url] = entry
+    return articles, summaries
 
-    # ✅ Merge both sources: raw + github
-    all_articles = {**raw_articles, **github_articles}
+def run(conn, workers=PARALLEL_REQUESTS, urls=None):
+    """Summarize every article, or only `urls` (as the ingestion daemon does for new ones)."""
+    fingerprints = article_store.load_fingerprints(conn)
+    if urls is None:
+        # ✅ Merge both sources: raw + github
+        all_articles = {**article_store.load_articles(conn, "rss"), **article_store.load_articles(conn, "github")}
+        summaries = article_store.load_summaries(conn)
+    else:
+        all_articles, summaries = load_scope(conn, urls, fingerprints)
+    cache = SummaryCache(conn, MODEL_NAME, PROMPT_VERSION)
+    # Notes for the chunks of long articles, so an edit only re-summarizes the chunks it touched
+    chunk_cache = SummaryCache(conn, MODEL_NAME, CHUNK_PROMPT_VERSION)
 
     total = len(all_articles)
     processed = 0
+    pending = []
+    # content hash -> other URLs with the same content waiting on the one in `pending`
+    duplicates = {}
+    # triage kind -> documents summarized without the model
+    routes = {}
+
+    # ✅ Near-duplicate stories (see dedup_articles.py) are summarized once, on the canonical article
+    groups = group_members(fingerprints)
+    sources = {}
+    folded = 0
+
+    def story_sources(url):
+        if url not in groups:
+            return None
+        if url not in sources:
+            sources[url] = []
+            for member in groups[url]:
+                article = all_articles.get(member) or article_store.get_article(conn, member)
+                if article:
+                    sources[url].append({"link": member, "title": article.get("title", ""), "source": article.get("source", "")})
+        return sources[url]
 
     for url, article in all_articles.items():
         processed += 1
-
-        # ✅ Fast skip: Raw IOC dump files
-        if article.get("source", "").startswith("github:stamparm/maltrail") and article["title"].endswith(".txt"):
-            print(f"📄 [{processed}/{total}] Skipping summarization for raw IOC file: {article['title']}")
-            iocs = extract_iocs(article.get("content", ""))
-            summaries[url] = {
-                "title": article.get("title", ""),
-                "link": url,
-                "summary": "⚠️ Skipped LLM summarization — IOC dump file",
-                "iocs": iocs,
-                "llm_meta": {
-                    "model": MODEL_NAME,
-                    "prompt_version": PROMPT_VERSION,
-                    "generated_on": datetime.utcnow().isoformat()
-                }
-            }
-            save_json(summaries, SUMMARY_PATH)
+        canonical = fingerprints.get(url, {}).get("canonical", url)
+        if canonical != url and canonical in all_articles:
+            folded += 1
+            if url in summaries:
+                # Its card is replaced by the canonical article's
+                del summaries[url]
+                article_store.delete_summary(conn, url)
             continue
 
+        text_hash = content_hash(article.get("content", ""))
+
         existing = summaries.get(url)
         existing_summary = existing.get("summary") if existing else None
 
-        if existing and existing_summary.startswith("❌ API request failed"):
+        if existing and existing_summary.startswith(FAILED_PREFIX):
             print(f"♻️ Removing previous failed summary for: {article['title']}")
             del summaries[url]
+            article_store.delete_summary(conn, url)
             existing = None
             existing_summary = None
 
-        already_summarized_ok = (
-            existing_summary
-            and not existing_summary.startswith("❌ API request failed")
-            and not existing_summary.startswith("⚠️ Skipped LLM summarization")
-        )
-
-        if already_summarized_ok:
+        if existing_summary and is_current(existing, text_hash):
             print(f"🔄 [{processed}/{total}] Skipping already summarized: {article['title']}")
+            if existing.get("llm_meta", {}).get("route", ROUTE_LLM) == ROUTE_LLM and is_cacheable(existing_summary):
+                cache.put(text_hash, existing_summary, replace=False)
+            if existing.get("sources") != story_sources(url):
+                # New copies of the story showed up: no new summary, just the source list
+                article_store.upsert_summary(conn, url, attach_sources(existing, story_sources(url)))
             continue
 
-        print(f"🧠 [{processed}/{total}] Summarizing: {article['title']}")
-        summary_text = summarize_article(
-            text=article.get("content", ""),
-            title=article.get("title", ""),
-            source_url=url
-        )
+        # ✅ Fast path: indicator lists, rule files and structured data never reach the model
+        decision = triage(article)
+        if decision.route != ROUTE_LLM:
+            routes[decision.kind] = routes.get(decision.kind, 0) + 1
+            print(f"📄 [{processed}/{total}] {decision.route.title()} summary ({decision.kind}): {article['title']}")
+            summaries[url] = attach_sources(
+                build_entry(article, url, decision.summary, decision.iocs, text_hash, decision.route, decision.kind, decision.entities),
+                story_sources(url),
+            )
+            article_store.upsert_summary(conn, url, summaries[url])
+            continue
+
+        cached = cache.get(text_hash)
+        if cached is not None:
+            print(f"♻️ [{processed}/{total}] Reusing cached summary: {article['title']}")
+            summaries[url] = attach_sources(build_entry(article, url, cached, decision.iocs, text_hash), story_sources(url))
+            article_store.upsert_summary(conn, url, summaries[url])
+            continue
+
+        if text_hash in duplicates:
+            duplicates[text_hash].append((url, article))
+            continue
+
+        duplicates[text_hash] = []
+        # Triage already extracted the IOCs; the worker only adds the summary
+        pending.append((url, article, decision.iocs))
+
+    if folded:
+        print(f"\n📰 {folded} duplicate articles folded into {len(groups)} stories.")
+    if routes:
+        print(f"\n📄 Summarized without the LLM: {routes}")
+    print(f"\n🧠 Summarizing {len(pending)} articles with {workers} requests in flight...")
+    done_count = 0
 
-        iocs = extract_iocs(article.get("content", ""))
+    def checkpoint(url, entry):
+        nonlocal done_count
+        done_count += 1
+        summaries[url] = attach_sources(entry, story_sources(url))
+        article_store.upsert_summary(conn, url, entry)
+        print(f"🧠 [{done_count}/{len(pending)}] Summarized: {entry['title']}")
 
-        summaries[url] = {
-            "title": article.get("title", ""),
-            "link": url,
-            "summary": summary_text,
-            "iocs": iocs,
-            "llm_meta": {
-                "model": MODEL_NAME,
-                "prompt_version": PROMPT_VERSION,
-                "generated_on": datetime.utcnow().isoformat()
-            }
-        }
+        text_hash = entry["llm_meta"]["content_hash"]
+        if not is_cacheable(entry["summary"]):
+            return
+        cache.put(text_hash, entry["summary"])
+        # Identical content elsewhere shares the summary (and therefore the IOCs)
+        for dup_url, dup_article in duplicates.pop(text_hash, []):
+            summaries[dup_url] = attach_sources(
+                build_entry(dup_article, dup_url, entry["summary"], entry["iocs"], text_hash), story_sources(dup_url)
+            )
+            article_store.upsert_summary(conn, dup_url, summaries[dup_url])
 
-        save_json(summaries, SUMMARY_PATH)
+    summarize_pending(pending, checkpoint, workers, chunk_cache=chunk_cache)
 
-    print(f"\n✅ Completed: {processed} articles processed.")
+    evicted = cache.evict()
+    print(f"\n📊 Summary cache: {cache.report()}" + (f", {evicted} evicted" if evicted else ""))
+    print(f"📊 Chunk cache: {chunk_cache.hits} hits, {chunk_cache.misses} misses")
+    print(f"✅ Completed: {processed} articles processed.")
 
 if __name__ == "__main__":
     main()
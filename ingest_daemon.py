@@ -0,0 +1,157 @@
+import queue
+import signal
+import sys
+import threading
+import time
+import generate_summaries
+from dedup_articles import dedup_articles
+from feeds import fetcher, github_fetcher
+from feeds.schedule import load_schedule, new_entry, record_failure, record_poll, save_schedule
+from generate_ioc_index import generate_ioc_index
+from processors.dedup import normalize_url
+from processors.pipeline_runner import PipelineBusy, acquire_lock, release_lock
+from storage import article_store
+
+MAX_SLEEP = 60      # Seconds between checks of the schedule (and of the stop flag)
+BATCH_WAIT = 5      # Seconds to gather articles arriving together before processing them
+
+def source_keys():
+    """{schedule key: (kind, feed url or repo)} for every configured source."""
+    keys = {f"rss:{url}": ("rss", url) for url in fetcher.load_feed_urls()}
+    keys.update({f"github:{repo}": ("github", repo) for repo in github_fetcher.REPOS})
+    return keys
+
+class IngestDaemon:
+    """
+    Polls each source on its own adaptive schedule (feeds/schedule.py) and
+    streams new articles through a queue to a worker that deduplicates,
+    summarizes and indexes just those articles, as they arrive.
+    """
+
+    def __init__(self):
+        self.conn = article_store.connect()
+        self.stop = threading.Event()
+        self.queue = queue.Queue()
+        self.schedule = load_schedule()
+        self.feed_state = fetcher.load_feed_state()
+        self.sync_state = github_fetcher.load_sync_state()
+        self.session = None
+        self.known = {normalize_url(url) for url in article_store.article_urls(self.conn, "rss")}
+        self.worker = threading.Thread(target=self.process_queue, name="ingest-worker", daemon=True)
+
+    # ================== Polling ===================
+    def poll_rss(self, feed_url):
+        entries, self.feed_state[feed_url] = fetcher.fetch_feed(feed_url, self.feed_state.get(feed_url))
+        new_articles = {}
+        for entry in entries:
+            url = entry.get("link")
+            if url and normalize_url(url) not in self.known:
+                self.known.add(normalize_url(url))
+                new_articles[url] = fetcher.entry_to_article(entry, feed_url)
+        if fetcher.save_articles(new_articles, self.conn):
+            article_store.export_articles(self.conn, "rss")
+        fetcher.save_feed_state(self.feed_state)
+        return list(new_articles)
+
+    def poll_github(self, repo):
+        self.session = self.session or github_fetcher.make_session()
+        known_urls = article_store.article_urls(self.conn, "github")
+        self.sync_state[repo], fetched = github_fetcher.sync_repo(
+            self.session, repo, github_fetcher.REPOS[repo], self.sync_state.get(repo, {}), known_urls
+        )
+        if github_fetcher.save_articles(fetched, self.conn):
+            article_store.export_articles(self.conn, "github")
+        github_fetcher.save_sync_state(self.sync_state)
+        return list(fetched)
+
+    def poll(self, key, kind, target):
+        entry = self.schedule.setdefault(key, new_entry(kind))
+        try:
+            urls = self.poll_rss(target) if kind == "rss" else self.poll_github(target)
+        except Exception as e:
+            print(f"⚠️ Polling {target} failed: {e}")
+            record_failure(entry)
+            return
+        record_poll(entry, len(urls))
+        if urls:
+            print(f"📥 {len(urls)} new from {target} (next poll in {entry['interval'] / 60:.0f} min)")
+            self.queue.put(urls)
+
+    # ================== Processing ===================
+    def process_queue(self):
+        while not self.stop.is_set():
+            try:
+                batch = self.queue.get(timeout=MAX_SLEEP)
+            except queue.Empty:
+                continue
+            # Articles from sources polled back to back are processed together
+            deadline = time.monotonic() + BATCH_WAIT
+            while batch is not None:
+                try:
+                    more = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch = None if more is None else batch + more
+            try:
+                self.process(batch)
+            except Exception as e:
+                # The articles are stored; the next batch or restart picks them up
+                print(f"❌ Processing failed: {e}")
+
+    def process(self, urls):
+        """Carry `urls` (None: every article) through dedup, summaries and the IOC indexes."""
+        conn = article_store.connect()
+        try:
+            dedup_articles(conn)
+            generate_summaries.run(conn, urls=urls)
+        finally:
+            article_store.export_json(article_store.load_summaries(conn), generate_summaries.SUMMARY_PATH)
+        generate_ioc_index(conn=conn)
+        conn.close()
+
+    # ================== Main loop ===================
+    def run(self):
+        self.worker.start()
+        # Catch up on anything fetched while the daemon was down
+        self.queue.put(None)
+        while not self.stop.is_set():
+            sources = source_keys()
+            now = time.time()
+            for key, (kind, target) in sources.items():
+                if self.stop.is_set():
+                    break
+                if self.schedule.get(key, {}).get("next_due", 0) <= now:
+                    self.poll(key, kind, target)
+            for key in list(self.schedule):
+                if key not in sources:
+                    del self.schedule[key]
+            save_schedule(self.schedule)
+
+            next_due = min((e["next_due"] for e in self.schedule.values()), default=now + MAX_SLEEP)
+            self.stop.wait(min(MAX_SLEEP, max(0, next_due - time.time())))
+
+def main():
+    try:
+        acquire_lock()
+    except PipelineBusy as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+    daemon = IngestDaemon()
+
+    def shutdown(signum, frame):
+        if daemon.stop.is_set():
+            raise KeyboardInterrupt
+        print("🛑 Stopping after the current step (again to stop now)...")
+        daemon.stop.set()
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    print(f"🛰️ Ingestion daemon watching {len(source_keys())} sources.")
+    try:
+        daemon.run()
+        daemon.worker.join()
+    finally:
+        release_lock()
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,94 @@
 import json
 import os
 import glob
+from split_github_articles import MANIFEST_FILE
+from storage.json_stream import JsonObjectWriter, file_sha256, iter_json_object
 
 PART_PATTERN = "data/github_articles_part_*.json"
 MERGED_FILE = "data/github_articles.json"
 
-def merge_and_cleanup():
-    merged = {}
-    part_files = sorted(glob.glob(PART_PATTERN))
+def part_number(path):
+    return int(path.rsplit("_", 1)[1].split(".")[0])
 
+def list_parts(manifest_path):
+    """Part paths in merge order; every part named in the manifest must match its checksum."""
+    if not os.path.exists(manifest_path):
+        return sorted(glob.glob(PART_PATTERN), key=part_number), None
+
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    part_files = []
+    for part in manifest["parts"]:
+        path = os.path.join(os.path.dirname(manifest_path), part["file"])
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Missing fragment: {path}")
+        if file_sha256(path) != part["sha256"]:
+            raise ValueError(f"Checksum mismatch for {path}; fragments left in place.")
+        part_files.append(path)
+    return part_files, manifest
+
+def find_repeats(part_files):
+    """
+    Keys repeated across `part_files`, merged the way dict.update() would: a
+    repeated key keeps its first position and takes its last value.
+    Returns ({key: last value} for repeated keys, {positions of their later copies}).
+    Only repeated keys' values are kept in memory.
+    """
+    seen = set()
+    overrides, repeats = {}, set()
+    position = 0
     for part_file in part_files:
-        with open(part_file, "r") as f:
-            part_data = json.load(f)
-            merged.update(part_data)
-        print(f"🔗 Merged: {part_file}")
+        with open(part_file, "r", encoding="utf-8") as f:
+            for key, value in iter_json_object(f):
+                if key in seen:
+                    overrides[key] = value
+                    repeats.add(position)
+                else:
+                    seen.add(key)
+                position += 1
+    return overrides, repeats
+
+def merge_and_cleanup(manifest_path=os.path.join("data", MANIFEST_FILE)):
+    part_files, manifest = list_parts(manifest_path)
+    if not part_files:
+        print("⚠️ No fragments to merge.")
+        return
+
+    # Parts that match the manifest are what split_json() cut from one object,
+    # so no key repeats and a single pass will do. Loose parts are checked first.
+    overrides, repeats = ({}, set()) if manifest else find_repeats(part_files)
+
+    # Stream every entry straight into the merged file
+    writer = JsonObjectWriter(MERGED_FILE)
+    position = 0
+    try:
+        for part_file in part_files:
+            with open(part_file, "r", encoding="utf-8") as f:
+                for key, value in iter_json_object(f):
+                    if position not in repeats:
+                        writer.write(key, overrides.get(key, value))
+                    position += 1
+            print(f"🔗 Merged: {part_file}")
+    except Exception:
+        writer.abort()
+        raise
+    merged_sha256 = writer.close()
 
-    with open(MERGED_FILE, "w") as f:
-        json.dump(merged, f, indent=2)
+    expected = manifest["entries"] if manifest else position - len(repeats)
+    if file_sha256(MERGED_FILE) != merged_sha256 or writer.count != expected:
+        print(f"❌ {MERGED_FILE} did not verify; fragments left in place.")
+        return
+    if manifest and merged_sha256 != manifest["sha256"]:
+        print("⚠️ Merged file differs from the original that was split (it was not laid out like json.dump(indent=2)).")
 
     # Cleanup
     for part_file in part_files:
         os.remove(part_file)
         print(f"🗑️ Deleted: {part_file}")
+    if manifest:
+        os.remove(manifest_path)
 
-    print(f"\n✅ All fragments merged into {MERGED_FILE} with {len(merged)} entries.")
+    print(f"\n✅ All fragments merged into {MERGED_FILE} with {writer.count} entries.")
 
 if __name__ == "__main__":
-    merge_and_cleanup()
\ No newline at end of file
+    merge_and_cleanup()
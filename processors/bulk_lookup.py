@@ -0,0 +1,139 @@
+import csv
+import json
+import sys
+from processors.feed_lookup import FEED_FILES, IP_FEEDS, IP_TYPES, load_feed, load_ip_index
+from processors.ioc_extractor import HASH_TYPES, classify_indicator, scan_iocs
+from processors.ip_ranges import parse_ip_entry
+from storage import article_store
+
+BATCH_SIZE = 5000
+RANGE_TYPE = "cidr"  # CIDR blocks and "start-end" ranges in the input
+MAX_ARTICLES = 20    # Article links written per indicator
+
+REPORT_FIELDS = ["indicator", "type", "value", "malicious", "feeds", "articles"]
+
+def iter_indicators(lines):
+    """
+    Yield (indicator, ioc_type, normalized) for every indicator in `lines`.
+    A line may hold one indicator (blocklists, pasted lists) or several
+    (firewall/proxy log exports); hashes are reported as "hash", CIDR blocks
+    and ranges as RANGE_TYPE.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if ("/" in line or "-" in line) and not any(c in line for c in " ,;\t"):
+            networks = parse_ip_entry(line)
+            if networks:
+                yield line, RANGE_TYPE, ", ".join(str(n) for n in networks)
+                continue
+
+        found = False
+        for match in scan_iocs(line):
+            found = True
+            kind = "hash" if match.type in HASH_TYPES.values() else match.type
+            yield line[match.start:match.end], kind, match.value
+        if not found:
+            # Lone names such as "update.sh" are only domains when listed on their own
+            ioc_type, value = classify_indicator(line)
+            if ioc_type:
+                yield line, ioc_type, value
+
+def _match_batch(batch, feed_names, ip_index, conn):
+    wanted = set(feed_names)
+    # Articles mentioning each indicator, from the store's reverse index
+    article_map = article_store.ioc_article_urls(conn, [(ioc_type, value) for _, ioc_type, value in batch if ioc_type != RANGE_TYPE])
+    ip_feeds = wanted.intersection(IP_FEEDS)
+    feed_sets = [(name, load_feed(name)) for name in feed_names]
+
+    # Most addresses are clean: one merge walk filters them before the per-IP prefix probes
+    ip_rows = [row for row in batch if row[1] in IP_TYPES]
+    listed = dict(zip((row[2] for row in ip_rows), ip_index.contains_many([row[2] for row in ip_rows])))
+
+    for indicator, ioc_type, value in batch:
+        hits = set()
+        if ioc_type == RANGE_TYPE:
+            for _, sources in ip_index.overlapping(indicator):
+                hits.update(sources)
+            hits &= ip_feeds
+        else:
+            if ioc_type in IP_TYPES and listed.get(value):
+                for _, sources in ip_index.matching(value):
+                    hits.update(sources)
+                hits &= ip_feeds
+            for name, sets in feed_sets:
+                if name in hits or (ioc_type in IP_TYPES and name in IP_FEEDS):
+                    continue
+                if value in sets.get(ioc_type, ()):
+                    hits.add(name)
+
+        yield {
+            "indicator": indicator,
+            "type": ioc_type,
+            "value": value,
+            "malicious": bool(hits),
+            "feeds": [name for name in feed_names if name in hits],
+            "articles": article_map.get((ioc_type, value), []),
+        }
+
+def triage(lines, feed_names=None, batch_size=BATCH_SIZE, conn=None):
+    """
+    Check every indicator in `lines` against the feeds and the article IOC index.
+    Lazily yields one report row per unique indicator, batch_size at a time,
+    so arbitrarily large inputs run in constant memory (apart from the seen set).
+    """
+    feed_names = list(feed_names or FEED_FILES)
+    ip_index = load_ip_index()
+    conn = conn or article_store.connect()
+
+    seen = set()
+    batch = []
+    for indicator, ioc_type, value in iter_indicators(lines):
+        if (ioc_type, value) in seen:
+            continue
+        seen.add((ioc_type, value))
+        batch.append((indicator, ioc_type, value))
+        if len(batch) >= batch_size:
+            yield from _match_batch(batch, feed_names, ip_index, conn)
+            batch = []
+    if batch:
+        yield from _match_batch(batch, feed_names, ip_index, conn)
+
+def write_report(rows, fileobj, fmt="csv", hits_only=False):
+    """Stream report rows to `fileobj` as CSV or JSON lines. Returns (total, malicious)."""
+    total = malicious = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(fileobj, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+
+    for row in rows:
+        total += 1
+        if row["malicious"]:
+            malicious += 1
+        elif hits_only and not row["articles"]:
+            continue
+
+        if writer:
+            writer.writerow({
+                **row,
+                "feeds": ";".join(row["feeds"]),
+                "articles": ";".join(row["articles"][:MAX_ARTICLES]),
+            })
+        else:
+            fileobj.write(json.dumps(row) + "\n")
+    return total, malicious
+
+def triage_file(input_path, output_path, fmt="csv", feed_names=None, hits_only=False, conn=None):
+    """Triage `input_path` into a report at `output_path` ("-" for stdin/stdout). Returns (total, malicious)."""
+    src = sys.stdin if input_path == "-" else open(input_path, "r", errors="replace")
+    out = sys.stdout if output_path == "-" else open(output_path, "w", newline="")
+    try:
+        return write_report(triage(src, feed_names, conn=conn), out, fmt, hits_only)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,163 @@
+import hashlib
+import re
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset((
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid",
+    "_ga", "_gl", "ref", "ref_src", "cmpid", "ncid", "sr_share", "guccounter",
+))
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 16               # 16 bands of 4 rows: pairs at Jaccard 0.7 collide in ~99% of cases
+ROWS = NUM_PERM // BANDS
+NEAR_DUP_THRESHOLD = 0.7 # Estimated Jaccard at which two articles are the same story
+MIN_SHINGLES = 8         # Too little text to call anything a near-duplicate
+
+# One-permutation MinHash: each shingle is hashed once and lands in one of
+# NUM_PERM bins, so a signature costs O(shingles) rather than O(shingles * NUM_PERM).
+# The constants are fixed so signatures stored by one run compare with the next.
+MERSENNE_PRIME = (1 << 61) - 1
+MIX_A = 0x5BD1E995F3A7
+MIX_B = 0x27D4EB2F1656
+EMPTY_STEP = 1 << 56     # Keeps values borrowed by empty bins apart from real ones
+
+TAG_REGEX = re.compile(r"<[^>]+>")
+WORD_REGEX = re.compile(r"\w+")
+
+def normalize_url(url):
+    """
+    Canonical form of an article link for comparison: lowercase scheme and host,
+    no "www.", default port, fragment, tracking parameters or trailing slash,
+    remaining query parameters sorted.
+    """
+    parts = urlsplit((url or "").strip())
+    if not parts.netloc:
+        return (url or "").strip()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower()
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def article_words(article):
+    text = f"{article.get('title', '')}\n{article.get('content', '')}"
+    return WORD_REGEX.findall(TAG_REGEX.sub(" ", text).lower())
+
+def shingles(words, size=SHINGLE_WORDS):
+    """Stable 32-bit hashes of every run of `size` words."""
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(max(1, len(words) - size + 1))
+    } if words else set()
+
+def minhash(hashes):
+    bins = [None] * NUM_PERM
+    for h in hashes:
+        mixed = (MIX_A * h + MIX_B) % MERSENNE_PRIME
+        slot, value = mixed % NUM_PERM, mixed // NUM_PERM
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    # Densify: an empty bin borrows the next filled bin to its right, offset by
+    # the distance, so two texts agree on it exactly when they agree on that bin
+    signature = list(bins)
+    for i in range(NUM_PERM):
+        if bins[i] is None:
+            for distance in range(1, NUM_PERM):
+                borrowed = bins[(i + distance) % NUM_PERM]
+                if borrowed is not None:
+                    signature[i] = borrowed + distance * EMPTY_STEP
+                    break
+    return signature
+
+def fingerprint(url, article):
+    """
+    {"url_key", "exact", "minhash"} for one article. "exact" hashes the text with
+    markup, case and spacing removed; "minhash" is None for very short texts.
+    """
+    words = article_words(article)
+    hashes = shingles(words)
+    return {
+        "url_key": normalize_url(url),
+        "exact": hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest(),
+        "minhash": minhash(hashes) if len(hashes) >= MIN_SHINGLES else None,
+    }
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+def band_keys(signature):
+    return [(i, tuple(signature[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS)]
+
+class DedupIndex:
+    """
+    Finds the group an article belongs to: same normalized URL, same text, or
+    MinHash similarity of at least NEAR_DUP_THRESHOLD. Near-duplicate candidates
+    come from LSH band buckets, so each lookup touches only the few articles
+    sharing a band instead of every article seen so far.
+    """
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self.by_url_key = {}
+        self.by_exact = {}
+        self.buckets = {}
+        self.signatures = {}
+        self.canonical = {}
+
+    def add(self, url, fp, canonical=None):
+        """Record `url`, in the group of `canonical` (itself by default)."""
+        canonical = canonical or url
+        self.canonical[url] = canonical
+        self.by_url_key.setdefault(fp["url_key"], url)
+        self.by_exact.setdefault(fp["exact"], url)
+        if fp.get("minhash"):
+            self.signatures[url] = fp["minhash"]
+            for key in band_keys(fp["minhash"]):
+                self.buckets.setdefault(key, []).append(url)
+
+    def root(self, url):
+        # A canonical article can itself join another group later
+        while self.canonical.get(url, url) != url:
+            url = self.canonical[url]
+        return url
+
+    def find(self, fp):
+        """(canonical url, how) of the group `fp` belongs to, or (None, None)."""
+        match = self.by_url_key.get(fp["url_key"])
+        if match:
+            return self.root(match), "url"
+        match = self.by_exact.get(fp["exact"])
+        if match:
+            return self.root(match), "exact"
+        signature = fp.get("minhash")
+        if not signature:
+            return None, None
+
+        best, best_score = None, self.threshold
+        candidates = {url for key in band_keys(signature) for url in self.buckets.get(key, ())}
+        for url in candidates:
+            score = similarity(signature, self.signatures[url])
+            if score >= best_score:
+                best, best_score = url, score
+        return (self.root(best), "near") if best else (None, None)
+
+def group_members(fingerprints):
+    """{canonical url: [member urls, canonical first]} for groups of two or more."""
+    groups = {}
+    for url, fp in fingerprints.items():
+        canonical = fp.get("canonical", url)
+        if canonical != url and canonical in fingerprints:
+            groups.setdefault(canonical, [canonical]).append(url)
+    return groups
@@ -0,0 +1,188 @@
+import csv
+import os
+import threading
+from processors.ioc_extractor import classify_indicator
+from processors.ip_ranges import IPRangeIndex, parse_ip_entry
+from storage.feed_sets import compile_sets, compiled_path, open_compiled
+
+FEED_FILES = {
+    "OSINT Threat Feed": "data/osint.txt",
+    "C2 Hunt Feed": "data/c2.txt",
+    "IP Blocklist": "data/ip_blocklist.txt",
+    "Domain Blocklist": "data/domain_blocklist.txt",
+    "MD5 Hash Blocklist": "data/md5.txt",
+    "URL Blocklist": "data/url.txt",
+    "Bitcoin Address Intel": "data/bitcoin.txt",
+    "SHA File Hash Blocklist": "data/sha.txt"
+}
+
+# CSV feeds: which column holds which indicator type. Other columns
+# (dates, comments like "Generated by Threatview[.]io") are ignored.
+FEED_COLUMNS = {
+    "C2 Hunt Feed": {0: "ipv4", 2: "domain"},
+}
+
+# Feeds whose entries are IPs, CIDR blocks or "start-end" ranges
+IP_FEEDS = ("OSINT Threat Feed", "IP Blocklist", "C2 Hunt Feed")
+IP_TYPES = ("ipv4", "ipv6")
+
+RAW_TYPE = "raw"
+
+# feed name -> {"mtime": float, "size": int, "sets": {ioc_type: MappedSet or set(values)}}
+_FEED_CACHE = {}
+# IPRangeIndex over IP_FEEDS, rebuilt when any of them changes on disk
+_IP_INDEX_CACHE = {"signature": None, "index": None}
+_LOCK = threading.Lock()
+
+def iter_feed_values(name, path):
+    """Yield (expected_type or None, raw value) for every indicator in a feed file."""
+    with open(path, "r", errors="replace") as f:
+        columns = FEED_COLUMNS.get(name)
+        if columns:
+            for row in csv.reader(line for line in f if not line.startswith("#")):
+                for col, ioc_type in columns.items():
+                    if col < len(row):
+                        yield ioc_type, row[col]
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield None, line
+
+def parse_feed(name, path):
+    """
+    Read a feed file into {ioc_type: set(normalized values)}.
+    Lines that do not classify (malformed addresses, unsupported coins) are
+    kept verbatim under RAW_TYPE so they can still be matched exactly.
+    """
+    sets = {}
+    for expected_type, raw in iter_feed_values(name, path):
+        ioc_type, value = classify_indicator(raw)
+        if ioc_type is None:
+            ioc_type, value = RAW_TYPE, raw.strip()
+        elif expected_type and ioc_type != expected_type:
+            continue
+        if value:
+            sets.setdefault(ioc_type, set()).add(value)
+    return sets
+
+def load_compiled_feed(name, path, stat):
+    """
+    {ioc_type: MappedSet} from the feed's compiled, memory-mapped file
+    (storage/feed_sets.py), compiling it first if the feed changed since.
+    Every process maps the same file, so the OS shares its pages and startup
+    is a header read rather than a parse. Falls back to in-memory sets if the
+    compiled file cannot be written or read.
+    """
+    signature = (stat.st_mtime_ns, stat.st_size)
+    target = compiled_path(path)
+    compiled = open_compiled(target, signature)
+    if compiled is None:
+        sets = parse_feed(name, path)
+        try:
+            compile_sets(sets, target, signature)
+        except OSError as e:
+            print(f"⚠️ Could not compile {path}: {e}")
+            return sets
+        compiled = open_compiled(target, signature)
+        if compiled is None:
+            return sets
+    return compiled.sets
+
+def load_feed(name):
+    """
+    Typed sets for one feed, loaded once and reloaded only when the file's
+    mtime or size changes. Returns {} for unknown or missing feeds.
+    """
+    path = FEED_FILES.get(name)
+    if not path or not os.path.exists(path):
+        return {}
+    stat = os.stat(path)
+    cached = _FEED_CACHE.get(name)
+    if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+        return cached["sets"]
+
+    with _LOCK:
+        cached = _FEED_CACHE.get(name)
+        if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+            return cached["sets"]
+        sets = load_compiled_feed(name, path, stat)
+        _FEED_CACHE[name] = {"mtime": stat.st_mtime, "size": stat.st_size, "sets": sets}
+        return sets
+
+def _feed_signature(feed_names):
+    signature = []
+    for name in feed_names:
+        path = FEED_FILES.get(name)
+        if path and os.path.exists(path):
+            stat = os.stat(path)
+            signature.append((name, stat.st_mtime, stat.st_size))
+    return tuple(signature)
+
+def build_ip_index(feed_names=IP_FEEDS):
+    index = IPRangeIndex()
+    for name in feed_names:
+        path = FEED_FILES.get(name)
+        if not path or not os.path.exists(path):
+            continue
+        for expected_type, value in iter_feed_values(name, path):
+            if expected_type not in (None,) + IP_TYPES or index.add(value, name):
+                continue
+            # Defanged or zero-padded addresses
+            ioc_type, normalized = classify_indicator(value)
+            if ioc_type in IP_TYPES:
+                index.add(normalized, name)
+    return index.build()
+
+def load_ip_index():
+    """Shared IPRangeIndex over IP_FEEDS (IPs, CIDR blocks and ranges)."""
+    signature = _feed_signature(IP_FEEDS)
+    if _IP_INDEX_CACHE["signature"] == signature:
+        return _IP_INDEX_CACHE["index"]
+    with _LOCK:
+        if _IP_INDEX_CACHE["signature"] != signature:
+            _IP_INDEX_CACHE["index"] = build_ip_index()
+            _IP_INDEX_CACHE["signature"] = signature
+        return _IP_INDEX_CACHE["index"]
+
+def lookup_range(value, feed_names=None):
+    """
+    Which listed IPs / blocks in the IP feeds overlap the CIDR or range `value`.
+    Returns (normalized_value or None, [(network, [feed names])]).
+    """
+    networks = parse_ip_entry(value)
+    if not networks:
+        return None, []
+    wanted = set(feed_names or FEED_FILES)
+    hits = []
+    for network, sources in load_ip_index().overlapping(value):
+        sources = [s for s in sources if s in wanted]
+        if sources:
+            hits.append((network, sources))
+    return ", ".join(str(n) for n in networks), hits
+
+def lookup(value, feed_names=None):
+    """
+    Exact-match `value` against the given feeds (all feeds by default).
+    Returns (ioc_type, normalized_value, [names of feeds that list it]).
+    ioc_type is None when the input is not a recognizable indicator; it is
+    then matched verbatim against the unclassified feed lines.
+    """
+    ioc_type, normalized = classify_indicator(value)
+    set_type = ioc_type or RAW_TYPE
+    if ioc_type is None:
+        normalized = (value or "").strip()
+
+    feed_names = list(feed_names or FEED_FILES)
+    hits = set()
+    if ioc_type in IP_TYPES:
+        # Covers exact entries as well as CIDR blocks and ranges that contain the IP
+        for _, sources in load_ip_index().matching(normalized):
+            hits.update(sources)
+
+    for name in feed_names:
+        if name in hits or (ioc_type in IP_TYPES and name in IP_FEEDS):
+            continue
+        if normalized and normalized in load_feed(name).get(set_type, ()):
+            hits.add(name)
+    return ioc_type, normalized, [name for name in feed_names if name in hits]
@@ -0,0 +1,165 @@
+import io
+import re
+from processors.ioc_extractor import IOC_TYPES, classify_indicator, extract_iocs
+from storage.json_stream import JsonStreamError, iter_json_object
+
+# MISP galaxy cluster "type" -> entity type. Other galaxies (sectors,
+# countries, attack patterns, ...) are not entities we look up.
+GALAXY_ENTITY_TYPES = {
+    "threat-actor": "threat_actor",
+    "mitre-intrusion-set": "threat_actor",
+    "microsoft-activity-group": "threat_actor",
+    "malpedia": "malware",
+    "mitre-malware": "malware",
+    "ransomware": "malware",
+    "rat": "malware",
+    "backdoor": "malware",
+    "stealer": "malware",
+    "botnet": "malware",
+    "banker": "malware",
+    "android": "malware",
+    "exploit-kit": "malware",
+    "tool": "tool",
+    "mitre-tool": "tool",
+}
+ENTITY_LABELS = {"threat_actor": "Threat Actor", "malware": "Malware", "tool": "Tool", "yara_rule": "YARA Rule"}
+MAX_SYNONYMS = 20
+MAX_DESCRIPTION = 300
+GALAXY_KEYS = ("name", "description", "type", "values")
+
+YARA_RULE_START = re.compile(r"^\s*(?:(?:private|global)\s+)*rule\s+(\w+)\s*(?::\s*([\w ]+?))?\s*\{", re.MULTILINE)
+YARA_SECTION = re.compile(r"^\s*(meta|strings|condition)\s*:", re.MULTILINE)
+YARA_META = re.compile(r'^\s*(\w+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|(\S+))', re.MULTILINE)
+YARA_STRING = re.compile(r'^\s*\$\w*\s*=\s*"((?:[^"\\]|\\.)*)"', re.MULTILINE)
+# signature-base IOC files: "indicator;comment" or "indicator;score"
+IOC_LINE = re.compile(r"^([^;#\s][^;]*?)\s*;\s*(.*)$")
+
+def normalize_name(name):
+    return " ".join((name or "").lower().split())
+
+def galaxy_entities(cluster):
+    """
+    One entity per value of a decoded MISP galaxy cluster:
+    {"type", "name", "synonyms", "description", "country", "refs", "galaxy", "uuid"}.
+    Galaxies that are not entities (see GALAXY_ENTITY_TYPES) yield nothing.
+    """
+    galaxy = cluster.get("type")
+    entity_type = GALAXY_ENTITY_TYPES.get(galaxy)
+    if not entity_type:
+        return
+    for item in cluster.get("values") or ():
+        if not isinstance(item, dict) or not item.get("value"):
+            continue
+        meta = item.get("meta") or {}
+        synonyms = [s for s in meta.get("synonyms", []) if isinstance(s, str) and s != item["value"]]
+        yield {
+            "type": entity_type,
+            "name": item["value"],
+            "synonyms": synonyms[:MAX_SYNONYMS],
+            "description": (item.get("description") or "")[:MAX_DESCRIPTION],
+            "country": meta.get("country", ""),
+            "refs": meta.get("refs", [])[:5],
+            "galaxy": galaxy,
+            "uuid": item.get("uuid", ""),
+        }
+
+def read_galaxy_cluster(content, keys=GALAXY_KEYS):
+    """
+    The `keys` members of a cluster file, decoded one top-level member at a
+    time and stopping as soon as all of them are read. {} if it is not JSON.
+    """
+    cluster = {}
+    try:
+        for key, value in iter_json_object(io.StringIO(content)):
+            if key in keys:
+                cluster[key] = value
+                if len(cluster) == len(keys):
+                    break
+    except JsonStreamError:
+        return {}
+    return cluster
+
+def iter_galaxy_entities(content):
+    """galaxy_entities() straight from a cluster file's text."""
+    return galaxy_entities(read_galaxy_cluster(content))
+
+def _unescape(value):
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+def iter_yara_rules(content):
+    """
+    Yield {"name", "tags", "meta", "iocs"} for each rule of a YARA file.
+    `iocs` holds the indicators quoted in the rule's meta values and text
+    strings, so the regex and hex patterns are never mistaken for indicators.
+    """
+    starts = list(YARA_RULE_START.finditer(content))
+    for i, match in enumerate(starts):
+        body = content[match.end():starts[i + 1].start() if i + 1 < len(starts) else len(content)]
+        sections = {}
+        marks = list(YARA_SECTION.finditer(body))
+        for j, mark in enumerate(marks):
+            sections[mark.group(1)] = body[mark.end():marks[j + 1].start() if j + 1 < len(marks) else len(body)]
+
+        meta = {}
+        for key, quoted, bare in YARA_META.findall(sections.get("meta", "")):
+            meta.setdefault(key, _unescape(quoted) if quoted else bare)
+        quoted_strings = [_unescape(s) for s in YARA_STRING.findall(sections.get("strings", ""))]
+
+        yield {
+            "name": match.group(1),
+            "tags": (match.group(2) or "").split(),
+            "meta": meta,
+            "iocs": extract_iocs("\n".join(list(meta.values()) + quoted_strings)),
+        }
+
+def iter_ioc_lines(content):
+    """Yield (ioc_type, value, comment) for each recognizable line of an IOC file."""
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "//")):
+            continue
+        match = IOC_LINE.match(line)
+        value, comment = (match.group(1), match.group(2)) if match else (line, "")
+        ioc_type, normalized = classify_indicator(value)
+        if ioc_type:
+            yield ioc_type, normalized, comment
+
+def looks_like_ioc_file(lines, sample=20):
+    """True if most of the first `sample` data lines are "indicator;comment"."""
+    sampled = [line for line in lines if line and not line.startswith(("#", "//"))][:sample]
+    if not sampled:
+        return False
+    hits = 0
+    for line in sampled:
+        match = IOC_LINE.match(line)
+        if match and classify_indicator(match.group(1))[0]:
+            hits += 1
+    return hits * 2 > len(sampled)
+
+def group_typed(pairs):
+    """{ioc_type: [values]} in IOC_TYPES order from (ioc_type, value) pairs, deduplicated."""
+    grouped = {ioc_type: {} for ioc_type in IOC_TYPES}
+    for ioc_type, value in pairs:
+        grouped[ioc_type][value] = None
+    return {ioc_type: list(values) for ioc_type, values in grouped.items()}
+
+def merge_iocs(*ioc_dicts):
+    return group_typed(
+        (ioc_type, value)
+        for iocs in ioc_dicts
+        for ioc_type in IOC_TYPES
+        for value in (iocs or {}).get(ioc_type, [])
+    )
+
+def entity_aliases(entity):
+    """Normalized names an entity can be looked up by."""
+    return dict.fromkeys(normalize_name(n) for n in [entity.get("name")] + list(entity.get("synonyms", [])) if n)
+
+def build_entity_lookup(summaries):
+    """{normalized name or synonym: [(entity, url)]} over every summary's entities."""
+    lookup = {}
+    for url, entry in summaries.items():
+        for entity in entry.get("entities") or ():
+            for alias in entity_aliases(entity):
+                lookup.setdefault(alias, []).append((entity, url))
+    return lookup
@@ -1,22 +1,332 @@
+import hashlib
+import ipaddress
 import re
+from collections import namedtuple
+from urllib.parse import urlsplit
 
-# Simple regex patterns for common IOCs
+IOC_TYPES = ("ipv4", "ipv6", "url", "domain", "email", "hash", "cve", "btc", "eth", "asn")
+HASH_TYPES = {32: "md5", 40: "sha1", 64: "sha256"}
+
+# Every ASCII TLD in the IANA root zone (ICANN section of the public suffix list),
+# plus the alternate roots that show up in threat intel feeds. A short allowlist
+# misses the newer gTLDs C2 operators favour (.love, .rest, .services).
+TLDS = frozenset("""
+aaa aarp abarth abb abbott abbvie abc able abogado abudhabi ac academy accenture accountant accountants
+aco actor ad ads adult ae aeg aero aetna af afl africa ag agakhan agency ai aig airbus airforce airtel
+akdn al alfaromeo alibaba alipay allfinanz allstate ally alsace alstom am amazon americanexpress
+americanfamily amex amfam amica amsterdam analytics android anquan anz ao aol apartments app apple aq
+aquarelle ar arab aramco archi army arpa art arte as asda asia associates at athleta attorney au auction
+audi audible audio auspost author auto autos avianca aw aws ax axa az azure ba baby baidu banamex
+bananarepublic band bank bar barcelona barclaycard barclays barefoot bargains baseball basketball bauhaus
+bayern bb bbc bbt bbva bcg bcn bd be beats beauty beer bentley berlin best bestbuy bet bf bg bh bharti bi
+bible bid bike bing bingo bio biz bj black blackfriday blockbuster blog bloomberg blue bm bms bmw bn
+bnpparibas bo boats boehringer bofa bom bond boo book booking bosch bostik boston bot boutique box br
+bradesco bridgestone broadway broker brother brussels bs bt build builders business buy buzz bv bw by bz
+bzh ca cab cafe cal call calvinklein cam camera camp canon capetown capital capitalone car caravan cards
+care career careers cars casa case cash casino cat catering catholic cba cbn cbre cbs cc cd center ceo
+cern cf cfa cfd cg ch chanel channel charity chase chat cheap chintai christmas chrome church ci cipriani
+circle cisco citadel citi citic city cityeats ck cl claims cleaning click clinic clinique clothing cloud
+club clubmed cm cn co coach codes coffee college cologne com comcast commbank community company compare
+computer comsec condos construction consulting contact contractors cooking cookingchannel cool coop
+corsica country coupon coupons courses cpa cr credit creditcard creditunion cricket crown crs cruise
+cruises cu cuisinella cv cw cx cy cymru cyou cz dabur dad dance data date dating datsun day dclk dds de
+deal dealer deals degree delivery dell deloitte delta democrat dental dentist desi design dev dhl
+diamonds diet digital direct directory discount discover dish diy dj dk dm dnp do docs doctor dog domains
+dot download drive dtv dubai dunlop dupont durban dvag dvr dz earth eat ec eco edeka edu education ee eg
+email emerck energy engineer engineering enterprises epson equipment er ericsson erni es esq estate et
+etisalat eu eurovision eus events exchange expert exposed express extraspace fage fail fairwinds faith
+family fan fans farm farmers fashion fast fedex feedback ferrari ferrero fi fiat fidelity fido film final
+finance financial fire firestone firmdale fish fishing fit fitness fj fk flickr flights flir florist
+flowers fly fm fo foo food foodnetwork football ford forex forsale forum foundation fox fr free fresenius
+frl frogans frontdoor frontier ftr fujitsu fun fund furniture futbol fyi ga gal gallery gallo gallup game
+games gap garden gay gb gbiz gd gdn ge gea gent genting george gf gg ggee gh gi gift gifts gives giving
+gl glass gle global globo gm gmail gmbh gmo gmx gn godaddy gold goldpoint golf goo goodyear goog google
+gop got gov gp gq gr grainger graphics gratis green gripe grocery group gs gt gu guardian gucci guge
+guide guitars guru gw gy hair hamburg hangout haus hbo hdfc hdfcbank health healthcare help helsinki here
+hermes hgtv hiphop hisamitsu hitachi hiv hk hkt hm hn hockey holdings holiday homedepot homegoods homes
+homesense honda horse hospital host hosting hot hoteles hotels hotmail house how hr hsbc ht hu hughes
+hyatt hyundai ibm icbc ice icu id ie ieee ifm ikano il im imamat imdb immo immobilien in inc industries
+infiniti info ing ink institute insurance insure int international intuit investments io ipiranga iq ir
+irish is ismaili ist istanbul it itau itv jaguar java jcb je jeep jetzt jewelry jio jll jm jmp jnj jo
+jobs joburg jot joy jp jpmorgan jprs juegos juniper kaufen kddi ke kerryhotels kerrylogistics
+kerryproperties kfh kg kh ki kia kids kim kinder kindle kitchen kiwi km kn koeln komatsu kosher kp kpmg
+kpn kr krd kred kuokgroup kw ky kyoto kz la lacaixa lamborghini lamer lancaster lancia land landrover
+lanxess lasalle lat latino latrobe law lawyer lb lc lds lease leclerc lefrak legal lego lexus lgbt li
+lidl life lifeinsurance lifestyle lighting like lilly limited limo lincoln linde link lipsy live living
+lk llc llp loan loans locker locus lol london lotte lotto love lpl lplfinancial lr ls lt ltd ltda lu
+lundbeck luxe luxury lv ly ma macys madrid maif maison makeup man management mango map market marketing
+markets marriott marshalls maserati mattel mba mc mckinsey md me med media meet melbourne meme memorial
+men menu merckmsd mg mh miami microsoft mil mini mint mit mitsubishi mk ml mlb mls mm mma mn mo mobi
+mobile moda moe moi mom monash money monster mormon mortgage moscow moto motorcycles mov movie mp mq mr
+ms msd mt mtn mtr mu museum music mutual mv mw mx my mz na nab nagoya name natura navy nba nc ne nec net
+netbank netflix network neustar new news next nextdirect nexus nf nfl ng ngo nhk ni nico nike nikon ninja
+nissan nissay nl no nokia northwesternmutual norton now nowruz nowtv np nr nra nrw ntt nu nyc nz obi
+observer office okinawa olayan olayangroup oldnavy ollo om omega one ong onion onl online ooo open oracle
+orange org organic origins osaka otsuka ott ovh pa page panasonic paris pars partners parts party
+passagens pay pccw pe pet pf pfizer pg ph pharmacy phd philips phone photo photography photos physio pics
+pictet pictures pid pin ping pink pioneer pizza pk pl place play playstation plumbing plus pm pn pnc pohl
+poker politie porn post pr pramerica praxi press prime pro prod productions prof progressive promo
+properties property protection pru prudential ps pt pub pw pwc py qa qpon quebec quest racing radio re
+read realestate realtor realty recipes red redstone redumbrella rehab reise reisen reit reliance ren rent
+rentals repair report republican rest restaurant review reviews rexroth rich richardli ricoh ril rio rip
+ro rocher rocks rodeo rogers room rs rsvp ru rugby ruhr run rw rwe ryukyu sa saarland safe safety sakura
+sale salon samsclub samsung sandvik sandvikcoromant sanofi sap sarl sas save saxo sb sbi sbs sc sca scb
+schaeffler schmidt scholarships school schule schwarz science scot sd se search seat secure security seek
+select sener services seven sew sex sexy sfr sg sh shangrila sharp shaw shell shia shiksha shoes shop
+shopping shouji show showtime si silk sina singles site sj sk ski skin sky skype sl sling sm smart smile
+sn sncf so soccer social softbank software sohu solar solutions song sony soy spa space sport spot sr srl
+ss st stada staples star statebank statefarm stc stcgroup stockholm storage store stream studio study
+style su sucks supplies supply support surf surgery suzuki sv swatch swiss sx sy sydney systems sz tab
+taipei talk taobao target tatamotors tatar tattoo tax taxi tc tci td tdk team tech technology tel temasek
+tennis teva tf tg th thd theater theatre tiaa tickets tienda tiffany tips tires tirol tj tjmaxx tjx tk
+tkmaxx tl tm tmall tn to today tokyo tools top toray toshiba total tours town toyota toys tr trade
+trading training travel travelchannel travelers travelersinsurance trust trv tt tube tui tunes tushu tv
+tvs tw tz ua ubank ubs ug uk unicom university uno uol ups us uy uz va vacations vana vanguard vc ve
+vegas ventures verisign versicherung vet vg vi viajes video vig viking villas vin vip virgin visa vision
+viva vivo vlaanderen vn vodka volkswagen volvo vote voting voto voyage vu vuelos wales walmart walter
+wang wanggou watch watches weather weatherchannel webcam weber website wedding weibo weir wf whoswho wien
+wiki williamhill win windows wine winners wme wolterskluwer woodside work works world wow ws wtc wtf xbox
+xerox xfinity xihuan xin xxx xyz yachts yahoo yamaxun yandex ye yodobashi yoga yokohama you youtube yt
+yun za zappos zara zero zip zm zone zuerich zw
+geek parody
+""".split())
+
+# TLDs that double as common file extensions ("setup.py", "README.md"). A
+# bare single-label name ending in one of these is only taken as a domain when defanged.
+AMBIGUOUS_TLDS = frozenset(("cab", "java", "md", "mov", "pl", "ps", "py", "rs", "sc", "sh", "so", "zip"))
+
+# Defanged separators accepted inside indicators ("evil[.]com", "hxxp://", "user[@]mail")
+DOT = r"(?:\.|\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\))"
+AT = r"(?:@|\[@\]|\[at\]|\(at\))"
+LABEL = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+# The lookahead skips plain words quickly: no separator right after the first run, no domain.
+DOMAIN = rf"(?=[A-Za-z0-9-]+[.\[({{])(?:{LABEL}{DOT})+[A-Za-z]{{2,24}}(?![\w@\[-])"
+
+# Candidates are loose on purpose; octet ranges, hash lengths, TLDs and
+# address checksums are checked in Python.
 IOC_PATTERNS = {
-    "ipv4": r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
-    "url": r"https?://[^\s<>\"]+",
-    "hash": r"\b[a-fA-F0-9]{32,64}\b"
+    "url": r"(?:h(?:tt|xx|XX)ps?|HTTPS?|ftp)(?:://|\[://\]|\[:\]//)[^\s<>\"]+",
+    "cve": r"(?:CVE|cve)-\d{4}-\d{4,7}\b",
+    "asn": r"AS(?:N-?)?\d{1,10}\b",
+    "eth": r"0x[0-9A-Fa-f]{40}\b",
+    "ipv6": r"(?:[0-9A-Fa-f]{1,4}:){1,7}(?::|(?::[0-9A-Fa-f]{1,4}){1,6}|[0-9A-Fa-f]{1,4})(?![\w:])",
+    "ipv4": rf"(?<!\d\.)\d{{1,3}}{DOT}\d{{1,3}}{DOT}\d{{1,3}}{DOT}\d{{1,3}}(?!\w|\.\d)",
+    "hash": rf"[0-9A-Fa-f]{{32,64}}\b(?!{DOT}\w)",
+    "btc": r"(?:bc1[02-9ac-hj-np-z]{11,87}|[13][1-9A-HJ-NP-Za-km-z]{25,34})\b",
+    "domain": DOMAIN,
 }
 
+def _compile(names):
+    # One alternation so each document is scanned once. Every indicator
+    # starts at a word boundary, so the leading lookahead lets the engine
+    # reject most positions on a single character before trying any branch.
+    branches = "|".join(f"(?P<{name}>{IOC_PATTERNS[name]})" for name in names)
+    return re.compile(rf"(?=\w)\b(?:{branches})")
+
+# URLs come first: the host and any IPs or hashes inside a URL are picked up
+# separately (INNER_REGEX only re-scans the matched URL, not the document).
+# Emails have no branch of their own: a domain preceded by "@" is extended
+# backwards over the local part with LOCAL_PART_REGEX.
+IOC_REGEX = _compile(("url", "cve", "asn", "eth", "ipv6", "ipv4", "hash", "btc", "domain"))
+INNER_REGEX = _compile(("ipv4", "hash"))
+DOMAIN_REGEX = re.compile(DOMAIN)
+LOCAL_PART_REGEX = re.compile(rf"[A-Za-z0-9._%+-]{{1,64}}{AT}$")
+
+REFANG_REGEX = re.compile(r"\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\)|\[@\]|\[at\]|\(at\)|\[://\]|\[:\]|^h(?:xx|XX)p", re.IGNORECASE)
+REFANG_MAP = {"[.]": ".", "(.)": ".", "{.}": ".", "[dot]": ".", "(dot)": ".",
+              "[@]": "@", "[at]": "@", "(at)": "@", "[://]": "://", "[:]": ":"}
+
+URL_TRAILING_JUNK = ".,;:!?)]}'\""
+CHUNK_SIZE = 1 << 20  # Characters read per chunk when scanning files
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BECH32 = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+
+IOCMatch = namedtuple("IOCMatch", ["type", "value", "start", "end"])
+
+def refang(value):
+    """Undo common defanging: hxxp -> http, [.] -> ., [@] -> @, [:] -> :"""
+    return REFANG_REGEX.sub(lambda m: REFANG_MAP.get(m.group().lower(), "http"), value)
+
+def normalize_ipv4(value):
+    octets = refang(value).split(".")
+    if any(int(o) > 255 for o in octets):
+        return None
+    return ".".join(str(int(o)) for o in octets)
+
+def normalize_ipv6(value):
+    try:
+        ip = ipaddress.IPv6Address(value)
+    except ValueError:
+        return None
+    # Require a few real groups so things like "a::b" or "de:ad" in prose stay out
+    if sum(1 for group in value.split(":") if group) < 3:
+        return None
+    return ip.compressed
+
+def normalize_hash(value):
+    kind = HASH_TYPES.get(len(value))
+    return (kind, value.lower()) if kind else (None, None)
+
+def normalize_domain(value, strict=True):
+    domain = refang(value).lower().rstrip(".")
+    labels = domain.split(".")
+    if labels[-1] not in TLDS:
+        return None
+    if strict and labels[-1] in AMBIGUOUS_TLDS and len(labels) == 2 and domain == value.lower():
+        return None
+    return domain
+
+def normalize_asn(value):
+    number = int(re.sub(r"\D", "", value))
+    return f"AS{number}" if 0 < number < 2 ** 32 else None
+
+def valid_btc(value):
+    if value.startswith("bc1"):
+        return _bech32_valid(value)
+    num = 0
+    for char in value:
+        num = num * 58 + BASE58.index(char)
+    leading = len(value) - len(value.lstrip("1"))
+    raw = b"\x00" * leading + num.to_bytes((num.bit_length() + 7) // 8, "big")
+    if len(raw) != 25:
+        return False
+    return hashlib.sha256(hashlib.sha256(raw[:-4]).digest()).digest()[:4] == raw[-4:]
+
+def _bech32_valid(value):
+    generators = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    data = [BECH32.index(c) for c in value[3:]]
+    chk = 1
+    for v in [3, 3, 0, 2, 3] + data:  # hrp "bc" expanded
+        top = chk >> 25
+        chk = (chk & 0x1ffffff) << 5 ^ v
+        for i in range(5):
+            chk ^= generators[i] if (top >> i) & 1 else 0
+    return chk in (1, 0x2bc830a3)  # bech32 / bech32m
+
+def _url_host(url):
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+def _matches(regex, text, base):
+    for m in regex.finditer(text):
+        kind = m.lastgroup
+        value = m.group()
+        start, end = m.start() + base, m.end() + base
+
+        if kind == "url":
+            stripped = value.rstrip(URL_TRAILING_JUNK)
+            end -= len(value) - len(stripped)
+            url = refang(stripped)
+            yield IOCMatch("url", url, start, end)
+            host = _url_host(url)
+            domain = normalize_domain(host) if host and not host.replace(".", "").isdigit() else None
+            if domain:
+                yield IOCMatch("domain", domain, start, end)
+            yield from _matches(INNER_REGEX, stripped, start)
+        elif kind == "ipv4":
+            ip = normalize_ipv4(value)
+            if ip:
+                yield IOCMatch("ipv4", ip, start, end)
+        elif kind == "ipv6":
+            ip = normalize_ipv6(value)
+            if ip:
+                yield IOCMatch("ipv6", ip, start, end)
+        elif kind == "hash":
+            hash_kind, digest = normalize_hash(value)
+            if hash_kind:
+                yield IOCMatch(hash_kind, digest, start, end)
+        elif kind == "domain":
+            domain = normalize_domain(value)
+            if not domain:
+                continue
+            local = LOCAL_PART_REGEX.search(text, max(0, m.start() - 72), m.start())
+            if local:
+                yield IOCMatch("email", refang(local.group()).lower() + domain, local.start() + base, end)
+            else:
+                yield IOCMatch("domain", domain, start, end)
+        elif kind == "cve":
+            yield IOCMatch("cve", value.upper(), start, end)
+        elif kind == "asn":
+            asn = normalize_asn(value)
+            if asn:
+                yield IOCMatch("asn", asn, start, end)
+        elif kind == "eth":
+            yield IOCMatch("eth", value.lower(), start, end)
+        elif kind == "btc":
+            if valid_btc(value):
+                yield IOCMatch("btc", value, start, end)
+
+def scan_iocs(text, base_offset=0):
+    """
+    Single pass over `text`, yielding validated, refanged and normalized
+    IOCMatch tuples with character offsets. Types are those in IOC_TYPES,
+    except hashes, which are reported as md5, sha1 or sha256.
+    Not deduplicated.
+    """
+    if not text:
+        return iter(())
+    return _matches(IOC_REGEX, text, base_offset)
+
+def scan_iocs_stream(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    scan_iocs() over a text file object, one chunk at a time.
+    IOCs never contain whitespace, so each chunk is cut at its last whitespace
+    and the remainder carried into the next one; no match is split or lost.
+    """
+    carry = ""
+    offset = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        buffer = carry + chunk
+        if not chunk:
+            yield from scan_iocs(buffer, offset)
+            return
+
+        cut = max(buffer.rfind(" "), buffer.rfind("\n"), buffer.rfind("\t"), buffer.rfind("\r")) + 1
+        if cut == 0:
+            carry = buffer
+            continue
+        yield from scan_iocs(buffer[:cut], offset)
+        offset += cut
+        carry = buffer[cut:]
+
+def group_iocs(matches):
+    """Deduplicate matches into {ioc_type: [values]} for every type in IOC_TYPES, keeping first-seen order."""
+    grouped = {kind: {} for kind in IOC_TYPES}
+    for match in matches:
+        kind = "hash" if match.type in HASH_TYPES.values() else match.type
+        grouped[kind].setdefault(match.value, None)
+    return {kind: list(values) for kind, values in grouped.items()}
+
 def extract_iocs(text):
     """
     Extract IOCs from a given string.
-    Returns a dictionary of IPs, URLs, Hashes.
+    Returns {ioc_type: [values]} with a (possibly empty) list for every type in IOC_TYPES.
     """
-    if not text:
-        return {"ipv4": [], "url": [], "hash": []}
+    return group_iocs(scan_iocs(text))
+
+def classify_indicator(value):
+    """
+    Work out what a single indicator is.
+    Returns (ioc_type, normalized_value), or (None, None) when `value` as a whole
+    is not a recognizable IOC. Hashes are reported under the "hash" type.
+    """
+    value = (value or "").strip()
+    for match in scan_iocs(value):
+        if match.start == 0 and match.end == len(value.rstrip(URL_TRAILING_JUNK)):
+            kind = "hash" if match.type in HASH_TYPES.values() else match.type
+            return kind, match.value
+
+    # A lone "name.sh" is ambiguous inside prose but clearly meant as a domain here
+    if DOMAIN_REGEX.fullmatch(value):
+        domain = normalize_domain(value, strict=False)
+        if domain:
+            return "domain", domain
+    return None, None
 
-    return {
-        "ipv4": re.findall(IOC_PATTERNS["ipv4"], text),
-        "url": re.findall(IOC_PATTERNS["url"], text),
-        "hash": re.findall(IOC_PATTERNS["hash"], text)
-    }
+def extract_iocs_from_file(path, chunk_size=CHUNK_SIZE):
+    """extract_iocs() for files too large to read in one go."""
+    with open(path, "r", errors="replace") as f:
+        return group_iocs(scan_iocs_stream(f, chunk_size))
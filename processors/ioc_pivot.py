@@ -0,0 +1,97 @@
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from processors.ioc_extractor import IOC_TYPES, classify_indicator
+from storage import article_store
+
+# Indicators mentioned by more articles than this (8.8.8.8, github.com, ...)
+# say nothing about how those articles relate, so they never link a cluster.
+MAX_CLUSTER_FANOUT = 50
+
+# The reverse index lives in the store's ioc_articles table (one row per
+# indicator and article), kept current by generate_ioc_index.py.
+
+def article_date(article, entry=None):
+    """ISO date (YYYY-MM-DD) an article was published, falling back to when it was summarized."""
+    published = (article or {}).get("published", "")
+    if published:
+        try:
+            return parsedate_to_datetime(published).date().isoformat()
+        except (TypeError, ValueError):
+            try:
+                return datetime.fromisoformat(published.rstrip("Z")).date().isoformat()
+            except ValueError:
+                pass
+    generated = ((entry or {}).get("llm_meta") or {}).get("generated_on", "")
+    return generated.split("T")[0]
+
+def iter_ioc_keys(iocs):
+    """Unique (ioc_type, value) pairs of one article's IOCs."""
+    return dict.fromkeys(
+        (ioc_type, value)
+        for ioc_type in IOC_TYPES
+        for value in (iocs or {}).get(ioc_type, [])
+    )
+
+def pivot(conn, value):
+    """
+    Everything known about one indicator, from the store's reverse index:
+    {"type", "value", "count", "first_seen", "last_seen", "articles": [(url, date)] newest first},
+    or None if no article mentions it.
+    """
+    ioc_type, normalized = classify_indicator(value)
+    if ioc_type is None:
+        return None
+    count, first_seen, last_seen = article_store.ioc_stats(conn, ioc_type, normalized)
+    if not count:
+        return None
+    return {
+        "type": ioc_type,
+        "value": normalized,
+        "count": count,
+        "first_seen": first_seen,
+        "last_seen": last_seen,
+        "articles": article_store.ioc_articles(conn, ioc_type, normalized),
+    }
+
+def cluster_articles(conn, urls, exclude=(), max_fanout=MAX_CLUSTER_FANOUT):
+    """
+    Group `urls` that share indicators (transitively), using union-find over
+    the reverse index; (ioc_type, value) keys in `exclude` never link articles.
+    Returns [(sorted urls, sorted shared (ioc_type, value))], largest first;
+    articles that share nothing are left out.
+    """
+    parent = {url: url for url in urls}
+
+    def find(url):
+        while parent[url] != url:
+            parent[url] = parent[parent[url]]
+            url = parent[url]
+        return url
+
+    shared = []
+    seen_keys = set(exclude)
+    for url in sorted(parent):
+        for ioc_type, value in iter_ioc_keys(article_store.get_iocs(conn, url)):
+            if (ioc_type, value) in seen_keys:
+                continue
+            seen_keys.add((ioc_type, value))
+            mentions = article_store.ioc_articles(conn, ioc_type, value, limit=max_fanout + 1)
+            if len(mentions) > max_fanout:
+                continue
+            linked = [other for other, _ in mentions if other in parent]
+            if len(linked) < 2:
+                continue
+            shared.append((ioc_type, value, linked[0]))
+            root = find(linked[0])
+            for other in linked[1:]:
+                parent[find(other)] = root
+
+    clusters = {}
+    for url in parent:
+        clusters.setdefault(find(url), {"urls": [], "iocs": []})["urls"].append(url)
+    for ioc_type, value, url in shared:
+        clusters[find(url)]["iocs"].append((ioc_type, value))
+
+    result = [(sorted(c["urls"]), sorted(c["iocs"])) for c in clusters.values() if len(c["urls"]) > 1]
+    result.sort(key=lambda c: len(c[0]), reverse=True)
+    return result
@@ -0,0 +1,188 @@
+import ipaddress
+from bisect import bisect_left, bisect_right
+
+def parse_ip_entry(value):
+    """
+    "1.2.3.4", "1.2.3.0/24" or "1.2.3.4-1.2.3.20" -> list of ip_network objects
+    (ranges are split into the CIDR blocks that cover them exactly).
+    Returns [] for anything else.
+    """
+    value = (value or "").strip()
+    try:
+        if "-" in value:
+            first, last = (ipaddress.ip_address(part.strip()) for part in value.split("-", 1))
+            return list(ipaddress.summarize_address_range(first, last))
+        return [ipaddress.ip_network(value, strict=False)]
+    except (ValueError, TypeError):
+        return []
+
+class IPRangeIndex:
+    """
+    Listed IPs and networks, answering point, overlap and longest-prefix
+    queries in logarithmic time.
+
+    Every entry is stored as a CIDR block. Three views are kept per IP version:
+    - merged, sorted [start, end] intervals for point and batch membership (bisect),
+    - blocks sorted by start address for overlap queries (bisect),
+    - {prefix_len: {network_int: sources}} for longest-prefix match,
+      at most 33 (IPv4) or 129 (IPv6) dict probes per query.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._versions = {}
+
+    def add(self, value, source=None):
+        """Add an IP, CIDR or range. Returns False if `value` is not one."""
+        networks = parse_ip_entry(value)
+        for network in networks:
+            self._pending.append((network, source))
+        return bool(networks)
+
+    def build(self):
+        by_version = {4: {}, 6: {}}
+        for network, source in self._pending:
+            by_prefix = by_version[network.version].setdefault(network.prefixlen, {})
+            sources = by_prefix.setdefault(int(network.network_address), set())
+            if source:
+                sources.add(source)
+        self._pending = []
+
+        self._versions = {}
+        for version, by_prefix in by_version.items():
+            max_prefix = 32 if version == 4 else 128
+            blocks = sorted(
+                (net, net + (1 << (max_prefix - prefix)) - 1, prefix)
+                for prefix, nets in by_prefix.items()
+                for net in nets
+            )
+            merged_starts, merged_ends = [], []
+            for start, end, _ in blocks:
+                if merged_ends and start <= merged_ends[-1] + 1:
+                    merged_ends[-1] = max(merged_ends[-1], end)
+                else:
+                    merged_starts.append(start)
+                    merged_ends.append(end)
+
+            self._versions[version] = {
+                "max_prefix": max_prefix,
+                "by_prefix": by_prefix,
+                "prefixes": sorted(by_prefix, reverse=True),
+                "blocks": blocks,
+                "block_starts": [b[0] for b in blocks],
+                "merged_starts": merged_starts,
+                "merged_ends": merged_ends,
+            }
+        return self
+
+    def _table(self, address):
+        return self._versions.get(address.version)
+
+    def __len__(self):
+        return sum(len(t["blocks"]) for t in self._versions.values())
+
+    def contains(self, ip):
+        """True if `ip` falls inside any listed IP, block or range."""
+        try:
+            address = ipaddress.ip_address(ip.strip() if isinstance(ip, str) else ip)
+        except ValueError:
+            return False
+        table = self._table(address)
+        if not table:
+            return False
+        value = int(address)
+        i = bisect_right(table["merged_starts"], value) - 1
+        return i >= 0 and value <= table["merged_ends"][i]
+
+    def matching(self, ip):
+        """All listed blocks containing `ip`, most specific first: [(network_str, sources)]."""
+        try:
+            address = ipaddress.ip_address(ip.strip() if isinstance(ip, str) else ip)
+        except ValueError:
+            return []
+        table = self._table(address)
+        if not table:
+            return []
+        value = int(address)
+        hits = []
+        for prefix in table["prefixes"]:
+            net = value >> (table["max_prefix"] - prefix) << (table["max_prefix"] - prefix)
+            sources = table["by_prefix"][prefix].get(net)
+            if sources is not None:
+                hits.append((self._format(address.version, net, prefix), sorted(sources)))
+        return hits
+
+    def longest_prefix(self, ip):
+        """The most specific listed block containing `ip`, or None."""
+        hits = self.matching(ip)
+        return hits[0] if hits else None
+
+    def overlapping(self, value):
+        """
+        Listed blocks that intersect the CIDR / range / IP `value`:
+        blocks inside it plus any supernets that cover it. [(network_str, sources)]
+        """
+        results = []
+        for query in parse_ip_entry(value):
+            table = self._versions.get(query.version)
+            if not table:
+                continue
+            lo = int(query.network_address)
+            hi = int(query.broadcast_address)
+
+            # Blocks starting inside the query; CIDR blocks never straddle its start
+            i = bisect_left(table["block_starts"], lo)
+            j = bisect_right(table["block_starts"], hi)
+            for start, _, prefix in table["blocks"][i:j]:
+                results.append((query.version, start, prefix))
+
+            # Blocks starting before it can only overlap by containing it entirely
+            for prefix in table["prefixes"]:
+                if prefix >= query.prefixlen:
+                    continue
+                shift = table["max_prefix"] - prefix
+                net = lo >> shift << shift
+                if net in table["by_prefix"][prefix] and net < lo:
+                    results.append((query.version, net, prefix))
+
+        out = []
+        for key in dict.fromkeys(results):
+            version, start, prefix = key
+            sources = self._versions[version]["by_prefix"][prefix][start]
+            out.append((self._format(version, start, prefix), sorted(sources)))
+        return out
+
+    def contains_many(self, ips):
+        """
+        Batch membership: one sort of the queries plus a single merge walk over
+        the intervals. Returns a list of booleans in the order of `ips`.
+        """
+        results = [False] * len(ips)
+        queries = {4: [], 6: []}
+        for pos, ip in enumerate(ips):
+            try:
+                address = ipaddress.ip_address(ip.strip() if isinstance(ip, str) else ip)
+            except ValueError:
+                continue
+            queries[address.version].append((int(address), pos))
+
+        for version, items in queries.items():
+            table = self._versions.get(version)
+            if not table or not items:
+                continue
+            items.sort()
+            starts, ends = table["merged_starts"], table["merged_ends"]
+            k = 0
+            for value, pos in items:
+                while k < len(starts) and ends[k] < value:
+                    k += 1
+                if k == len(starts):
+                    break
+                results[pos] = starts[k] <= value
+        return results
+
+    @staticmethod
+    def _format(version, net, prefix):
+        address = ipaddress.IPv4Address(net) if version == 4 else ipaddress.IPv6Address(net)
+        max_prefix = 32 if version == 4 else 128
+        return str(address) if prefix == max_prefix else f"{address}/{prefix}"
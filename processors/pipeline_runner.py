@@ -0,0 +1,279 @@
+import collections
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_PATH = "data/pipeline.lock"
+LOG_LINES = 200           # Output lines kept per job for the dashboard
+CANCEL_GRACE = 10         # Seconds a stage gets to exit after being interrupted before it is killed
+# SIGINT raises KeyboardInterrupt in the stage, so its finally blocks still
+# export what it checkpointed (generate_summaries.py publishes summaries.json)
+CANCEL_SIGNAL = signal.SIGTERM if os.name == "nt" else signal.SIGINT
+
+# Each stage is its own process: a crash, leak or hung request in one stage
+# never takes the dashboard down, and cancelling is just terminating it.
+STAGES = (
+    ("fetch", "RSS feeds", [sys.executable, "-m", "feeds.fetcher"]),
+    ("github", "GitHub sync", [sys.executable, "-m", "feeds.github_fetcher"]),
+    ("dedup", "Deduplicate", [sys.executable, "dedup_articles.py"]),
+    ("summarize", "Summarize", [sys.executable, "generate_summaries.py"]),
+    ("ioc_index", "IOC index", [sys.executable, "generate_ioc_index.py"]),
+)
+
+# "[12/340]" in a stage's output is its progress
+PROGRESS_REGEX = re.compile(r"\[(\d+)/(\d+)\]")
+
+_lock = threading.Lock()
+_current = None   # The running (or last finished) job
+_lock_files = {}  # lock path -> open file holding the OS lock
+
+class PipelineBusy(RuntimeError):
+    pass
+
+def _try_lock(f):
+    try:
+        if os.name == "nt":
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+def _unlock(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def acquire_lock(path=LOCK_PATH):
+    """
+    Cross-process lock so a dashboard run, a cron run and a second dashboard never
+    write the same files at once. The OS holds it (flock, or msvcrt on Windows)
+    and drops it when the holder exits, however it exits, so there is nothing
+    stale to take over. The file itself stays; it only records the holder's pid.
+    """
+    f = open(path, "a+")
+    f.seek(0)
+    if not _try_lock(f):
+        try:
+            pid = f.read().strip()
+        except OSError:
+            pid = ""
+        f.close()
+        raise PipelineBusy(f"Pipeline already running (pid {pid})" if pid else "Pipeline already running")
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    _lock_files[path] = f
+
+def release_lock(path=LOCK_PATH):
+    f = _lock_files.pop(path, None)
+    if f is None:
+        return
+    try:
+        f.truncate(0)
+        _unlock(f)
+    finally:
+        f.close()
+
+class PipelineJob:
+    """One pipeline run in a background thread, with per-stage status and output."""
+
+    def __init__(self, stages=STAGES, cwd=None, echo=False):
+        self.id = uuid.uuid4().hex[:8]
+        self.cwd = cwd or os.getcwd()
+        self.echo = echo  # Also print stage output, for runs from the shell
+        self.status = "pending"
+        self.started = None
+        self.finished = None
+        self.stages = [
+            {"name": name, "label": label, "command": command, "status": "pending",
+             "started": None, "duration": None, "progress": None, "returncode": None}
+            for name, label, command in stages
+        ]
+        self.log = collections.deque(maxlen=LOG_LINES)
+        self._cancel = threading.Event()
+        self._process = None
+        self._state_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.id}", daemon=True)
+
+    def start(self):
+        self.status = "running"
+        self.started = time.time()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Interrupt the stage in progress and skip the rest."""
+        self._cancel.set()
+        with self._state_lock:
+            process = self._process
+        if process:
+            self._interrupt(process)
+
+    @staticmethod
+    def _interrupt(process):
+        if process.poll() is not None:
+            return
+        process.send_signal(CANCEL_SIGNAL)
+        # Killed if it is still around after the grace period
+        killer = threading.Timer(CANCEL_GRACE, lambda: process.poll() is None and process.kill())
+        killer.daemon = True
+        killer.start()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.status
+
+    @property
+    def running(self):
+        return self.status == "running"
+
+    def snapshot(self):
+        """A copy of the job state that is safe to read from another thread."""
+        with self._state_lock:
+            stages = [dict(stage) for stage in self.stages]
+            log = list(self.log)
+        now = time.time()
+        for stage in stages:
+            if stage["status"] == "running":
+                stage["duration"] = now - stage["started"]
+        return {
+            "id": self.id,
+            "status": self.status,
+            "started": self.started,
+            "elapsed": (self.finished or now) - self.started if self.started else 0,
+            "stages": stages,
+            "log": log,
+        }
+
+    def _run_stage(self, stage):
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+        process = subprocess.Popen(
+            stage["command"], cwd=self.cwd, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace", bufsize=1,
+        )
+        with self._state_lock:
+            self._process = process
+        if self._cancel.is_set():
+            self._interrupt(process)
+
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            if self.echo:
+                print(line, flush=True)
+            match = PROGRESS_REGEX.search(line)
+            with self._state_lock:
+                self.log.append(f"[{stage['name']}] {line}")
+                if match:
+                    stage["progress"] = (int(match.group(1)), int(match.group(2)))
+
+        returncode = process.wait()
+        with self._state_lock:
+            self._process = None
+        return returncode
+
+    def _run(self):
+        try:
+            for stage in self.stages:
+                if self._cancel.is_set():
+                    stage["status"] = "skipped"
+                    continue
+                stage["status"] = "running"
+                stage["started"] = time.time()
+                try:
+                    stage["returncode"] = self._run_stage(stage)
+                except OSError as e:
+                    with self._state_lock:
+                        self.log.append(f"[{stage['name']}] ❌ {e}")
+                    stage["returncode"] = -1
+                stage["duration"] = time.time() - stage["started"]
+
+                if self._cancel.is_set():
+                    stage["status"] = "cancelled"
+                elif stage["returncode"] == 0:
+                    stage["status"] = "done"
+                else:
+                    stage["status"] = "failed"
+                    # Later stages would work from half-updated data
+                    self._cancel.set()
+            failed = any(stage["status"] == "failed" for stage in self.stages)
+            self.status = "failed" if failed else "cancelled" if self._cancel.is_set() else "done"
+        finally:
+            self.finished = time.time()
+            release_lock()
+
+def start_pipeline(stages=STAGES, echo=False):
+    """
+    Start a pipeline run in the background and return its job right away.
+    Raises PipelineBusy if a run is already in progress here or in another process.
+    """
+    global _current
+    with _lock:
+        if _current and _current.running:
+            raise PipelineBusy(f"Pipeline job {_current.id} is already running")
+        acquire_lock()
+        try:
+            _current = PipelineJob(stages, echo=echo).start()
+        except Exception:
+            release_lock()
+            raise
+        return _current
+
+def current_job():
+    return _current
+
+def cancel_pipeline():
+    job = _current
+    if job and job.running:
+        job.cancel()
+        return True
+    return False
+
+def format_status(snapshot):
+    """Markdown progress report of a job snapshot."""
+    icons = {"pending": "⏸️", "running": "⏳", "done": "✅", "failed": "❌", "cancelled": "🛑", "skipped": "⏭️"}
+    md = f"**Job {snapshot['id']}** — {icons.get(snapshot['status'], '')} {snapshot['status']} ({snapshot['elapsed']:.0f}s)\n\n"
+    for stage in snapshot["stages"]:
+        line = f"- {icons.get(stage['status'], '')} **{stage['label']}**"
+        if stage["duration"] is not None:
+            line += f" — {stage['duration']:.1f}s"
+        if stage["progress"]:
+            done, total = stage["progress"]
+            line += f" • {done}/{total} ({100 * done // max(1, total)}%)"
+        if stage["status"] == "failed":
+            line += f" • exit code {stage['returncode']}"
+        md += line + "\n"
+    return md
+
+if __name__ == "__main__":
+    try:
+        job = start_pipeline(echo=True)
+    except PipelineBusy as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+    try:
+        while job.wait(timeout=1) == "running":
+            pass
+    except KeyboardInterrupt:
+        print("🛑 Cancelling pipeline...")
+        job.cancel()
+        job.wait()
+    print(format_status(job.snapshot()))
+    sys.exit(0 if job.status == "done" else 1)
@@ -1,7 +1,36 @@
+from urllib.parse import urlsplit
+
+# Points per indicator; network infrastructure weighs more than reference data
+IOC_WEIGHTS = {
+    "ipv4": 2,
+    "ipv6": 2,
+    "url": 3,
+    "domain": 2,
+    "email": 1,
+    "hash": 1,
+    "cve": 2,
+    "btc": 1,
+    "eth": 1,
+    "asn": 1,
+}
+
+def _url_hosts(urls):
+    hosts = set()
+    for url in urls:
+        try:
+            hosts.add(urlsplit(url).hostname or "")
+        except ValueError:
+            continue
+    return hosts
+
 def calculate_risk_score(iocs: dict) -> int:
     score = 0
-    score += len(iocs.get("ipv4", [])) * 2
-    score += len(iocs.get("url", [])) * 3
-    score += len(iocs.get("hash", [])) * 1
+    for ioc_type, weight in IOC_WEIGHTS.items():
+        values = iocs.get(ioc_type, [])
+        if ioc_type == "domain":
+            # The extractor also reports each URL's host as a domain; the URL already scored it
+            hosts = _url_hosts(iocs.get("url", []))
+            values = [domain for domain in values if domain not in hosts]
+        score += len(values) * weight
 
     return min(score, 10)  # clamp between 0 and 10
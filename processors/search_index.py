@@ -0,0 +1,171 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+# Words, plus whole indicators ("185.1.2.3", "cve-2024-1234", "evil-site.com")
+# as single tokens so they can be searched for as typed.
+WORD_REGEX = re.compile(r"\w+")
+COMPOUND_REGEX = re.compile(r"\b(?=\w+[.:@/\-]\w)\w+(?:[.:@/\-]\w+)+")
+QUERY_REGEX = re.compile(r"\w+(?:[.:@/\-]\w+)*")
+
+FIELD_WEIGHTS = {"title": 3, "entity": 3, "ioc": 2}  # Per occurrence; summary words count 1
+EXACT_BONUS = 2.0        # A term matching a whole token outranks a prefix match
+MIN_PREFIX = 3           # Shorter terms only match whole tokens
+MAX_CACHED_QUERIES = 64
+SORT_ORDERS = ("Most Relevant", "Newest First", "Oldest First")
+
+def tokenize(text):
+    text = (text or "").lower()
+    return WORD_REGEX.findall(text) + COMPOUND_REGEX.findall(text)
+
+class SearchIndex:
+    """
+    Token -> {doc_id: weight} inverted index over summary titles, texts, IOCs
+    and parsed entities (threat actor, malware and rule names with their synonyms).
+
+    Query terms of MIN_PREFIX or more characters are prefixes, resolved against the sorted vocabulary with
+    bisect; terms are ANDed, smallest posting set first. Only the requested
+    page is ranked (heapq), never the whole result set.
+    Documents can be added, replaced and removed one at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.postings = {}
+        self.doc_ids = {}       # url -> doc_id
+        self.urls = []          # doc_id -> url (None once removed)
+        self.dates = []         # doc_id -> ISO date used for date ordering
+        self.doc_tokens = []    # doc_id -> tokens, to undo postings on removal
+        self._vocab = []
+        self._by_date = []
+        self._dirty = False
+        self._queries = {}
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, url, title="", summary="", iocs=None, date="", entities=None):
+        """Index (or re-index) one document."""
+        weights = Counter(tokenize(summary))
+        for token in tokenize(title):
+            weights[token] += FIELD_WEIGHTS["title"]
+        for entity in entities or ():
+            for token in tokenize(" ".join([entity.get("name", "")] + list(entity.get("synonyms", [])))):
+                weights[token] += FIELD_WEIGHTS["entity"]
+        for values in (iocs or {}).values():
+            for token in tokenize(" ".join(values)):
+                weights[token] += FIELD_WEIGHTS["ioc"]
+
+        with self._lock:
+            self.remove(url)
+            doc_id = len(self.urls)
+            self.doc_ids[url] = doc_id
+            self.urls.append(url)
+            self.dates.append(date or "")
+            self.doc_tokens.append(tuple(weights))
+            for token, weight in weights.items():
+                self.postings.setdefault(token, {})[doc_id] = weight
+            self._changed()
+
+    def remove(self, url):
+        with self._lock:
+            doc_id = self.doc_ids.pop(url, None)
+            if doc_id is None:
+                return
+            for token in self.doc_tokens[doc_id]:
+                docs = self.postings.get(token)
+                if docs is not None:
+                    docs.pop(doc_id, None)
+                    if not docs:
+                        del self.postings[token]
+            self.urls[doc_id] = None
+            self.doc_tokens[doc_id] = ()
+            self._changed()
+
+    def copy(self):
+        """An independent copy to update while readers keep querying this one."""
+        with self._lock:
+            clone = SearchIndex()
+            clone.postings = {token: dict(docs) for token, docs in self.postings.items()}
+            clone.doc_ids = dict(self.doc_ids)
+            clone.urls = list(self.urls)
+            clone.dates = list(self.dates)
+            clone.doc_tokens = list(self.doc_tokens)
+            clone._dirty = True
+            return clone
+
+    def _changed(self):
+        self._dirty = True
+        self._queries = {}
+
+    def _refresh(self):
+        if self._dirty:
+            self._vocab = sorted(self.postings)
+            self._by_date = sorted(self.doc_ids.values(), key=lambda d: self.dates[d])
+            self._dirty = False
+
+    def _match_term(self, term):
+        """{doc_id: score} for every document holding a token that starts with `term`."""
+        if len(term) < MIN_PREFIX:
+            return {doc_id: weight * EXACT_BONUS for doc_id, weight in self.postings.get(term, {}).items()}
+
+        scores = {}
+        i = bisect_left(self._vocab, term)
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            token = self._vocab[i]
+            bonus = EXACT_BONUS if token == term else 1.0
+            for doc_id, weight in self.postings[token].items():
+                score = weight * bonus
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+            i += 1
+        return scores
+
+    def _matches(self, terms):
+        key = tuple(terms)
+        cached = self._queries.get(key)
+        if cached is not None:
+            return cached
+
+        per_term = sorted((self._match_term(term) for term in terms), key=len)
+        scores = dict(per_term[0]) if per_term else {}
+        for term_scores in per_term[1:]:
+            scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                break
+
+        if len(self._queries) >= MAX_CACHED_QUERIES:
+            self._queries.clear()
+        self._queries[key] = scores
+        return scores
+
+    def search(self, query, sort_order="Most Relevant", page=0, per_page=10):
+        """
+        Returns (total_matches, [urls on `page`]). An empty query lists every
+        document by date; "Most Relevant" falls back to newest first then.
+        """
+        with self._lock:
+            self._refresh()
+            terms = list(dict.fromkeys(QUERY_REGEX.findall((query or "").lower())))
+            start = max(0, page) * per_page
+
+            if not terms:
+                total = len(self._by_date)
+                if sort_order == "Oldest First":
+                    ids = self._by_date[start:start + per_page]
+                else:
+                    end = total - start
+                    ids = self._by_date[max(0, end - per_page):max(0, end)][::-1]
+                return total, [self.urls[d] for d in ids]
+
+            scores = self._matches(terms)
+            wanted = start + per_page
+            if sort_order == "Oldest First":
+                top = heapq.nsmallest(wanted, scores, key=lambda d: (self.dates[d], d))
+            elif sort_order == "Newest First":
+                top = heapq.nlargest(wanted, scores, key=lambda d: (self.dates[d], d))
+            else:
+                top = heapq.nlargest(wanted, scores, key=lambda d: (scores[d], self.dates[d], d))
+            return len(scores), [self.urls[d] for d in top[start:]]
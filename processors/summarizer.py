@@ -1,53 +1,211 @@
 import requests
+import hashlib
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-def summarize_article(text, title="Untitled", source_url="N/A", debug=False):
-    if not text or not text.strip():
-        return "⚠️ No content to summarize."
+# Point OLLAMA_URL at another host (or a local stub server) to redirect requests
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+MODEL_NAME = "llama2"
+REQUEST_TIMEOUT = 60
 
-    api_url = "http://localhost:11434/api/chat"
+# Long content is summarized map-reduce style, in chunks of CHUNK_TOKENS.
+# Token counts are estimated from characters; llama2's context is 4096 tokens
+# and the prompt plus the answer need room too.
+CHUNK_TOKENS = 2000
+CHARS_PER_TOKEN = 4
+CHUNK_BOUNDARY_MOD = 4  # Content-defined chunk boundaries: ~1 in 4 eligible paragraphs
+CHUNK_PROMPT_VERSION = "chunk-v1"
 
-    # Construct a focused and clean system prompt
-    system_prompt = (
-        f"You are a cybersecurity assistant.\n\n"
-        f"TITLE: {title.strip()}\n"
-        f"URL: {source_url.strip()}\n\n"
-        "CONTENT:\n"
-        f"{text.strip()}\n\n"
-        "Summarize the article in exactly 3-4 concise bullet points. Each point should include one of the following:\n"
-        "- Nature or type of threat\n"
-        "- Affected targets or sectors\n"
-        "- Known IOCs or techniques used\n\n"
-        "Use markdown format. Start each point with '-'."
-    )
+# LLM calls in flight across all threads (article and chunk workers alike),
+# matched to the Ollama server's parallel slots so queued requests do not time out
+MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+_IN_FLIGHT = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+FAILED_PREFIX = "❌ API request failed"
+
+BULLET_INSTRUCTIONS = (
+    "Summarize the article in exactly 3-4 concise bullet points. Each point should include one of the following:\n"
+    "- Nature or type of threat\n"
+    "- Affected targets or sectors\n"
+    "- Known IOCs or techniques used\n\n"
+    "Use markdown format. Start each point with '-'."
+)
 
+def make_session(pool_size=4):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _split_oversized(paragraph, max_chars):
+    """Cut a paragraph longer than max_chars at line, then word, boundaries."""
+    pieces = []
+    while len(paragraph) > max_chars:
+        cut = paragraph.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = paragraph.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(paragraph[:cut])
+        paragraph = paragraph[cut:].lstrip()
+    if paragraph:
+        pieces.append(paragraph)
+    return pieces
+
+def split_chunks(text, max_tokens=CHUNK_TOKENS):
+    """
+    Split text into chunks of at most max_tokens (estimated) on paragraph
+    boundaries. Past half the budget a chunk ends after any paragraph whose
+    hash picks it as a boundary, so boundaries depend on nearby content only:
+    an edit changes the chunks around it, not every chunk after it.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    paragraphs = []
+    for paragraph in text.strip().split("\n\n"):
+        paragraphs.extend(_split_oversized(paragraph.strip(), max_chars))
+
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        if current and size + len(paragraph) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+        boundary = hashlib.sha1(paragraph.encode("utf-8")).digest()[0] % CHUNK_BOUNDARY_MOD == 0
+        if size >= max_chars // 2 and boundary:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def chat(system_prompt, user_content, session=None, timeout=REQUEST_TIMEOUT, base_url=None, debug=False):
+    """One streamed /api/chat call. Returns the reply, or a FAILED_PREFIX message."""
     payload = {
-        "model": "llama2",
+        "model": MODEL_NAME,
         "messages": [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": text.strip()}
+            {"role": "user", "content": user_content}
         ],
         "stream": True
     }
 
     try:
-        response = requests.post(api_url, json=payload, stream=True, timeout=60)
-        summary = ""
-
-        for line in response.iter_lines():
-            if not line:
-                continue
-            try:
-                data = json.loads(line.decode("utf-8"))
-                if debug:
-                    print("🔹 Raw chunk:", data)
-                summary += data.get("message", {}).get("content", "")
-            except json.JSONDecodeError as e:
-                if debug:
-                    print(f"🔸 JSON decode warning: {e}")
-                continue
-
-        return summary.strip() if summary.strip() else "⚠️ No valid summary generated."
+        http = session or requests
+        with _IN_FLIGHT:
+            response = http.post(f"{base_url or OLLAMA_URL}/api/chat", json=payload, stream=True, timeout=timeout)
+            response.raise_for_status()
+            summary = ""
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line.decode("utf-8"))
+                    if debug:
+                        print("🔹 Raw chunk:", data)
+                    summary += data.get("message", {}).get("content", "")
+                except json.JSONDecodeError as e:
+                    if debug:
+                        print(f"🔸 JSON decode warning: {e}")
+                    continue
+        return summary.strip()
 
     except requests.exceptions.RequestException as e:
-        return f"❌ API request failed: {e}"
+        return f"{FAILED_PREFIX}: {e}"
+
+def summarize_chunk(chunk, title, index, total, cache=None, **kwargs):
+    """Notes for one part of a long article, cached by the chunk's content."""
+    chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+    if cache is not None:
+        cached = cache.get(chunk_hash)
+        if cached is not None:
+            return cached
+
+    system_prompt = (
+        "You are a cybersecurity assistant.\n\n"
+        f"TITLE: {title.strip()}\n"
+        f"This is part {index} of {total} of a long document.\n\n"
+        "List the key facts from this part only, as short '-' bullets: threats, malware, actors, "
+        "affected targets or sectors, techniques, and any IOCs (IPs, domains, hashes, CVEs) verbatim. "
+        "If the part holds nothing relevant, answer '- Nothing relevant'."
+    )
+    notes = chat(system_prompt, chunk, **kwargs)
+    if cache is not None and notes and not notes.startswith(FAILED_PREFIX):
+        cache.put(chunk_hash, notes)
+    return notes
+
+def reduce_notes(notes, title, source_url, **kwargs):
+    """Combine chunk notes into the final bullets, in rounds if they do not fit one call."""
+    while estimate_tokens("\n\n".join(notes)) > CHUNK_TOKENS and len(notes) > 1:
+        groups = split_chunks("\n\n".join(notes), CHUNK_TOKENS)
+        if len(groups) >= len(notes):
+            break
+        system_prompt = (
+            "You are a cybersecurity assistant.\n\n"
+            f"TITLE: {title.strip()}\n\n"
+            "Merge these notes from parts of one document into a shorter list of '-' bullets. "
+            "Keep every threat, target, technique and IOC; drop repetition."
+        )
+        notes = [chat(system_prompt, group, **kwargs) for group in groups]
+        failed = next((n for n in notes if n.startswith(FAILED_PREFIX)), None)
+        if failed:
+            return failed
+
+    system_prompt = (
+        "You are a cybersecurity assistant.\n\n"
+        f"TITLE: {title.strip()}\n"
+        f"URL: {source_url.strip()}\n\n"
+        "The user message holds notes taken from each part of the article.\n"
+        + BULLET_INSTRUCTIONS
+    )
+    return chat(system_prompt, "\n\n".join(notes), **kwargs)
+
+def summarize_article(text, title="Untitled", source_url="N/A", debug=False,
+                      session=None, timeout=REQUEST_TIMEOUT, base_url=None, chunk_cache=None):
+    """
+    3-4 bullet summary of an article. Content over CHUNK_TOKENS is split into
+    chunks summarized concurrently (and cached in `chunk_cache`, a SummaryCache,
+    when given), then reduced into the final bullets.
+    """
+    if not text or not text.strip():
+        return "⚠️ No content to summarize."
+
+    kwargs = {"session": session, "timeout": timeout, "base_url": base_url, "debug": debug}
+    text = text.strip()
+
+    if estimate_tokens(text) <= CHUNK_TOKENS:
+        # The content goes in the user message only, not repeated in the system prompt
+        system_prompt = (
+            f"You are a cybersecurity assistant.\n\n"
+            f"TITLE: {title.strip()}\n"
+            f"URL: {source_url.strip()}\n\n"
+            "The user message holds the article content.\n"
+            + BULLET_INSTRUCTIONS
+        )
+        summary = chat(system_prompt, text, **kwargs)
+    else:
+        chunks = split_chunks(text)
+        with ThreadPoolExecutor(max_workers=min(MAX_IN_FLIGHT, len(chunks))) as pool:
+            notes = list(pool.map(
+                lambda item: summarize_chunk(item[1], title, item[0], len(chunks), chunk_cache, **kwargs),
+                enumerate(chunks, start=1),
+            ))
+        failed = next((n for n in notes if n.startswith(FAILED_PREFIX)), None)
+        if failed:
+            # Chunks that did succeed are cached, so a retry only redoes the rest
+            return failed
+        if debug:
+            print(f"🔹 {len(chunks)} chunks summarized for {title}")
+        summary = reduce_notes(notes, title, source_url, **kwargs)
+
+    return summary if summary else "⚠️ No valid summary generated."
@@ -0,0 +1,192 @@
+import json
+import re
+from collections import Counter, namedtuple
+from processors.intel_parsers import (
+    ENTITY_LABELS, galaxy_entities, group_typed, iter_ioc_lines, iter_yara_rules,
+    looks_like_ioc_file, merge_iocs, read_galaxy_cluster,
+)
+from processors.ioc_extractor import IOC_TYPES, extract_iocs
+
+# Bump when rules or templates change so triaged documents are re-routed
+TRIAGE_VERSION = "t4"
+
+ROUTE_LLM = "llm"
+ROUTE_TEMPLATE = "template"  # Deterministic summary from counts; hidden from the cards
+ROUTE_PARSER = "parser"      # Summary built by a structured parser for the format
+
+SKIPPED_PREFIX = "⚠️ Skipped LLM summarization"
+
+MIN_LLM_CHARS = 200      # Repository files shorter than this are not worth a model call
+LIST_IOC_RATIO = 0.6     # IOCs per data line at which a repository file is an indicator list
+MAX_LIST_PROSE_WORDS = 4 # ...as long as its lines are that short on average
+
+YARA_RULE_REGEX = re.compile(r"^\s*(?:(?:private|global)\s+)*rule\s+(\w+)", re.MULTILINE)
+
+# (route, kind, summary or None for the LLM, iocs, entities parsed from the document)
+TriageResult = namedtuple("TriageResult", "route kind summary iocs entities", defaults=(None,))
+# What a parser returns; iocs=None keeps the ones extracted from the text
+ParsedDocument = namedtuple("ParsedDocument", "summary iocs entities", defaults=(None, None))
+
+# Ordered; the first rule that returns a TriageResult decides
+TRIAGE_RULES = []
+# kind -> parser(article, doc) returning a ParsedDocument, or None to pass
+PARSERS = {}
+
+def triage_rule(func):
+    TRIAGE_RULES.append(func)
+    return func
+
+def parser(kind):
+    def register(func):
+        PARSERS[kind] = func
+        return func
+    return register
+
+def describe(article):
+    """Cheap features every rule can use: length, lines, IOCs and structure."""
+    content = (article.get("content") or "").strip()
+    lines = [line.strip() for line in content.splitlines()]
+    data_lines = [line for line in lines if line and not line.startswith(("#", "//", ";"))]
+    iocs = extract_iocs(content)
+    ioc_total = sum(len(iocs.get(ioc_type, [])) for ioc_type in IOC_TYPES)
+    words = len(content.split())
+
+    doc = {
+        "content": content,
+        "title": article.get("title", ""),
+        "source": article.get("source", ""),
+        "chars": len(content),
+        "data_lines": len(data_lines),
+        "words_per_line": words / max(1, len(data_lines)),
+        "iocs": iocs,
+        "ioc_total": ioc_total,
+        "ioc_ratio": ioc_total / max(1, len(data_lines)),
+        "structure": "text",
+        "json": None,
+    }
+
+    if doc["source"].startswith("github:MISP/misp-galaxy") and doc["title"].endswith(".json"):
+        # Decoded by its parser, member by member
+        doc["structure"] = "galaxy"
+    elif doc["title"].endswith(".json") or content[:1] in ("{", "["):
+        try:
+            doc["json"] = json.loads(content)
+            doc["structure"] = "json"
+        except ValueError:
+            pass
+    if doc["structure"] == "text" and YARA_RULE_REGEX.search(content):
+        doc["structure"] = "yara"
+    if doc["structure"] == "text" and looks_like_ioc_file(data_lines):
+        doc["structure"] = "ioc_file"
+    return doc
+
+def ioc_counts(iocs):
+    return ", ".join(f"{len(iocs[t])} {t}" for t in IOC_TYPES if iocs.get(t)) or "no indicators"
+
+def triage(article):
+    """Route one article: TriageResult(route, kind, summary, iocs, entities)."""
+    doc = describe(article)
+    for rule in TRIAGE_RULES:
+        result = rule(article, doc)
+        if result:
+            return result
+    return TriageResult(ROUTE_LLM, "prose", None, doc["iocs"])
+
+# ================== Default rules ===================
+@triage_rule
+def maltrail_trail(article, doc):
+    # Raw IOC dump files
+    if doc["source"].startswith("github:stamparm/maltrail") and doc["title"].endswith(".txt"):
+        return TriageResult(ROUTE_TEMPLATE, "ioc_dump", f"{SKIPPED_PREFIX} — IOC dump file ({ioc_counts(doc['iocs'])})", doc["iocs"])
+
+@triage_rule
+def structured_document(article, doc):
+    if doc["structure"] in PARSERS:
+        parsed = PARSERS[doc["structure"]](article, doc)
+        if parsed and parsed.summary:
+            iocs = doc["iocs"] if parsed.iocs is None else parsed.iocs
+            return TriageResult(ROUTE_PARSER, doc["structure"], parsed.summary, iocs, parsed.entities)
+
+@triage_rule
+def empty_document(article, doc):
+    # Only repository files: a short RSS item is a news teaser and still gets a summary
+    if doc["source"].startswith("github:") and doc["chars"] < MIN_LLM_CHARS and not doc["ioc_total"]:
+        return TriageResult(ROUTE_TEMPLATE, "empty", f"{SKIPPED_PREFIX} — too little content", doc["iocs"])
+
+@triage_rule
+def indicator_list(article, doc):
+    # Repository files only, like empty_document: a one-line RSS teaser naming a CVE is still news
+    if doc["source"].startswith("github:") and doc["ioc_ratio"] >= LIST_IOC_RATIO and doc["words_per_line"] <= MAX_LIST_PROSE_WORDS:
+        return TriageResult(ROUTE_TEMPLATE, "ioc_list", f"{SKIPPED_PREFIX} — indicator list ({ioc_counts(doc['iocs'])})", doc["iocs"])
+
+# ================== Default parsers ===================
+@parser("galaxy")
+def parse_galaxy(article, doc):
+    cluster = read_galaxy_cluster(doc["content"])
+    if not cluster.get("values"):
+        return None
+    entities = list(galaxy_entities(cluster))
+    name = cluster.get("name") or doc["title"]
+    if entities:
+        label = ENTITY_LABELS[entities[0]["type"]]
+        names = [e["name"] for e in entities]
+        lines = [f"- MISP galaxy {name}: {len(entities)} {label} entries: {', '.join(names[:8])}{' …' if len(names) > 8 else ''}"]
+    else:
+        lines = [f"- MISP galaxy {name}: {len(cluster['values'])} entries"]
+    if isinstance(cluster.get("description"), str):
+        lines.append(f"- {cluster['description'][:300]}")
+    # Reference links are not indicators; the entities are what this file is for
+    return ParsedDocument("\n".join(lines), group_typed(()), entities or None)
+
+@parser("yara")
+def parse_yara(article, doc):
+    rules = list(iter_yara_rules(doc["content"]))
+    if not rules:
+        return None
+    names = [rule["name"] for rule in rules]
+    descriptions = [rule["meta"]["description"] for rule in rules if rule["meta"].get("description")]
+    iocs = merge_iocs(*(rule["iocs"] for rule in rules))
+    lines = [f"- YARA rule file with {len(names)} rules: {', '.join(names[:8])}{' …' if len(names) > 8 else ''}"]
+    lines += [f"- {d}" for d in dict.fromkeys(descriptions[:3])]
+    if any(iocs.values()):
+        lines.append(f"- Indicators referenced: {ioc_counts(iocs)}")
+    entities = [
+        {"type": "yara_rule", "name": rule["name"], "synonyms": [],
+         "description": rule["meta"].get("description", ""), "tags": rule["tags"],
+         "author": rule["meta"].get("author", ""), "reference": rule["meta"].get("reference", "")}
+        for rule in rules
+    ]
+    return ParsedDocument("\n".join(lines), iocs, entities)
+
+@parser("ioc_file")
+def parse_ioc_file(article, doc):
+    rows = list(iter_ioc_lines(doc["content"]))
+    if not rows:
+        return None
+    iocs = group_typed((ioc_type, value) for ioc_type, value, _ in rows)
+    # Comments name the campaign or malware each indicator belongs to; scores are just numbers
+    comments = Counter(c for _, _, c in rows if c and not c.isdigit())
+    lines = [f"- Indicator file: {ioc_counts(iocs)}"]
+    if comments:
+        lines.append(f"- Mostly related to: {'; '.join(c for c, _ in comments.most_common(5))}")
+    return ParsedDocument("\n".join(lines), iocs)
+
+@parser("json")
+def parse_json(article, doc):
+    data = doc["json"]
+    if isinstance(data, dict):
+        name = data.get("name") or doc["title"]
+        lines = [f"- {name}: JSON document with keys {', '.join(list(data)[:8])}"]
+        if isinstance(data.get("description"), str):
+            lines.append(f"- {data['description'][:300]}")
+        for key, value in data.items():
+            if isinstance(value, list):
+                lines.append(f"- {len(value)} entries under '{key}'")
+                break
+    elif isinstance(data, list):
+        lines = [f"- {doc['title']}: JSON list of {len(data)} entries"]
+    else:
+        return None
+    if doc["ioc_total"]:
+        lines.append(f"- Indicators referenced: {ioc_counts(doc['iocs'])}")
+    return ParsedDocument("\n".join(lines))
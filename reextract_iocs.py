@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from generate_ioc_index import generate_ioc_index
+from processors.pipeline_runner import PipelineBusy, acquire_lock, release_lock
+from processors.triage import triage
+from storage import article_store
+
+SHARD_BYTES = 4 * 1024 * 1024  # Article data per shard: big enough to amortize IPC, small enough to balance
+MAX_SHARD_URLS = 500           # Keeps each shard's "WHERE url IN (...)" query small
+
+_worker_conn = None
+
+def _init_worker(db_path):
+    # Each worker reads its shard straight from the store, so only URLs and
+    # IOC dicts cross the process boundary, never article content
+    global _worker_conn
+    _worker_conn = article_store.connect(db_path, import_legacy=False)
+
+def extract_shard(urls):
+    """{url: iocs} for one shard, exactly as generate_summaries.py would store them."""
+    return {url: triage(article).iocs for url, article in article_store.get_articles(_worker_conn, urls).items()}
+
+def make_shards(sizes, shard_bytes=SHARD_BYTES, max_urls=MAX_SHARD_URLS):
+    """
+    Pack URLs into shards of about `shard_bytes`, largest articles first, and
+    return the shards largest first so the pool never ends on one big straggler.
+    """
+    shards = []
+    current, current_size = [], 0
+    for url in sorted(sizes, key=sizes.get, reverse=True):
+        if current and (current_size + sizes[url] > shard_bytes or len(current) >= max_urls):
+            shards.append((current_size, current))
+            current, current_size = [], 0
+        current.append(url)
+        current_size += sizes[url]
+    if current:
+        shards.append((current_size, current))
+    shards.sort(key=lambda shard: shard[0], reverse=True)
+    return [urls for _, urls in shards]
+
+def reextract_iocs(conn=None, workers=None, kind=None, db_path=article_store.DB_PATH):
+    """
+    Re-run IOC extraction over every summarized article without touching the
+    summaries themselves. Shards run in a process pool; each finished shard's
+    changed entries are written immediately, and the IOC indexes are brought
+    up to date from the summaries watermark at the end.
+    Run it under the pipeline lock (see main) so no other run rewrites summaries meanwhile.
+    """
+    conn = conn or article_store.connect(db_path)
+    summarized = article_store.summary_urls(conn)
+    sizes = {url: size for url, size in article_store.article_sizes(conn, kind).items() if url in summarized}
+    shards = make_shards(sizes)
+    workers = workers or os.cpu_count() or 1
+    print(f"🧨 Re-extracting IOCs from {len(sizes)} articles ({sum(sizes.values()) / 1e6:.1f} MB) "
+          f"in {len(shards)} shards on {workers} processes...")
+
+    started = time.monotonic()
+    changed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        futures = [pool.submit(extract_shard, shard) for shard in shards]
+        for done, future in enumerate(as_completed(futures), start=1):
+            updates = {}
+            for url, iocs in future.result().items():
+                # The current row, so only its IOCs change whatever was written since startup
+                entry = article_store.get_summary(conn, url)
+                if entry is not None and entry.get("iocs") != iocs:
+                    entry["iocs"] = iocs
+                    updates[url] = entry
+            article_store.upsert_summaries(conn, updates)
+            changed += len(updates)
+            print(f"🧨 [{done}/{len(shards)}] shards done, {changed} summaries updated")
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Extraction took {elapsed:.1f}s ({sum(sizes.values()) / 1e6 / max(elapsed, 1e-6):.1f} MB/s).")
+    if changed:
+        article_store.export_json(article_store.load_summaries(conn), article_store.SUMMARY_PATH)
+    generate_ioc_index(conn=conn)
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract IOCs for every summarized article, without re-summarizing.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Processes to use (default: all cores)")
+    parser.add_argument("--kind", choices=("rss", "github"), default=None, help="Only articles from this source kind")
+    args = parser.parse_args()
+    try:
+        acquire_lock()
+    except PipelineBusy as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+    try:
+        reextract_iocs(workers=args.workers, kind=args.kind)
+    finally:
+        release_lock()
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,52 @@
 # split_github_articles.py
 import json
 import os
+from storage.json_stream import JsonObjectWriter, encode_entry, file_sha256, iter_json_object
 
 INPUT_FILE = "data/github_articles.json"
 OUTPUT_DIR = "data"
+MANIFEST_FILE = "github_articles_manifest.json"
 MAX_FILE_SIZE_MB = 45  # GitHub max is 100MB, keep a buffer
 
-def get_size_mb(obj):
-    return len(json.dumps(obj).encode("utf-8")) / (1024 * 1024)
+def part_path(output_dir, index):
+    return os.path.join(output_dir, f"github_articles_part_{index}.json")
 
 def split_json(input_path, output_dir, max_mb):
-    with open(input_path, "r") as f:
-        data = json.load(f)
-
+    """
+    Stream `input_path` into parts of at most `max_mb` each (a single larger
+    entry gets a part of its own). Every entry is serialized once: that text
+    both sizes the part and is what gets written. Parts are listed with their
+    checksums in a manifest so the merge can verify them.
+    """
+    max_bytes = int(max_mb * 1024 * 1024)
     parts = []
-    current_part = {}
-    current_size = 0
-
-    for key, value in data.items():
-        entry_size = get_size_mb({key: value})
-        if current_size + entry_size > max_mb:
-            parts.append(current_part)
-            current_part = {}
-            current_size = 0
-
-        current_part[key] = value
-        current_size += entry_size
-
-    if current_part:
-        parts.append(current_part)
-
-    for i, part in enumerate(parts, start=1):
-        part_path = os.path.join(output_dir, f"github_articles_part_{i}.json")
-        with open(part_path, "w") as f:
-            json.dump(part, f, indent=2)
-        print(f"✅ Saved: {part_path} ({get_size_mb(part):.2f} MB)")
+    writer = None
+
+    def finish():
+        sha256 = writer.close()
+        parts.append({"file": os.path.basename(writer.path), "entries": writer.count, "bytes": writer.size, "sha256": sha256})
+        print(f"✅ Saved: {writer.path} ({writer.size / (1024 * 1024):.2f} MB)")
+
+    total = 0
+    with open(input_path, "r", encoding="utf-8") as f:
+        for key, value in iter_json_object(f):
+            encoded = encode_entry(key, value).encode("utf-8")
+            # Framing: "{\n" or ",\n" before each entry, "\n}" after the last
+            if writer and writer.count and writer.size + len(encoded) + 4 > max_bytes:
+                finish()
+                writer = None
+            if writer is None:
+                writer = JsonObjectWriter(part_path(output_dir, len(parts) + 1))
+            writer.write_encoded(encoded)
+            total += 1
+    if writer:
+        finish()
+
+    manifest = {"source": os.path.basename(input_path), "entries": total, "sha256": file_sha256(input_path), "parts": parts}
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"🧾 Manifest: {len(parts)} parts, {total} entries.")
+    return manifest
 
 if __name__ == "__main__":
-    split_json(INPUT_FILE, OUTPUT_DIR, MAX_FILE_SIZE_MB)
\ No newline at end of file
+    split_json(INPUT_FILE, OUTPUT_DIR, MAX_FILE_SIZE_MB)
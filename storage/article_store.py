@@ -0,0 +1,381 @@
+# storage/article_store.py
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+DB_PATH = "data/sentinelstream.db"
+
+# Legacy flat files imported on first open and still exported for the UI
+RAW_PATH = "data/raw_articles.json"
+GITHUB_PATH = "data/github_articles.json"
+ARTICLE_PATHS = {"rss": RAW_PATH, "github": GITHUB_PATH}
+SUMMARY_PATH = "data/summaries.json"
+IOC_INDEX_PATH = "data/ioc_index.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url  TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    seq  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    url  TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    seq  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS iocs (
+    url  TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    seq  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url  TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    seq  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ioc_articles (
+    ioc_type TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    url      TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    PRIMARY KEY (ioc_type, value, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS deletions (
+    tbl  TEXT NOT NULL,
+    url  TEXT NOT NULL,
+    seq  INTEGER NOT NULL,
+    PRIMARY KEY (tbl, url)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_kind ON articles(kind);
+CREATE INDEX IF NOT EXISTS articles_seq ON articles(seq);
+CREATE INDEX IF NOT EXISTS summaries_seq ON summaries(seq);
+CREATE INDEX IF NOT EXISTS iocs_seq ON iocs(seq);
+CREATE INDEX IF NOT EXISTS fingerprints_seq ON fingerprints(seq);
+CREATE INDEX IF NOT EXISTS ioc_articles_url ON ioc_articles(url);
+"""
+
+# Every table carries a `seq` column: a per-table counter bumped on each write,
+# so readers can ask for "everything changed since seq N". Deletes are logged
+# in `deletions` with a seq from the same counter.
+TABLES = ("articles", "summaries", "iocs", "fingerprints")
+
+class StoreConnection(sqlite3.Connection):
+    """
+    A connection shared between threads. `with conn:` holds `conn.lock` for the
+    whole transaction, so one thread's commit or rollback never ends another
+    thread's writes half way. Every writer (article store, summary caches) goes
+    through it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            return super().__enter__()
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self.lock.release()
+
+def connect(path=DB_PATH, import_legacy=True):
+    """
+    Open (and create if needed) the store.
+    On first open the legacy JSON files are imported so existing data carries over.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, factory=StoreConnection)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+
+    if import_legacy and get_meta(conn, "legacy_imported") is None:
+        import_legacy_json(conn)
+    return conn
+
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def set_meta(conn, key, value):
+    with conn:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+def max_seq(conn, table):
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    return conn.execute(
+        f"SELECT MAX((SELECT COALESCE(MAX(seq), 0) FROM {table}), "
+        "(SELECT COALESCE(MAX(seq), 0) FROM deletions WHERE tbl = ?))",
+        (table,),
+    ).fetchone()[0]
+
+def changes_since(conn, table, seq, kind=None):
+    """
+    Everything written to `table` after watermark `seq`:
+    ({url: data} upserted, {urls} deleted, new watermark).
+    `kind` limits the upserted articles to that kind; deletions are not filtered.
+    """
+    high = max_seq(conn, table)
+    where, args = "WHERE seq > ? AND seq <= ?", (seq, high)
+    if kind:
+        where, args = where + " AND kind = ?", args + (kind,)
+    changed = _load_all(conn, table, where, args)
+    rows = conn.execute(
+        "SELECT url FROM deletions WHERE tbl = ? AND seq > ? AND seq <= ?", (table, seq, high)
+    )
+    # Rows re-added after `high` was read are left for the next call
+    deleted = {url for (url,) in rows if url not in changed and _get_one(conn, table, url) is None}
+    return changed, deleted, high
+
+@contextlib.contextmanager
+def _numbered_write(conn):
+    """
+    A write transaction that takes SQLite's write lock up front (BEGIN IMMEDIATE)
+    instead of at its first write, so a max_seq read inside it cannot be taken
+    by another connection too, and seqs commit in order.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield
+
+def _delete(conn, table, url):
+    with _numbered_write(conn):
+        # Taken before the delete, which may remove the row holding the current max
+        seq = max_seq(conn, table) + 1
+        if conn.execute(f"DELETE FROM {table} WHERE url = ?", (url,)).rowcount:
+            conn.execute(
+                "INSERT OR REPLACE INTO deletions (tbl, url, seq) VALUES (?, ?, ?)",
+                (table, url, seq),
+            )
+
+def _upsert_many(conn, table, rows, extra_cols=()):
+    """
+    rows: iterable of (url, data_dict, *extra) tuples.
+    Runs in a single transaction; unchanged rows are left untouched.
+    Returns the number of rows inserted or updated.
+    """
+    params = [(row[0], *row[2:], json.dumps(row[1])) for row in rows]
+
+    cols = ("url", *extra_cols, "data", "seq")
+    placeholders = ", ".join("?" for _ in cols)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in cols[1:])
+    sql = (
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders}) "
+        f"ON CONFLICT(url) DO UPDATE SET {updates} WHERE {table}.data != excluded.data"
+    )
+    with _numbered_write(conn):
+        # Numbered under the write lock so concurrent writers never share a seq
+        start = max_seq(conn, table) + 1
+        before = conn.total_changes
+        conn.executemany(sql, [(*p, start + i) for i, p in enumerate(params)])
+        return conn.total_changes - before
+
+def _load_all(conn, table, where="", args=()):
+    rows = conn.execute(f"SELECT url, data FROM {table} {where} ORDER BY rowid", args)
+    return {url: json.loads(data) for url, data in rows}
+
+def _get_one(conn, table, url):
+    row = conn.execute(f"SELECT data FROM {table} WHERE url = ?", (url,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+# ================== Articles ===================
+def upsert_articles(conn, articles, kind):
+    """kind is "rss" or "github"."""
+    return _upsert_many(conn, "articles", ((url, a, kind) for url, a in articles.items()), extra_cols=("kind",))
+
+def upsert_article(conn, url, article, kind):
+    return upsert_articles(conn, {url: article}, kind)
+
+def load_articles(conn, kind=None):
+    if kind:
+        return _load_all(conn, "articles", "WHERE kind = ?", (kind,))
+    return _load_all(conn, "articles")
+
+def get_article(conn, url):
+    return _get_one(conn, "articles", url)
+
+def get_articles(conn, urls):
+    """{url: article} for those of `urls` that are stored."""
+    urls = list(urls)
+    placeholders = ", ".join("?" for _ in urls)
+    return _load_all(conn, "articles", f"WHERE url IN ({placeholders})", urls) if urls else {}
+
+def article_sizes(conn, kind=None):
+    """{url: stored size in bytes}, without decoding any article."""
+    if kind:
+        rows = conn.execute("SELECT url, length(data) FROM articles WHERE kind = ?", (kind,))
+    else:
+        rows = conn.execute("SELECT url, length(data) FROM articles")
+    return dict(rows)
+
+def article_urls(conn, kind=None):
+    if kind:
+        rows = conn.execute("SELECT url FROM articles WHERE kind = ?", (kind,))
+    else:
+        rows = conn.execute("SELECT url FROM articles")
+    return {url for (url,) in rows}
+
+# ================== Summaries ===================
+def upsert_summary(conn, url, entry):
+    return _upsert_many(conn, "summaries", [(url, entry)])
+
+def upsert_summaries(conn, entries):
+    return _upsert_many(conn, "summaries", entries.items())
+
+def get_summary(conn, url):
+    return _get_one(conn, "summaries", url)
+
+def delete_summary(conn, url):
+    _delete(conn, "summaries", url)
+
+def summary_urls(conn):
+    return {url for (url,) in conn.execute("SELECT url FROM summaries")}
+
+def load_summaries(conn):
+    return _load_all(conn, "summaries")
+
+# ================== IOCs ===================
+def upsert_iocs(conn, url, iocs):
+    return _upsert_many(conn, "iocs", [(url, iocs)])
+
+def upsert_ioc_index(conn, index):
+    return _upsert_many(conn, "iocs", index.items())
+
+def delete_iocs(conn, url):
+    _delete(conn, "iocs", url)
+
+def get_iocs(conn, url):
+    return _get_one(conn, "iocs", url)
+
+def load_ioc_index(conn):
+    return _load_all(conn, "iocs")
+
+def ioc_urls(conn):
+    """URLs that have an IOC index entry, without decoding any."""
+    return {url for (url,) in conn.execute("SELECT url FROM iocs")}
+
+# ================== Reverse IOC index ===================
+# (ioc_type, value, url, date) rows derived from the iocs table by
+# generate_ioc_index.py. Not seq-tracked: it is rebuilt from the summaries.
+def replace_ioc_articles(conn, forward, dates, removed=()):
+    """Replace the rows of every url in `forward` ({url: typed iocs}) and drop those of `removed`, in one transaction."""
+    rows = (
+        (ioc_type, value, url, dates.get(url, ""))
+        for url, iocs in forward.items()
+        for ioc_type, values in iocs.items()
+        for value in values
+    )
+    with conn:
+        conn.executemany("DELETE FROM ioc_articles WHERE url = ?", ((url,) for url in [*forward, *removed]))
+        conn.executemany("INSERT OR REPLACE INTO ioc_articles (ioc_type, value, url, date) VALUES (?, ?, ?, ?)", rows)
+
+def clear_ioc_articles(conn):
+    with conn:
+        conn.execute("DELETE FROM ioc_articles")
+
+def ioc_stats(conn, ioc_type, value):
+    """(article count, first seen, last seen) for one indicator."""
+    return conn.execute(
+        "SELECT COUNT(*), COALESCE(MIN(NULLIF(date, '')), ''), COALESCE(MAX(date), '') "
+        "FROM ioc_articles WHERE ioc_type = ? AND value = ?",
+        (ioc_type, value),
+    ).fetchone()
+
+def ioc_articles(conn, ioc_type, value, limit=-1):
+    """[(url, date)] of the articles mentioning one indicator, newest first."""
+    rows = conn.execute(
+        "SELECT url, date FROM ioc_articles WHERE ioc_type = ? AND value = ? ORDER BY date DESC, url LIMIT ?",
+        (ioc_type, value, limit),
+    )
+    return [tuple(row) for row in rows]
+
+def ioc_article_urls(conn, keys):
+    """{(ioc_type, value): [urls]} for those of `keys` mentioned by any article."""
+    found = {}
+    for ioc_type, value in keys:
+        rows = conn.execute("SELECT url FROM ioc_articles WHERE ioc_type = ? AND value = ?", (ioc_type, value))
+        urls = [url for (url,) in rows]
+        if urls:
+            found[(ioc_type, value)] = urls
+    return found
+
+# ================== Fingerprints ===================
+# url -> {"canonical": url, "url_key", "exact", "minhash"}, written by dedup_articles.py
+def upsert_fingerprints(conn, fingerprints):
+    return _upsert_many(conn, "fingerprints", fingerprints.items())
+
+def delete_fingerprint(conn, url):
+    _delete(conn, "fingerprints", url)
+
+def load_fingerprints(conn):
+    return _load_all(conn, "fingerprints")
+
+# ================== Import / Export ===================
+def _read_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"⚠️ Could not parse {path}, skipping import.")
+            return {}
+    return data if isinstance(data, dict) else {}
+
+def import_legacy_json(conn, raw_path=RAW_PATH, github_path=GITHUB_PATH,
+                       summary_path=SUMMARY_PATH, ioc_index_path=IOC_INDEX_PATH):
+    counts = {
+        "rss": upsert_articles(conn, _read_json(raw_path), "rss"),
+        "github": upsert_articles(conn, _read_json(github_path), "github"),
+        "summaries": _upsert_many(conn, "summaries", _read_json(summary_path).items()),
+        "iocs": upsert_ioc_index(conn, _read_json(ioc_index_path)),
+    }
+    set_meta(conn, "legacy_imported", "1")
+    print(f"📦 Imported legacy JSON into store: {counts}")
+    return counts
+
+def export_json(data, path):
+    """Write JSON atomically: readers see either the old file or the new one, never half of it."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def export_articles(conn, kind):
+    """Refresh the JSON file for one kind of article (split/merge and the test scripts read them)."""
+    export_json(load_articles(conn, kind), ARTICLE_PATHS[kind])
+
+def export_all(conn):
+    for kind in ARTICLE_PATHS:
+        export_articles(conn, kind)
+    export_json(load_summaries(conn), SUMMARY_PATH)
+    export_json(load_ioc_index(conn), IOC_INDEX_PATH)
+    print("✅ Exported store to JSON files.")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "import":
+        import_legacy_json(connect(import_legacy=False))
+    elif command == "export":
+        export_all(connect())
+    else:
+        print("Usage: python -m storage.article_store [import|export]")
@@ -0,0 +1,207 @@
+# storage/feed_sets.py
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Compiled feed file layout (all sections 8-byte aligned):
+#   MAGIC | uint32 header length | JSON header | sections...
+# The header maps each indicator type to its sections:
+#   "fixed":   sorted array of `width`-byte binary values (file hashes), one per width
+#   "strings": uint64 offsets (count + 1) followed by the sorted utf-8 values
+# and every section has a Bloom filter in front of its binary search.
+MAGIC = b"SSFEED01"
+FORMAT_VERSION = 1
+COMPILED_DIR = "data/compiled"
+BITS_PER_ITEM = 10   # ~1% false positives with BLOOM_HASHES probes
+BLOOM_HASHES = 7
+FIXED_TYPES = ("hash",)  # Hex values stored as raw bytes: 16/20/32 instead of 32/40/64 characters
+
+def _align(n):
+    return (n + 7) & ~7
+
+def _probe_seed(key, fixed):
+    # File hashes are already uniformly random; everything else is hashed once
+    digest = key if fixed else hashlib.blake2b(key, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little") | 1
+    return h1, h2
+
+def _bloom(keys, fixed):
+    bits = max(64, len(keys) * BITS_PER_ITEM)
+    data = bytearray((bits + 7) // 8)
+    for key in keys:
+        h1, h2 = _probe_seed(key, fixed)
+        for i in range(BLOOM_HASHES):
+            pos = (h1 + i * h2) % bits
+            data[pos >> 3] |= 1 << (pos & 7)
+    return bits, bytes(data)
+
+def _encode(set_type, values):
+    """{width: sorted keys} for fixed types, {0: sorted utf-8 keys} otherwise."""
+    if set_type in FIXED_TYPES:
+        groups = {}
+        for value in values:
+            try:
+                key = bytes.fromhex(value)
+            except ValueError:
+                continue
+            groups.setdefault(len(key), set()).add(key)
+        return {width: sorted(keys) for width, keys in groups.items() if width >= 16}
+    return {0: sorted({value.encode("utf-8") for value in values})}
+
+def compile_sets(sets, path, source_signature):
+    """
+    Write {ioc_type: set(values)} to `path` in the compiled format, atomically.
+    `source_signature` ([mtime_ns, size] of the feed file) is stored so stale
+    files are detected.
+    """
+    sections = {}
+    blobs = []
+    offset = 0
+
+    def add_blob(blob):
+        nonlocal offset
+        start = offset
+        blobs.append(blob + b"\0" * (_align(len(blob)) - len(blob)))
+        offset += _align(len(blob))
+        return start
+
+    for set_type, values in sets.items():
+        for width, keys in _encode(set_type, values).items():
+            bits, bloom = _bloom(keys, fixed=bool(width))
+            section = {"count": len(keys), "width": width, "bloom_bits": bits, "bloom": add_blob(bloom)}
+            if width:
+                section["data"] = add_blob(b"".join(keys))
+            else:
+                offsets = array("Q", [0])
+                for key in keys:
+                    offsets.append(offsets[-1] + len(key))
+                if sys.byteorder != "little":
+                    offsets.byteswap()
+                section["offsets"] = add_blob(offsets.tobytes())
+                section["data"] = add_blob(b"".join(keys))
+            sections.setdefault(set_type, []).append(section)
+
+    header = json.dumps({"version": FORMAT_VERSION, "source": list(source_signature), "sections": sections}).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+class MappedSet:
+    """
+    Read-only set over one indicator type of a compiled feed, backed by the
+    shared mmap: a Bloom filter rejects most misses in a few bit probes and
+    hits are confirmed by binary search. Supports `in` and len().
+    """
+
+    def __init__(self, mapped, view, base, set_type, sections):
+        self.fixed = set_type in FIXED_TYPES
+        self.mapped = mapped  # Slicing the mmap itself yields bytes, which compare and order
+        self.sections = {}
+        for section in sections:
+            entry = dict(section)
+            entry["bloom"] = view[base + section["bloom"]:base + section["bloom"] + (section["bloom_bits"] + 7) // 8]
+            entry["data"] = base + section["data"]
+            if not section["width"]:
+                start = base + section["offsets"]
+                entry["offsets"] = view[start:start + 8 * (section["count"] + 1)].cast("Q")
+            self.sections[section["width"]] = entry
+        self._len = sum(section["count"] for section in sections)
+
+    def __len__(self):
+        return self._len
+
+    def _key(self, value):
+        if not self.fixed:
+            return 0, value.encode("utf-8")
+        try:
+            key = bytes.fromhex(value)
+        except ValueError:
+            return None, None
+        return len(key), key
+
+    def __contains__(self, value):
+        if not isinstance(value, str):
+            return False
+        width, key = self._key(value)
+        section = self.sections.get(width)
+        if section is None:
+            return False
+
+        bloom, bits = section["bloom"], section["bloom_bits"]
+        h1, h2 = _probe_seed(key, self.fixed)
+        for i in range(BLOOM_HASHES):
+            pos = (h1 + i * h2) % bits
+            if not bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+
+        mapped, data = self.mapped, section["data"]
+        lo, hi = 0, section["count"]
+        if width:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                probe = mapped[data + mid * width:data + (mid + 1) * width]
+                if probe == key:
+                    return True
+                if probe < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        else:
+            offsets = section["offsets"]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                probe = mapped[data + offsets[mid]:data + offsets[mid + 1]]
+                if probe == key:
+                    return True
+                if probe < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        return False
+
+class CompiledFeed:
+    """A compiled feed file, memory-mapped: {ioc_type: MappedSet} via .sets."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled feed")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+        base = _align(start + header_len)
+        self.version = header["version"]
+        self.source = tuple(header["source"])
+        self.sets = {
+            set_type: MappedSet(self._mmap, view, base, set_type, sections)
+            for set_type, sections in header["sections"].items()
+        }
+
+def compiled_path(feed_path, compiled_dir=COMPILED_DIR):
+    return os.path.join(compiled_dir, os.path.basename(feed_path) + ".bin")
+
+def open_compiled(path, source_signature):
+    """The CompiledFeed at `path`, or None if missing, unreadable or built from another version of the feed."""
+    if not os.path.exists(path):
+        return None
+    try:
+        feed = CompiledFeed(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if feed.version != FORMAT_VERSION or feed.source != tuple(source_signature) or sys.byteorder != "little":
+        return None
+    return feed
@@ -0,0 +1,134 @@
+# storage/json_stream.py
+import hashlib
+import json
+import os
+
+CHUNK_SIZE = 1024 * 1024  # Characters read per step
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:}]"
+
+_decoder = json.JSONDecoder()
+
+class JsonStreamError(ValueError):
+    pass
+
+def iter_json_object(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    Yield (key, value) pairs of a top-level JSON object one at a time, keeping
+    only the entry being decoded in memory.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill(min_size=chunk_size):
+        # Grow reads with the buffer so a huge single value stays linear overall
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = fileobj.read(max(min_size, len(buffer) - pos))
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    def expect(char):
+        nonlocal pos
+        skip_ws()
+        if pos >= len(buffer) or buffer[pos] != char:
+            found = buffer[pos:pos + 20] if pos < len(buffer) else "end of file"
+            raise JsonStreamError(f"Expected {char!r}, found {found!r}")
+        pos += 1
+
+    def decode():
+        nonlocal pos
+        skip_ws()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+                # A number cut at the buffer edge ("12" of "123", "1.5" of "1.5e3")
+                # is only complete once a delimiter follows it
+                if eof or (end < len(buffer) and buffer[end] in DELIMITERS):
+                    pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise JsonStreamError(str(e)) from e
+            fill()
+
+    expect("{")
+    skip_ws()
+    if pos < len(buffer) and buffer[pos] == "}":
+        return
+    while True:
+        key = decode()
+        if not isinstance(key, str):
+            raise JsonStreamError(f"Object key must be a string, got {key!r}")
+        expect(":")
+        yield key, decode()
+
+        skip_ws()
+        if pos < len(buffer) and buffer[pos] == ",":
+            pos += 1
+            continue
+        expect("}")
+        return
+
+def encode_entry(key, value):
+    """One "key": value member exactly as json.dump(obj, indent=2) lays it out."""
+    return "  " + json.dumps(key) + ": " + json.dumps(value, indent=2).replace("\n", "\n  ")
+
+class JsonObjectWriter:
+    """
+    Writes a top-level JSON object one entry at a time, byte-identical to
+    json.dump(obj, f, indent=2). The file appears atomically on close() and
+    its size and sha256 are tracked as it is written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.count = 0
+
+    def _write(self, data):
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+
+    def write_encoded(self, encoded):
+        """Write a member produced by encode_entry(), already utf-8 encoded."""
+        self._write((b"{\n" if self.count == 0 else b",\n") + encoded)
+        self.count += 1
+
+    def write(self, key, value):
+        self.write_encoded(encode_entry(key, value).encode("utf-8"))
+
+    def close(self):
+        self._write(b"\n}" if self.count else b"{}")
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return self.sha256.hexdigest()
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,85 @@
+# storage/summary_cache.py
+import hashlib
+import time
+
+MAX_ENTRIES = 50000  # Least recently used summaries are evicted past this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summary_cache (
+    key            TEXT PRIMARY KEY,
+    content_hash   TEXT NOT NULL,
+    model          TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    summary        TEXT NOT NULL,
+    last_used      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summary_cache_last_used ON summary_cache(last_used);
+"""
+
+def content_hash(text):
+    return hashlib.sha256((text or "").strip().encode("utf-8")).hexdigest()
+
+def cache_key(text_hash, model, prompt_version):
+    return f"{model}:{prompt_version}:{text_hash}"
+
+class SummaryCache:
+    """
+    LLM summaries keyed by (content hash, model, prompt version) and shared across URLs,
+    stored next to the articles in the SQLite store.
+    Safe to share between threads when `conn` comes from article_store.connect():
+    every access runs under that connection's transaction lock, which the
+    article store and any other cache on the same connection also take.
+    """
+
+    def __init__(self, conn, model, prompt_version, max_entries=MAX_ENTRIES):
+        self.conn = conn
+        self.model = model
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        conn.executescript(SCHEMA)
+
+    def key_for(self, text_hash):
+        return cache_key(text_hash, self.model, self.prompt_version)
+
+    def get(self, text_hash):
+        key = self.key_for(text_hash)
+        with self.conn:
+            row = self.conn.execute("SELECT summary FROM summary_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE summary_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, text_hash, summary, replace=True):
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self.conn:
+            self.conn.execute(
+                f"{verb} INTO summary_cache (key, content_hash, model, prompt_version, summary, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key_for(text_hash), text_hash, self.model, self.prompt_version, summary, time.time()),
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries. Returns how many were removed."""
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM summary_cache WHERE key IN "
+                "(SELECT key FROM summary_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        return excess
+
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = (100.0 * self.hits / lookups) if lookups else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self)} entries"
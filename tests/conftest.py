@@ -0,0 +1,27 @@
+import os
+import pytest
+from processors import feed_lookup
+
+FEEDS = {
+    "data/osint.txt": "# OSINT\n185.1.2.3\n10.20.0.0/16\n",
+    "data/ip_blocklist.txt": "203.0.113.5\n198.51.100.10-198.51.100.20\n2001:db8::/32\n",
+    "data/c2.txt": "# ip,date,domain\n192.0.2.66,2025-07-01,c2-panel.example\n",
+    "data/domain_blocklist.txt": "evil-site.com\nbad[.]example\n",
+    "data/md5.txt": "d41d8cd98f00b204e9800998ecf8427e\n",
+    "data/sha.txt": "E3B0C44298FC1C149AFBF4C8996FB92427AE41E4649B934CA495991B7852B855\n",
+    "data/url.txt": "http://evil-site.com/payload.exe\n",
+    "data/bitcoin.txt": "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa\nnot-a-coin\n",
+}
+
+@pytest.fixture
+def feeds(tmp_path, monkeypatch):
+    """A scratch data/ directory with one small file per feed, made the cwd."""
+    for path, text in FEEDS.items():
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        (tmp_path / path).write_text(text)
+    monkeypatch.chdir(tmp_path)
+    feed_lookup._FEED_CACHE.clear()
+    feed_lookup._IP_INDEX_CACHE.update(signature=None, index=None)
+    yield tmp_path
+    feed_lookup._FEED_CACHE.clear()
+    feed_lookup._IP_INDEX_CACHE.update(signature=None, index=None)
@@ -0,0 +1,20 @@
+import json
+from storage import article_store
+
+def test_export_articles_refreshes_one_kind(tmp_path, monkeypatch):
+    monkeypatch.setitem(article_store.ARTICLE_PATHS, "rss", str(tmp_path / "raw_articles.json"))
+    monkeypatch.setitem(article_store.ARTICLE_PATHS, "github", str(tmp_path / "github_articles.json"))
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    article_store.upsert_articles(conn, {"https://a": {"title": "a"}}, "rss")
+    article_store.upsert_articles(conn, {"https://gh/x.yar": {"title": "x.yar"}}, "github")
+
+    article_store.export_articles(conn, "rss")
+    with open(tmp_path / "raw_articles.json") as f:
+        assert json.load(f) == {"https://a": {"title": "a"}}
+    assert not (tmp_path / "github_articles.json").exists()
+
+    article_store.upsert_articles(conn, {"https://b": {"title": "b"}}, "rss")
+    article_store.export_articles(conn, "rss")
+    with open(tmp_path / "raw_articles.json") as f:
+        assert set(json.load(f)) == {"https://a", "https://b"}
+    conn.close()
@@ -0,0 +1,28 @@
+import csv
+from processors.bulk_lookup import RANGE_TYPE, triage_file
+from storage import article_store
+
+def test_triage_file_writes_a_report(feeds):
+    conn = article_store.connect("data/store.db", import_legacy=False)
+    article_store.replace_ioc_articles(conn, {"https://a": {"domain": ["evil-site.com"]}}, {"https://a": "2025-07-01"})
+    (feeds / "input.txt").write_text(
+        "185.1.2.3\n"
+        "Jul 10 deny src=10.20.3.4 dst=8.8.8.8 host=evil-site.com\n"
+        "198.51.100.0/24\n"
+        "# comment\n"
+        "185.1.2.3\n"
+    )
+
+    total, malicious = triage_file("input.txt", "report.csv", conn=conn)
+
+    with open("report.csv", newline="") as f:
+        rows = {row["value"]: row for row in csv.DictReader(f)}
+    assert (total, malicious) == (5, 4)
+    assert rows["185.1.2.3"]["feeds"] == "OSINT Threat Feed"
+    assert rows["10.20.3.4"]["malicious"] == "True"
+    assert rows["8.8.8.8"]["malicious"] == "False"
+    assert rows["evil-site.com"]["feeds"] == "Domain Blocklist"
+    assert rows["evil-site.com"]["articles"] == "https://a"
+    assert rows["198.51.100.0/24"]["type"] == RANGE_TYPE
+    assert rows["198.51.100.0/24"]["feeds"] == "IP Blocklist"
+    conn.close()
@@ -0,0 +1,68 @@
+import pytest
+from dedup_articles import dedup_articles, member_map, repoint
+from processors.dedup import DedupIndex, fingerprint, group_members, normalize_url, similarity
+from storage import article_store
+
+STORY = (
+    "Attackers exploited a zero-day in the VPN appliance to deploy a web shell, "
+    "then moved laterally with stolen credentials before exfiltrating mailbox data "
+    "to a cloud storage bucket controlled by the group over several weeks."
+)
+OTHER = (
+    "The police operation seized servers behind the botnet and arrested two suspects "
+    "accused of renting access to infected routers for credential stuffing campaigns."
+)
+
+def article(title, content=STORY):
+    return {"title": title, "content": content, "source": "https://feed"}
+
+def test_normalize_url_drops_tracking_and_www():
+    assert normalize_url("http://www.Example.com/post/?utm_source=x&b=2&a=1#top") == "https://example.com/post?a=1&b=2"
+
+def test_near_duplicates_share_a_group():
+    index = DedupIndex()
+    index.add("https://a", fingerprint("https://a", article("Zero-day hits VPN")))
+    reworded = fingerprint("https://b", article("Zero-day hits VPN", STORY.replace("several weeks", "a month")))
+    assert similarity(reworded["minhash"], index.signatures["https://a"]) >= 0.7
+    assert index.find(reworded) == ("https://a", "near")
+    assert index.find(fingerprint("https://c", article("Botnet takedown", OTHER))) == (None, None)
+
+def test_exact_and_url_matches():
+    index = DedupIndex()
+    index.add("https://a/post", fingerprint("https://a/post", article("x")))
+    assert index.find(fingerprint("https://a/post/?utm_medium=rss", article("y", OTHER)))[1] == "url"
+    assert index.find(fingerprint("https://mirror", article("x")))[1] == "exact"
+
+def test_repoint_promotes_oldest_member():
+    fingerprints = {url: {"canonical": "https://a"} for url in ("https://a", "https://b", "https://c")}
+    members = member_map(fingerprints)
+    del fingerprints["https://a"]
+    assert repoint(fingerprints, members, "https://a", None) == ["https://b", "https://c"]
+    assert group_members(fingerprints) == {"https://b": ["https://b", "https://c"]}
+    assert members == {"https://b": {"https://c": None}}
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    yield conn
+    conn.close()
+
+def test_incremental_dedup_matches_full(conn):
+    article_store.upsert_articles(conn, {"https://a": article("a"), "https://b": article("b", OTHER)}, "rss")
+    dedup_articles(conn)
+    article_store.upsert_articles(conn, {"https://c": article("c"), "https://d": article("d", OTHER)}, "rss")
+    dedup_articles(conn)
+    incremental = {url: fp["canonical"] for url, fp in article_store.load_fingerprints(conn).items()}
+    assert incremental == {"https://a": "https://a", "https://b": "https://b", "https://c": "https://a", "https://d": "https://b"}
+    dedup_articles(conn, full=True)
+    assert {url: fp["canonical"] for url, fp in article_store.load_fingerprints(conn).items()} == incremental
+
+def test_github_articles_are_not_loaded(conn, monkeypatch):
+    article_store.upsert_articles(conn, {"https://a": article("a")}, "rss")
+    article_store.upsert_articles(conn, {"https://gh/x.txt": article("x")}, "github")
+    loaded = []
+    real_load_all = article_store._load_all
+    monkeypatch.setattr(article_store, "_load_all", lambda *args: loaded.append(args[1:]) or real_load_all(*args))
+    dedup_articles(conn)
+    assert set(article_store.load_fingerprints(conn)) == {"https://a"}
+    assert all("kind" in args[1] for args in loaded if args[0] == "articles")
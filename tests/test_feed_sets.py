@@ -0,0 +1,63 @@
+import hashlib
+import random
+from processors import feed_lookup
+from storage.feed_sets import BLOOM_HASHES, _bloom, _probe_seed, compile_sets, open_compiled
+
+def random_sets(rng, n=2000):
+    return {
+        "domain": {f"host{rng.randrange(10 ** 9)}.example" for _ in range(n)} | {"ünïcode.example", "a"},
+        "hash": {hashlib.md5(str(i).encode()).hexdigest() for i in range(n)}
+                | {hashlib.sha256(str(i).encode()).hexdigest() for i in range(n // 2)} | {"not-hex"},
+        "raw": {"exactly as listed", ""},
+    }
+
+def test_compiled_sets_match_python_sets(tmp_path):
+    rng = random.Random(0)
+    sets = random_sets(rng)
+    path = str(tmp_path / "feed.bin")
+    compile_sets(sets, path, (1, 2))
+    compiled = open_compiled(path, (1, 2)).sets
+
+    for set_type, values in sets.items():
+        for value in values:
+            if value != "not-hex":
+                assert value in compiled[set_type], value
+    assert len(compiled["hash"]) == len(sets["hash"]) - 1
+    assert "not-hex" not in compiled["hash"]
+    assert hashlib.sha1(b"0").hexdigest() not in compiled["hash"]
+    for _ in range(2000):
+        assert f"host{rng.randrange(10 ** 9)}.other" not in compiled["domain"]
+    assert 12345 not in compiled["domain"]
+
+def test_bloom_false_positive_rate():
+    keys = [str(i).encode() for i in range(5000)]
+    bits, data = _bloom(keys, fixed=False)
+
+    def maybe(key):
+        h1, h2 = _probe_seed(key, False)
+        return all(data[(pos := (h1 + i * h2) % bits) >> 3] & (1 << (pos & 7)) for i in range(BLOOM_HASHES))
+
+    assert all(maybe(key) for key in keys)
+    misses = [f"miss-{i}".encode() for i in range(20000)]
+    assert sum(map(maybe, misses)) / len(misses) < 0.03
+
+def test_stale_or_broken_files_are_rejected(tmp_path):
+    path = tmp_path / "feed.bin"
+    assert open_compiled(str(path), (1, 2)) is None
+    compile_sets({"domain": {"evil.com"}}, str(path), (1, 2))
+    assert open_compiled(str(path), (1, 3)) is None
+    path.write_bytes(b"garbage" * 10)
+    assert open_compiled(str(path), (1, 2)) is None
+
+def test_lookup_through_compiled_feeds(feeds):
+    assert feed_lookup.lookup("evil-site[.]com") == ("domain", "evil-site.com", ["Domain Blocklist"])
+    assert feed_lookup.lookup("D41D8CD98F00B204E9800998ECF8427E")[2] == ["MD5 Hash Blocklist"]
+    assert feed_lookup.lookup("c2-panel.example")[2] == ["C2 Hunt Feed"]
+    assert feed_lookup.lookup("10.20.30.40")[2] == ["OSINT Threat Feed"]
+    assert feed_lookup.lookup("not-a-coin") == (None, "not-a-coin", ["Bitcoin Address Intel"])
+    assert (feeds / "data/compiled/domain_blocklist.txt.bin").exists()
+
+    # Editing a feed recompiles it on the next lookup
+    with open("data/domain_blocklist.txt", "a") as f:
+        f.write("new-bad.example\n")
+    assert feed_lookup.lookup("new-bad.example")[2] == ["Domain Blocklist"]
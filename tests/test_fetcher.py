@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("feedparser")
+pytest.importorskip("requests")
+
+from feeds import fetcher
+
+def test_fetch_never_saves_feed_state(monkeypatch):
+    saved = []
+    monkeypatch.setattr(fetcher, "load_feed_urls", lambda: ["https://feed"])
+    monkeypatch.setattr(fetcher, "load_feed_state", lambda: {})
+    monkeypatch.setattr(fetcher, "save_feed_state", saved.append)
+    entries = [{"link": "https://a/?utm_source=rss", "title": "a", "summary": "x"}, {"link": "https://b", "title": "b"}]
+    monkeypatch.setattr(fetcher, "fetch_feed", lambda url, state, timeout: (entries, {"etag": "v2"}))
+
+    state = {}
+    new = fetcher.fetch_new_articles({"https://b/"}, feed_state=state)
+    assert list(new) == ["https://a/?utm_source=rss"]
+    assert state == {"https://feed": {"etag": "v2"}}
+
+    monkeypatch.setattr(fetcher, "load_existing_articles", lambda conn=None: {})
+    fetcher.fetch_articles()
+    assert saved == []
@@ -0,0 +1,83 @@
+import io
+import json
+import time
+import pytest
+
+pytest.importorskip("requests")
+
+import generate_summaries
+from benchmarks.ollama_stub import StubHandler, start_stub, stub_reply
+from processors import summarizer, triage
+from storage import article_store
+
+def test_prose_iocs_are_extracted_once(tmp_path, monkeypatch):
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    article_store.upsert_articles(conn, {
+        "https://a": {"title": "a", "source": "https://feed", "content": "Beacon to 185.1.2.3 observed."},
+    }, "rss")
+
+    calls = []
+    real_extract = triage.extract_iocs
+    monkeypatch.setattr(triage, "extract_iocs", lambda text: calls.append(text) or real_extract(text))
+    monkeypatch.setattr(generate_summaries, "summarize_with_retry", lambda *args, **kwargs: "- summary")
+    generate_summaries.run(conn, workers=1)
+
+    assert len(calls) == 1
+    assert article_store.get_summary(conn, "https://a")["iocs"]["ipv4"] == ["185.1.2.3"]
+    conn.close()
+
+def test_stored_warning_is_not_reused_for_identical_content(tmp_path, monkeypatch):
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    story = {"title": "t", "source": "https://feed", "content": "Same syndicated text about a breach."}
+    article_store.upsert_articles(conn, {"https://a": story, "https://b": dict(story, title="t2")}, "rss")
+    warning = "⚠️ No valid summary generated."
+    article_store.upsert_summary(conn, "https://a", generate_summaries.build_entry(story, "https://a", warning, {}))
+    monkeypatch.setattr(generate_summaries, "summarize_with_retry", lambda *args, **kwargs: "- fresh summary")
+
+    generate_summaries.run(conn, workers=1)
+
+    assert article_store.get_summary(conn, "https://b")["summary"] == "- fresh summary"
+    conn.close()
+
+class ScriptedHandler(StubHandler):
+    """Delays or fails /api/chat replies by the article text they carry."""
+    delays = {}
+    failures = {}
+    served = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        text = json.loads(body)["messages"][-1]["content"]
+        time.sleep(self.delays.get(text, 0))
+        if self.failures.get(text):
+            self.failures[text] -= 1
+            self.send_json(503, {"error": "busy"})
+            return
+        self.rfile = io.BytesIO(body)
+        super().do_POST()
+        self.served.append(text)
+
+@pytest.fixture
+def stub(monkeypatch):
+    ScriptedHandler.delays, ScriptedHandler.failures, ScriptedHandler.served = {}, {}, []
+    server, url = start_stub(handler_class=ScriptedHandler)
+    monkeypatch.setattr(summarizer, "OLLAMA_URL", url)
+    yield ScriptedHandler
+    server.shutdown()
+
+def test_pending_summaries_are_reported_in_order(stub):
+    stub.delays = {"slow first": 0.3}
+    pending = [(f"https://{i}", {"title": text, "content": text}, {})
+               for i, text in enumerate(("slow first", "quick second", "quick third"))]
+    order = []
+
+    generate_summaries.summarize_pending(pending, lambda url, entry: order.append((url, entry["summary"])), workers=3)
+
+    assert stub.served[0] != "slow first"
+    assert order == [(url, stub_reply([{"role": "user", "content": article["content"]}])) for url, article, _ in pending]
+
+def test_failed_request_is_retried(stub):
+    stub.failures = {"flaky": 2}
+    summary = generate_summaries.summarize_with_retry({"title": "t", "content": "flaky"}, "https://a", backoff=0.01)
+    assert summary == "- flaky\n- No content.\n- No content."
+    assert stub.failures == {"flaky": 0}
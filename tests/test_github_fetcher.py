@@ -0,0 +1,70 @@
+import time
+from collections import namedtuple
+import pytest
+
+pytest.importorskip("requests")
+
+from feeds.github_fetcher import BACKOFF_BASE, MAX_BACKOFF, backoff_delay, retry_after_seconds
+
+Response = namedtuple("Response", "status_code headers")
+
+def test_retry_after_seconds_and_http_date():
+    now = 1445412480  # Wed, 21 Oct 2015 07:28:00 GMT
+    assert retry_after_seconds("120") == 120
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:29:30 GMT", now=now) == 90
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:00:00 GMT", now=now) == 1
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+def test_backoff_delay_falls_back_when_retry_after_is_garbage():
+    assert backoff_delay(Response(429, {"Retry-After": "soon"}), 2) == BACKOFF_BASE ** 2
+    reset = str(int(time.time()) + 30)
+    assert 1 <= backoff_delay(Response(403, {"Retry-After": "later", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}), 1) <= 30
+    assert backoff_delay(Response(429, {"Retry-After": "100000"}), 1) == MAX_BACKOFF
+    assert backoff_delay(Response(404, {}), 1) is None
+
+class FakeResponse:
+    def __init__(self, status_code, body=""):
+        self.status_code, self.body, self.headers = status_code, body, {}
+        self.text = body if isinstance(body, str) else ""
+
+    def json(self):
+        return self.body
+
+class FakeSession:
+    """Serves a tree listing and raw files; counts raw downloads."""
+
+    def __init__(self, tree_sha, files):
+        self.tree_sha, self.files, self.downloads = tree_sha, files, []
+
+    def get(self, url, timeout=None):
+        if url.endswith("/git/trees/main"):
+            return FakeResponse(200, {"sha": self.tree_sha})
+        if "?recursive=1" in url:
+            return FakeResponse(200, {"tree": [{"path": p, "type": "blob", "sha": f"sha-{p}"} for p in self.files]})
+        path = url.rsplit("/main/", 1)[1]
+        self.downloads.append(path)
+        return self.files[path]
+
+def test_empty_and_missing_files_do_not_block_the_tree_sha(monkeypatch):
+    from feeds import github_fetcher
+    monkeypatch.setattr(github_fetcher.time, "sleep", lambda seconds: None)
+    files = {"a.txt": FakeResponse(200, "1.2.3.4"), "gone.txt": FakeResponse(404), "blank.txt": FakeResponse(200, "")}
+
+    state, fetched = github_fetcher.sync_repo(FakeSession("t1", files), "o/r", "main", {}, set(), max_workers=1)
+    assert state["tree_sha"] == "t1"
+    assert state["empty"] == ["blank.txt", "gone.txt"]
+    assert list(fetched) == ["https://raw.githubusercontent.com/o/r/main/a.txt"]
+
+    # Another commit that leaves these blobs alone downloads nothing
+    session = FakeSession("t2", files)
+    state, fetched = github_fetcher.sync_repo(session, "o/r", "main", state, set(fetched), max_workers=1)
+    assert (state["tree_sha"], session.downloads, fetched) == ("t2", [], {})
+
+def test_server_errors_leave_the_sync_incomplete(monkeypatch):
+    from feeds import github_fetcher
+    monkeypatch.setattr(github_fetcher.time, "sleep", lambda seconds: None)
+    files = {"a.txt": FakeResponse(200, "x"), "flaky.txt": FakeResponse(503)}
+    state, _ = github_fetcher.sync_repo(FakeSession("t1", files), "o/r", "main", {}, set(), max_workers=1)
+    assert state["tree_sha"] is None
+    assert "flaky.txt" not in state["blobs"]
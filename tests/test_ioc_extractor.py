@@ -0,0 +1,57 @@
+import io
+from processors.ioc_extractor import (
+    IOC_TYPES, classify_indicator, extract_iocs, group_iocs, scan_iocs, scan_iocs_stream,
+)
+
+TEXT = """
+The loader beacons to 185.1.2[.]3 and hxxps://evil-site[.]com/gate.php?id=1), then to
+2001:db8:85a3::8a2e:370:7334. Reports go to ops[at]evil-site.com. Exploits CVE-2024-3400
+via AS13335. Payload MD5 d41d8cd98f00b204e9800998ecf8427e; ransom to 1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa
+or bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq or 0x52908400098527886E0F7030069857D2E4169EE7.
+Not indicators: 999.1.1.1, version 1.2.3.4.5, setup.py, de:ad, 1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb.
+"""
+
+def test_extract_iocs_returns_every_type():
+    iocs = extract_iocs(TEXT)
+    assert set(iocs) == set(IOC_TYPES)
+    assert iocs["ipv4"] == ["185.1.2.3"]
+    assert iocs["url"] == ["https://evil-site.com/gate.php?id=1"]
+    assert iocs["domain"] == ["evil-site.com"]
+    assert iocs["ipv6"] == ["2001:db8:85a3::8a2e:370:7334"]
+    assert iocs["email"] == ["ops@evil-site.com"]
+    assert iocs["cve"] == ["CVE-2024-3400"]
+    assert iocs["asn"] == ["AS13335"]
+    assert iocs["hash"] == ["d41d8cd98f00b204e9800998ecf8427e"]
+    assert iocs["btc"] == ["1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa", "bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq"]
+    assert iocs["eth"] == ["0x52908400098527886e0f7030069857d2e4169ee7"]
+
+def test_empty_text_has_empty_lists():
+    assert extract_iocs("") == {ioc_type: [] for ioc_type in IOC_TYPES}
+
+def test_hash_lengths_are_typed():
+    text = "d41d8cd98f00b204e9800998ecf8427e da39a3ee5e6b4b0d3255bfef95601890afd80709 " + "ab" * 20 + "c"
+    assert [m.type for m in scan_iocs(text)] == ["md5", "sha1"]
+
+def test_offsets_point_at_the_indicator():
+    text = "seen at 8.8.8.8 today"
+    match = next(scan_iocs(text))
+    assert text[match.start:match.end] == "8.8.8.8"
+
+def test_classify_indicator():
+    assert classify_indicator("hxxp://bad[.]example/x") == ("url", "http://bad.example/x")
+    assert classify_indicator(" 010.001.002.003 ") == ("ipv4", "10.1.2.3")
+    assert classify_indicator("E3B0C44298FC1C149AFBF4C8996FB92427AE41E4649B934CA495991B7852B855")[0] == "hash"
+    assert classify_indicator("update.sh") == ("domain", "update.sh")
+    assert classify_indicator("8.8.8.8 and more") == (None, None)
+    assert classify_indicator("hello") == (None, None)
+
+def test_stream_matches_whole_text_across_chunk_boundaries():
+    text = TEXT * 20
+    whole = group_iocs(scan_iocs(text))
+    for chunk_size in (7, 64, 1000):
+        assert group_iocs(scan_iocs_stream(io.StringIO(text), chunk_size)) == whole
+
+def test_newer_gtlds_are_domains_but_file_names_are_not():
+    iocs = extract_iocs("C2 at bwyb.love and vmware.rest, staged via cdn-update.services. Dropped run.exe, Main.java, invoice.zip")
+    assert iocs["domain"] == ["bwyb.love", "vmware.rest", "cdn-update.services"]
+    assert classify_indicator("invoice.zip") == ("domain", "invoice.zip")
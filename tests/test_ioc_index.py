@@ -0,0 +1,88 @@
+import pytest
+from generate_ioc_index import WATERMARK_KEY, generate_ioc_index
+from processors.ioc_extractor import IOC_TYPES
+from processors.ioc_pivot import cluster_articles, pivot
+from storage import article_store
+
+def entry(url, **iocs):
+    return {
+        "title": url,
+        "link": url,
+        "summary": "- bullet",
+        "iocs": {ioc_type: iocs.get(ioc_type, []) for ioc_type in IOC_TYPES},
+        "llm_meta": {"generated_on": "2025-07-01T00:00:00"},
+    }
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    article_store.upsert_articles(conn, {
+        "https://a": {"title": "a", "published": "Thu, 10 Jul 2025 15:24:47 GMT", "content": ""},
+        "https://b": {"title": "b", "published": "2025-07-12T00:00:00Z", "content": ""},
+        "https://c": {"title": "c", "published": "", "content": ""},
+    }, "rss")
+    article_store.upsert_summaries(conn, {
+        "https://a": entry("https://a", ipv4=["1.2.3.4"], domain=["evil.com"]),
+        "https://b": entry("https://b", ipv4=["1.2.3.4"], hash=["d41d8cd98f00b204e9800998ecf8427e"]),
+        "https://c": entry("https://c", domain=["evil.com"]),
+    })
+    yield conn
+    conn.close()
+
+def test_pivot_counts_and_dates(conn):
+    generate_ioc_index(conn=conn)
+    result = pivot(conn, "1.2.3.4")
+    assert result["count"] == 2
+    assert (result["first_seen"], result["last_seen"]) == ("2025-07-10", "2025-07-12")
+    assert [url for url, _ in result["articles"]] == ["https://b", "https://a"]
+    assert pivot(conn, "5.6.7.8") is None
+
+def test_defanged_pivot_is_normalized(conn):
+    generate_ioc_index(conn=conn)
+    assert pivot(conn, "evil[.]com")["count"] == 2
+
+def test_incremental_update_only_touches_changes(conn):
+    generate_ioc_index(conn=conn)
+    watermark = int(article_store.get_meta(conn, WATERMARK_KEY))
+
+    article_store.upsert_summary(conn, "https://a", entry("https://a", ipv4=["9.9.9.9"]))
+    article_store.delete_summary(conn, "https://c")
+    generate_ioc_index(conn=conn)
+
+    assert int(article_store.get_meta(conn, WATERMARK_KEY)) > watermark
+    assert pivot(conn, "1.2.3.4")["count"] == 1
+    assert pivot(conn, "9.9.9.9")["count"] == 1
+    assert pivot(conn, "evil.com") is None
+    assert article_store.get_iocs(conn, "https://c") is None
+
+def test_incremental_matches_full_rebuild(conn):
+    generate_ioc_index(conn=conn)
+    article_store.upsert_summary(conn, "https://b", entry("https://b", domain=["evil.com"]))
+    generate_ioc_index(conn=conn)
+    incremental = conn.execute("SELECT * FROM ioc_articles ORDER BY 1, 2, 3").fetchall()
+    generate_ioc_index(conn=conn, full=True)
+    assert conn.execute("SELECT * FROM ioc_articles ORDER BY 1, 2, 3").fetchall() == incremental
+
+def test_up_to_date_run_is_a_no_op(conn, capsys):
+    generate_ioc_index(conn=conn)
+    generate_ioc_index(conn=conn)
+    assert "already up to date" in capsys.readouterr().out
+
+def test_clusters_link_articles_sharing_indicators(conn):
+    generate_ioc_index(conn=conn)
+    clusters = cluster_articles(conn, ["https://a", "https://b", "https://c"])
+    assert clusters == [(["https://a", "https://b", "https://c"], [("domain", "evil.com"), ("ipv4", "1.2.3.4")])]
+    # The pivoted indicator itself never links a cluster
+    clusters = cluster_articles(conn, ["https://a", "https://b"], exclude={("ipv4", "1.2.3.4")})
+    assert clusters == []
+
+def test_watermarks_track_writes_and_deletes(conn):
+    high = article_store.max_seq(conn, "summaries")
+    article_store.upsert_summary(conn, "https://a", entry("https://a", ipv4=["9.9.9.9"]))
+    article_store.delete_summary(conn, "https://c")
+    changed, deleted, new_high = article_store.changes_since(conn, "summaries", high)
+    assert set(changed) == {"https://a"}
+    assert deleted == {"https://c"}
+    assert new_high == high + 2
+    # Unchanged rows are not rewritten
+    assert article_store.upsert_summary(conn, "https://a", entry("https://a", ipv4=["9.9.9.9"])) == 0
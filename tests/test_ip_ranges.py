@@ -0,0 +1,56 @@
+import ipaddress
+import random
+from processors.ip_ranges import IPRangeIndex, parse_ip_entry
+
+ENTRIES = [
+    ("10.0.0.0/8", "a"),
+    ("10.1.0.0/16", "b"),
+    ("10.1.2.3", "c"),
+    ("192.168.1.10-192.168.1.20", "d"),
+    ("203.0.113.0/24", "a"),
+    ("2001:db8::/32", "e"),
+    ("not an ip", "x"),
+]
+
+def build():
+    index = IPRangeIndex()
+    added = [index.add(value, source) for value, source in ENTRIES]
+    assert added == [True] * 6 + [False]
+    return index.build()
+
+def test_parse_ip_entry_splits_ranges_into_blocks():
+    assert [str(n) for n in parse_ip_entry("192.168.1.10-192.168.1.20")] == [
+        "192.168.1.10/31", "192.168.1.12/30", "192.168.1.16/30", "192.168.1.20/32"]
+    assert parse_ip_entry("10.0.0.1/24") == [ipaddress.ip_network("10.0.0.0/24")]
+    assert parse_ip_entry("example.com") == []
+
+def test_point_queries_most_specific_first():
+    index = build()
+    assert index.contains("10.1.2.3") and index.contains("192.168.1.15") and index.contains("2001:db8::1")
+    assert not index.contains("192.168.1.21") and not index.contains("garbage")
+    assert index.matching("10.1.2.3") == [("10.1.2.3", ["c"]), ("10.1.0.0/16", ["b"]), ("10.0.0.0/8", ["a"])]
+    assert index.longest_prefix("10.9.9.9") == ("10.0.0.0/8", ["a"])
+    assert index.longest_prefix("8.8.8.8") is None
+
+def test_overlapping_finds_subnets_and_supernets():
+    index = build()
+    assert index.overlapping("10.1.2.0/24") == [("10.1.2.3", ["c"]), ("10.1.0.0/16", ["b"]), ("10.0.0.0/8", ["a"])]
+    assert [net for net, _ in index.overlapping("192.168.1.0/28")] == ["192.168.1.10/31", "192.168.1.12/30"]
+    assert index.overlapping("172.16.0.0/12") == []
+
+def test_contains_many_matches_a_linear_scan():
+    index = build()
+    networks = [n for value, _ in ENTRIES for n in parse_ip_entry(value)]
+    rng = random.Random(0)
+    ips = [str(ipaddress.IPv4Address(rng.choice([0x0A000000, 0xC0A80100, 0xCB007100]) + rng.randrange(1 << 17)))
+           for _ in range(500)] + ["2001:db8::5", "2001:db9::5", "bogus"]
+    expected = []
+    for ip in ips:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            expected.append(False)
+            continue
+        expected.append(any(address.version == n.version and address in n for n in networks))
+    assert index.contains_many(ips) == expected
+    assert any(expected) and not all(expected)
@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import pytest
+import merge_github_articles
+from split_github_articles import MANIFEST_FILE, split_json
+from storage.json_stream import JsonObjectWriter, JsonStreamError, file_sha256, iter_json_object
+
+DATA = {
+    "https://a": {"title": "Ünïcode \"quoted\" \\ title", "content": "x" * 5000, "n": 12345, "f": 1.5e3},
+    "https://b": {"list": [1, 2.25, None, True, False, {"k": []}], "neg": -0.001},
+    "https://c": 1234567890,
+    "https://d": {},
+}
+
+def write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1 << 20])
+def test_iter_json_object_round_trip(chunk_size):
+    text = json.dumps(DATA, indent=2)
+    assert dict(iter_json_object(io.StringIO(text), chunk_size)) == DATA
+    assert list(iter_json_object(io.StringIO("{}"), chunk_size)) == []
+
+def test_iter_json_object_rejects_bad_input():
+    with pytest.raises(JsonStreamError):
+        list(iter_json_object(io.StringIO("[1, 2]")))
+    with pytest.raises(JsonStreamError):
+        list(iter_json_object(io.StringIO('{"a": 1, "b": }')))
+
+def test_writer_is_byte_identical_to_json_dump(tmp_path):
+    writer = JsonObjectWriter(str(tmp_path / "out.json"))
+    for key, value in DATA.items():
+        writer.write(key, value)
+    sha256 = writer.close()
+    assert (tmp_path / "out.json").read_text() == json.dumps(DATA, indent=2)
+    assert sha256 == file_sha256(str(tmp_path / "out.json"))
+
+def test_split_then_merge_restores_the_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    write("data/github_articles.json", DATA)
+    original = file_sha256("data/github_articles.json")
+
+    manifest = split_json("data/github_articles.json", "data", 0.005)
+    assert len(manifest["parts"]) > 1
+    os.remove("data/github_articles.json")
+    merge_github_articles.merge_and_cleanup()
+
+    assert file_sha256("data/github_articles.json") == original
+    assert sorted(os.listdir("data")) == ["github_articles.json"]
+
+def test_merge_leaves_tampered_fragments(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    write("data/github_articles.json", DATA)
+    split_json("data/github_articles.json", "data", 0.005)
+    with open("data/github_articles_part_1.json", "a") as f:
+        f.write(" ")
+    with pytest.raises(ValueError):
+        merge_github_articles.merge_and_cleanup()
+    assert os.path.exists(os.path.join("data", MANIFEST_FILE))
+
+def test_loose_parts_merge_like_dict_update(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    parts = [{"a": 1, "b": 1}, {"c": 2, "a": 2}, {"b": 3}]
+    for i, part in enumerate(parts, 1):
+        write(f"data/github_articles_part_{i}.json", part)
+
+    merge_github_articles.merge_and_cleanup()
+
+    expected = {}
+    for part in parts:
+        expected.update(part)
+    with open("data/github_articles.json") as f:
+        merged = json.load(f)
+    assert list(merged.items()) == list(expected.items())
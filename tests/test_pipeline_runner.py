@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import pytest
+from processors.pipeline_runner import PipelineBusy, acquire_lock, release_lock
+
+HOLD_LOCK = (
+    "import sys, time\n"
+    "from processors.pipeline_runner import acquire_lock\n"
+    "acquire_lock(sys.argv[1])\n"
+    "print('locked', flush=True)\n"
+    "time.sleep(60)\n"
+)
+
+def hold_lock(path):
+    """A child process holding the lock at `path`, returned once it has it."""
+    child = subprocess.Popen([sys.executable, "-c", HOLD_LOCK, path], stdout=subprocess.PIPE, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert child.stdout.readline().strip() == "locked"
+    return child
+
+def test_second_acquire_is_busy_until_released(tmp_path):
+    path = str(tmp_path / "pipeline.lock")
+    acquire_lock(path)
+    try:
+        with pytest.raises(PipelineBusy, match=str(os.getpid())):
+            acquire_lock(path)
+    finally:
+        release_lock(path)
+    acquire_lock(path)
+    release_lock(path)
+
+def test_lock_held_by_another_process(tmp_path):
+    path = str(tmp_path / "pipeline.lock")
+    child = hold_lock(path)
+    try:
+        with pytest.raises(PipelineBusy, match=str(child.pid)):
+            acquire_lock(path)
+    finally:
+        child.kill()
+        child.wait()
+        child.stdout.close()
+    # The OS dropped the dead holder's lock: nothing stale to clean up
+    acquire_lock(path)
+    release_lock(path)
+
+def test_leftover_pid_of_a_live_process_does_not_block(tmp_path):
+    # A stale file naming a pid that was reused by an unrelated, running process
+    path = tmp_path / "pipeline.lock"
+    path.write_text(str(os.getppid()))
+    acquire_lock(str(path))
+    assert path.read_text() == str(os.getpid())
+    release_lock(str(path))
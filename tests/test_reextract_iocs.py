@@ -0,0 +1,38 @@
+import os
+import sys
+import pytest
+import reextract_iocs
+from processors.pipeline_runner import acquire_lock, release_lock
+from storage import article_store
+
+def test_only_iocs_change_on_the_current_row(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "store.db")
+    conn = article_store.connect(db_path, import_legacy=False)
+    article_store.upsert_articles(conn, {"https://a": {"title": "a", "source": "https://feed", "content": "Beacon to 185.1.2.3."}}, "rss")
+    article_store.upsert_summary(conn, "https://a", {"title": "a", "summary": "- old", "iocs": {}, "llm_meta": {}})
+    monkeypatch.setattr(article_store, "SUMMARY_PATH", str(tmp_path / "summaries.json"))
+
+    make_shards = reextract_iocs.make_shards
+    def shards_then_concurrent_write(sizes):
+        # Another run rewrites the summary after re-extraction started
+        article_store.upsert_summary(conn, "https://a", {"title": "a", "summary": "- fresh", "iocs": {}, "llm_meta": {"v": 2}})
+        return make_shards(sizes)
+    monkeypatch.setattr(reextract_iocs, "make_shards", shards_then_concurrent_write)
+
+    assert reextract_iocs.reextract_iocs(conn, workers=1, db_path=db_path) == 1
+    entry = article_store.get_summary(conn, "https://a")
+    assert (entry["summary"], entry["llm_meta"]) == ("- fresh", {"v": 2})
+    assert entry["iocs"]["ipv4"] == ["185.1.2.3"]
+    conn.close()
+
+def test_main_exits_while_the_pipeline_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    monkeypatch.setattr(sys, "argv", ["reextract_iocs.py"])
+    monkeypatch.setattr(reextract_iocs, "reextract_iocs", lambda **kwargs: pytest.fail("ran without the lock"))
+    acquire_lock()
+    try:
+        with pytest.raises(SystemExit):
+            reextract_iocs.main()
+    finally:
+        release_lock()
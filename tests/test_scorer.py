@@ -0,0 +1,6 @@
+from processors.ioc_extractor import extract_iocs
+from processors.scorer import calculate_risk_score
+
+def test_url_host_is_not_scored_again_as_a_domain():
+    assert calculate_risk_score(extract_iocs("Payload at hxxp://evil[.]com/x")) == 3
+    assert calculate_risk_score(extract_iocs("Payload at hxxp://evil[.]com/x, C2 at bwyb[.]love")) == 5
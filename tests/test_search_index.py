@@ -0,0 +1,46 @@
+import pytest
+from processors.search_index import SearchIndex
+
+def build():
+    index = SearchIndex()
+    index.add("https://a", "Lazarus targets exchanges", "- crypto theft", {"ipv4": ["185.1.2.3"]}, "2025-07-01")
+    index.add("https://b", "Ransomware hits hospital", "- healthcare outage", {}, "2025-07-03")
+    index.add("https://c", "New loader", "- ransomware dropper", {}, "2025-07-02",
+              [{"name": "Evil Loader", "synonyms": ["EvLoad"]}])
+    return index
+
+def test_prefix_and_and_queries():
+    index = build()
+    assert index.search("ransom")[1] == ["https://b", "https://c"]
+    assert index.search("ransomware dropper") == (1, ["https://c"])
+    assert index.search("185.1.2.3") == (1, ["https://a"])
+    assert index.search("evload") == (1, ["https://c"])
+
+def test_empty_query_orders_by_date():
+    index = build()
+    assert index.search("", "Newest First") == (3, ["https://b", "https://c", "https://a"])
+    assert index.search("", "Oldest First", page=1, per_page=2) == (3, ["https://b"])
+
+def test_remove_and_replace():
+    index = build()
+    index.remove("https://b")
+    index.add("https://c", "Renamed", "- nothing here", {}, "2025-07-02")
+    assert index.search("ransomware") == (0, [])
+    assert len(index) == 2
+
+def test_copy_leaves_original_untouched():
+    index = build()
+    index.search("ransom")
+    clone = index.copy()
+    clone.remove("https://b")
+    clone.add("https://d", "Ransomware cartel", "", {}, "2025-07-04")
+    assert index.search("ransom")[1] == ["https://b", "https://c"]
+    assert clone.search("ransom")[1] == ["https://d", "https://c"]
+
+def test_new_view_does_not_break_sessions_on_the_old_one():
+    ui = pytest.importorskip("ui")
+    entry = lambda title: {"title": title, "summary": "- ransomware", "iocs": {}, "llm_meta": {}}
+    old = ui.build_summary_view({"https://a": entry("A"), "https://b": entry("B")})
+    ui.build_summary_view({"https://a": entry("A"), "https://c": entry("C")}, previous=old)
+    _, _, results = ui.search_page(old, "ransomware", "Most Relevant", 0)
+    assert sorted(url for url, _ in results) == ["https://a", "https://b"]
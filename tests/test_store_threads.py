@@ -0,0 +1,95 @@
+import threading
+import pytest
+from storage import article_store
+from storage.summary_cache import SummaryCache, content_hash
+
+WORKERS = 8
+WRITES = 50
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = article_store.connect(str(tmp_path / "store.db"), import_legacy=False)
+    yield conn
+    conn.close()
+
+def test_concurrent_writers_keep_every_row(conn):
+    caches = [SummaryCache(conn, "model", "p1"), SummaryCache(conn, "model", "chunk-p1")]
+
+    def work(worker):
+        for i in range(WRITES):
+            text = f"{worker}-{i}"
+            article_store.upsert_summary(conn, f"https://{text}", {"summary": text})
+            cache = caches[i % 2]
+            cache.put(content_hash(text), text)
+            assert cache.get(content_hash(text)) == text
+
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(article_store.load_summaries(conn)) == WORKERS * WRITES
+    assert len(caches[0]) == WORKERS * WRITES
+    seqs = [seq for (seq,) in conn.execute("SELECT seq FROM summaries")]
+    assert len(set(seqs)) == len(seqs)
+
+def test_rollback_in_one_thread_keeps_other_threads_writes(conn):
+    cache = SummaryCache(conn, "model", "p1")
+    inside, waiting, done = threading.Event(), threading.Event(), threading.Event()
+
+    def failing_writer():
+        with pytest.raises(RuntimeError):
+            with conn:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('doomed', '1')")
+                inside.set()
+                waiting.wait(5)
+                raise RuntimeError("boom")
+
+    def cache_writer():
+        inside.wait(5)
+        waiting.set()
+        cache.put(content_hash("kept"), "kept")
+        done.set()
+
+    threads = [threading.Thread(target=failing_writer), threading.Thread(target=cache_writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert done.is_set()
+    assert article_store.get_meta(conn, "doomed") is None
+    assert cache.get(content_hash("kept")) == "kept"
+
+def test_two_connections_never_share_a_seq(tmp_path, monkeypatch):
+    path = str(tmp_path / "store.db")
+    conns = [article_store.connect(path, import_legacy=False) for _ in range(2)]
+    # Both writers read max_seq before either writes, unless the first one's lock keeps the second out
+    barrier = threading.Barrier(2)
+    real_max_seq = article_store.max_seq
+
+    def max_seq_then_wait(conn, table):
+        seq = real_max_seq(conn, table)
+        try:
+            barrier.wait(timeout=0.5)
+        except threading.BrokenBarrierError:
+            pass
+        return seq
+    monkeypatch.setattr(article_store, "max_seq", max_seq_then_wait)
+
+    threads = [threading.Thread(target=article_store.upsert_summary, args=(conn, f"https://{i}", {"summary": str(i)}))
+               for i, conn in enumerate(conns)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    monkeypatch.undo()
+
+    seqs = sorted(seq for (seq,) in conns[0].execute("SELECT seq FROM summaries"))
+    assert seqs == [1, 2]
+    # A reader that stopped at seq 1 still gets the other write
+    changed, _, high = article_store.changes_since(conns[0], "summaries", 1)
+    assert len(changed) == 1 and high == 2
+    for conn in conns:
+        conn.close()
@@ -0,0 +1,45 @@
+from processors.triage import ROUTE_LLM, ROUTE_PARSER, ROUTE_TEMPLATE, triage
+
+def article(content, title="Untitled", source="https://blog.talosintelligence.com/rss/"):
+    return {"title": title, "link": "https://example.com/a", "content": content, "source": source}
+
+def test_short_rss_article_goes_to_llm():
+    result = triage(article(
+        "Cisco Talos’ Vulnerability Discovery & Research team recently disclosed two vulnerabilities each in Asus Armoury Crate and Adobe Acrobat products.",
+        title="Asus and Adobe vulnerabilities",
+    ))
+    assert result.route == ROUTE_LLM
+
+def test_empty_rss_article_goes_to_llm():
+    assert triage(article("")).route == ROUTE_LLM
+
+def test_short_github_file_is_skipped():
+    result = triage(article("TODO", title="notes.md", source="github:executemalware/Malware-IOCs"))
+    assert (result.route, result.kind) == (ROUTE_TEMPLATE, "empty")
+
+def test_maltrail_trail_is_templated():
+    result = triage(article("# Reference: x\nevil-domain.com\n1.2.3.4\n", title="evil.txt", source="github:stamparm/maltrail"))
+    assert (result.route, result.kind) == (ROUTE_TEMPLATE, "ioc_dump")
+    assert result.iocs["domain"] == ["evil-domain.com"]
+    assert result.iocs["ipv4"] == ["1.2.3.4"]
+
+def test_indicator_list_is_templated():
+    content = "\n".join(f"10.0.0.{i}" for i in range(1, 30))
+    result = triage(article(content, title="iocs.txt", source="github:executemalware/Malware-IOCs"))
+    assert result.route in (ROUTE_TEMPLATE, ROUTE_PARSER)
+    assert len(result.iocs["ipv4"]) == 29
+
+def test_yara_rule_is_parsed():
+    content = 'rule Evil_Loader : apt\n{\n    meta:\n        description = "test"\n    strings:\n        $a = "evil-domain.com"\n    condition:\n        $a\n}\n'
+    result = triage(article(content, title="evil.yar", source="github:Neo23x0/signature-base"))
+    assert (result.route, result.kind) == (ROUTE_PARSER, "yara")
+    assert any(entity["name"] == "Evil_Loader" for entity in result.entities)
+
+def test_prose_goes_to_llm():
+    content = "Researchers observed a new campaign delivering a loader through phishing emails. " * 10
+    assert triage(article(content)).route == ROUTE_LLM
+
+def test_short_rss_teaser_with_an_indicator_goes_to_llm():
+    result = triage(article("CVE-2024-3400 exploited in wild", source="https://feeds.feedburner.com/TheHackersNews"))
+    assert result.route == ROUTE_LLM
+    assert result.iocs["cve"] == ["CVE-2024-3400"]
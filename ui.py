@@ -4,20 +4,45 @@ import gradio as gr
 from datetime import datetime
 import re
 import tempfile
+import threading
+import html as html_lib
+from processors.ioc_extractor import IOC_TYPES
+from processors.feed_lookup import FEED_FILES, lookup, lookup_range
+from processors.bulk_lookup import triage, write_report
+from processors.search_index import SORT_ORDERS, SearchIndex
+from processors.ioc_pivot import cluster_articles, pivot
+from processors.intel_parsers import ENTITY_LABELS, build_entity_lookup, normalize_name
+from processors.pipeline_runner import PipelineBusy, cancel_pipeline, current_job, format_status, start_pipeline
+from storage import article_store
 
 SUMMARY_PATH = "data/summaries.json"
-IOC_INDEX_PATH = "data/ioc_index.json"
 ITEMS_PER_PAGE = 10
-
-FEED_FILES = {
-    "OSINT Threat Feed": "data/osint.txt",
-    "C2 Hunt Feed": "data/c2.txt",
-    "IP Blocklist": "data/ip_blocklist.txt",
-    "Domain Blocklist": "data/domain_blocklist.txt",
-    "MD5 Hash Blocklist": "data/md5.txt",
-    "URL Blocklist": "data/url.txt",
-    "Bitcoin Address Intel": "data/bitcoin.txt",
-    "SHA File Hash Blocklist": "data/sha.txt"
+BULK_PREVIEW_ROWS = 25
+PIVOT_MAX_ARTICLES = 50
+PIVOT_MAX_CLUSTERS = 10
+PIPELINE_POLL_SECONDS = 2
+PIPELINE_LOG_LINES = 30
+
+ALL_FEEDS = "All Feeds"
+
+# path -> {"signature": (mtime, size), "value": parsed (and post-processed) data}
+_DATA_CACHE = {}
+_DATA_LOCK = threading.Lock()
+# Per-thread connection to the article store, for the IOC and reverse indexes
+_STORE = threading.local()
+
+IOC_LABELS = {
+    "ipv4": "IPv4",
+    "ipv6": "IPv6",
+    "url": "URL",
+    "domain": "Domain",
+    "email": "Email",
+    "hash": "Hash",
+    "cve": "CVE",
+    "btc": "Bitcoin",
+    "eth": "Ethereum",
+    "asn": "ASN",
+    "cidr": "IP Range",
 }
 # ================== Utility Functions ===================
 def load_feed_content_partial(feature_name):
@@ -38,16 +63,67 @@ def load_feed_full(feature_name):
     return f"### Full {feature_name}\n\n```\n{data}\n```"
 
 def check_if_malicious(selected_feed, user_input):
-    path = FEED_FILES.get(selected_feed)
-    if not path or not os.path.exists(path):
-        return "❌ Feed file not found."
-    with open(path, "r") as f:
-        contents = f.read()
-    if user_input.strip() in contents:
-        return f"🚨 `{user_input}` is **Malicious** according to {selected_feed}!"
+    if selected_feed == ALL_FEEDS:
+        feeds = list(FEED_FILES)
+    else:
+        path = FEED_FILES.get(selected_feed)
+        if not path or not os.path.exists(path):
+            return "❌ Feed file not found."
+        feeds = [selected_feed]
+
+    if "/" in (user_input or "") or "-" in (user_input or ""):
+        network, overlaps = lookup_range(user_input, feeds)
+        if network:
+            if not overlaps:
+                return f"✅ Nothing in `{network}` is listed in {selected_feed}."
+            lines = [f"- `{net}` ({', '.join(sources)})" for net, sources in overlaps[:50]]
+            more = f"\n- … and {len(overlaps) - 50} more" if len(overlaps) > 50 else ""
+            return f"🚨 {len(overlaps)} listed IPs/blocks overlap `{network}`:\n" + "\n".join(lines) + more
+
+    ioc_type, value, hits = lookup(user_input or "", feeds)
+    if not value:
+        return "⚠️ Enter an IP, domain, URL, hash, or address to check."
+    label = IOC_LABELS.get(ioc_type, "Unrecognized indicator")
+    if hits:
+        return f"🚨 `{value}` ({label}) is **Malicious** according to {', '.join(hits)}!"
     else:
-        return f"✅ `{user_input}` is **Safe** in {selected_feed}."
-    
+        return f"✅ `{value}` ({label}) is **Safe** in {selected_feed}."
+
+def bulk_check(pasted_text, uploaded_file, report_format, hits_only):
+    if uploaded_file:
+        source = open(getattr(uploaded_file, "name", uploaded_file), "r", errors="replace")
+    elif (pasted_text or "").strip():
+        source = pasted_text.splitlines()
+    else:
+        return "⚠️ Paste indicators or upload a file to triage.", gr.update(visible=False)
+
+    preview = []
+    def keep_preview(rows):
+        for row in rows:
+            if row["malicious"] and len(preview) < BULK_PREVIEW_ROWS:
+                preview.append(row)
+            yield row
+
+    ext = "csv" if report_format == "CSV" else "jsonl"
+    out_path = os.path.join(tempfile.gettempdir(), f"bulk_triage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}")
+    try:
+        with open(out_path, "w", newline="") as out:
+            total, malicious = write_report(keep_preview(triage(source, conn=store())), out, ext, hits_only)
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+
+    summary = f"### 🧾 {total} unique indicators checked, 🚨 {malicious} malicious\n"
+    if preview:
+        summary += "\n| Indicator | Type | Feeds | Articles |\n|---|---|---|---|\n"
+        summary += "\n".join(
+            f"| `{row['indicator']}` | {IOC_LABELS.get(row['type'], row['type'])} | {', '.join(row['feeds'])} | {len(row['articles'])} |"
+            for row in preview
+        )
+        if malicious > len(preview):
+            summary += f"\n\n… {malicious - len(preview)} more in the report."
+    return summary, gr.update(value=out_path, visible=True)
+
 def generate_pagination_html(current_page, total_pages, display_range=5):
     html = "<div style='text-align:center; margin: 10px 0;'>"
     start = max(0, current_page - display_range // 2)
@@ -76,6 +152,30 @@ def load_json(path):
     with open(path, "r") as f:
         return json.load(f)
 
+def load_cached(path, build=None):
+    """
+    Parse `path` once and keep build(data, previous_value) in memory until the
+    file's mtime or size changes. Shared by every session, so page flips never
+    touch the disk.
+    """
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime, stat.st_size)
+    except OSError:
+        signature = None
+    cached = _DATA_CACHE.get(path)
+    if cached and cached["signature"] == signature:
+        return cached["value"]
+
+    with _DATA_LOCK:
+        cached = _DATA_CACHE.get(path)
+        if cached and cached["signature"] == signature:
+            return cached["value"]
+        data = load_json(path) if signature else {}
+        value = build(data, cached["value"] if cached else None) if build else data
+        _DATA_CACHE[path] = {"signature": signature, "value": value}
+        return value
+
 def is_valid_summary(text: str) -> bool:
     if not text.strip():
         return False
@@ -85,22 +185,144 @@ def is_valid_summary(text: str) -> bool:
         or text.strip().startswith("⚠️ Skipped")
     )
 
-def load_summaries():
-    all_summaries = load_json(SUMMARY_PATH)
-    return {
+def build_summary_view(all_summaries, previous=None):
+    """
+    Valid summaries plus their search index. When summaries.json changes a
+    copy of the previous index is updated: only new, changed and removed
+    entries are (re)indexed, and sessions still holding the previous view keep
+    an index that matches its summaries.
+    """
+    summaries = {
         url: entry
         for url, entry in all_summaries.items()
         if is_valid_summary(entry.get("summary", ""))
     }
+    old = previous["summaries"] if previous else {}
+    index = previous["index"].copy() if previous else SearchIndex()
+    for url in old.keys() - summaries.keys():
+        index.remove(url)
+    for url, entry in summaries.items():
+        if old.get(url) != entry:
+            index.add(url, entry["title"], entry["summary"], entry.get("iocs"),
+                      entry.get("llm_meta", {}).get("generated_on", ""), entry.get("entities"))
+    return {
+        "summaries": summaries,
+        "index": index,
+        "by_title": {entry["title"]: url for url, entry in reversed(list(summaries.items()))},
+        "entities": build_entity_lookup(summaries),
+    }
+
+def load_summary_view():
+    return load_cached(SUMMARY_PATH, build_summary_view)
+
+def load_summaries():
+    return load_summary_view()["summaries"]
+
+def store():
+    conn = getattr(_STORE, "conn", None)
+    if conn is None:
+        conn = _STORE.conn = article_store.connect()
+    return conn
+
+class StoreIocIndex:
+    """{url: iocs} read from the store per lookup, so the cards never load the whole index."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self, url, default=None):
+        iocs = article_store.get_iocs(self.conn, url)
+        return default if iocs is None else iocs
 
 def load_ioc_index():
-    return load_json(IOC_INDEX_PATH)
+    return StoreIocIndex(store())
+
+def search_page(view, query, sort_order, page):
+    """(page, total_pages, [(url, entry)]) for one page of search results."""
+    index = view["index"]
+    total, urls = index.search(query, sort_order, max(0, page), ITEMS_PER_PAGE)
+    total_pages = max(1, (total + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+    if page > total_pages - 1 or page < 0:
+        page = max(0, min(page, total_pages - 1))
+        total, urls = index.search(query, sort_order, page, ITEMS_PER_PAGE)
+    return page, total_pages, [(url, view["summaries"][url]) for url in urls]
+
+def pivot_link(value):
+    # Same trick as the pagination buttons: fill the hidden pivot input and click its button
+    js = (
+        "var box = document.querySelector('#pivot_input textarea');"
+        f"box.value = {json.dumps(value)}; box.dispatchEvent(new Event('input'));"
+        "setTimeout(function () { document.querySelector('#pivot_btn').click(); }, 50);"
+    )
+    return f"<a href='javascript:void(0)' onclick=\"{html_lib.escape(js)}\" title='Pivot to related articles'>{html_lib.escape(value)}</a>"
+
+def render_ioc_details(iocs, pivot=False):
+    html = ""
+    for ioc_type in IOC_TYPES:
+        values = iocs.get(ioc_type, [])
+        if values:
+            items = "".join(f"<li>{pivot_link(v) if pivot else v}</li>" for v in values)
+            html += f"<details><summary>{IOC_LABELS[ioc_type]} ({len(values)})</summary><ul>" + items + "</ul></details>"
+    return html
+
+def lookup_entity(name):
+    """Markdown for the threat actors, malware and rules known by `name`, or None."""
+    matches = load_summary_view()["entities"].get(normalize_name(name))
+    if not matches:
+        return None
+    summaries = load_summaries()
+    md = ""
+    for entity, url in matches[:PIVOT_MAX_ARTICLES]:
+        label = ENTITY_LABELS.get(entity["type"], entity["type"])
+        md += f"### 🎯 {entity['name']} ({label})\n"
+        if entity.get("synonyms"):
+            md += f"Also known as: {', '.join(entity['synonyms'])}\n\n"
+        if entity.get("country"):
+            md += f"Country: {entity['country']}\n\n"
+        if entity.get("description"):
+            md += f"{entity['description']}\n\n"
+        md += f"Source: [{summaries.get(url, {}).get('title', url)}]({url})\n\n"
+    return md
+
+def pivot_ioc(value):
+    value = (value or "").strip()
+    if not value:
+        return "⚠️ Enter or click an indicator to pivot on."
+    result = pivot(store(), value)
+    if not result:
+        return lookup_entity(value) or f"✅ `{value}` is not mentioned in any summarized article."
 
-def export_iocs(title, url, ipv4, urls, hashes):
+    summaries = load_summaries()
+    label = IOC_LABELS.get(result["type"], result["type"])
+    md = (
+        f"### 🧭 `{result['value']}` ({label})\n"
+        f"Mentioned in **{result['count']}** articles • first seen {result['first_seen'] or '?'} • last seen {result['last_seen'] or '?'}\n\n"
+    )
+    md += "\n".join(
+        f"- {date} [{summaries.get(url, {}).get('title', url)}]({url})"
+        for url, date in result["articles"][:PIVOT_MAX_ARTICLES]
+    )
+    if result["count"] > PIVOT_MAX_ARTICLES:
+        md += f"\n- … and {result['count'] - PIVOT_MAX_ARTICLES} more"
+
+    clusters = cluster_articles(
+        store(), [url for url, _ in result["articles"]],
+        exclude={(result["type"], result["value"])},
+    )
+    if clusters:
+        md += "\n\n#### 🔗 Clusters sharing other indicators\n"
+        for urls, shared in clusters[:PIVOT_MAX_CLUSTERS]:
+            shared = [v for _, v in shared]
+            titles = ", ".join(summaries.get(url, {}).get("title", url) for url in urls[:5])
+            more = f" +{len(urls) - 5}" if len(urls) > 5 else ""
+            md += f"- **{len(urls)} articles** via `{'`, `'.join(shared[:5])}`: {titles}{more}\n"
+    return md
+
+def export_iocs(title, url, iocs):
     lines = [f"Title: {title}", f"Link: {url}", "", "IOCs:"]
-    if ipv4: lines += ["\nIPv4:"] + ipv4
-    if urls: lines += ["\nURLs:"] + urls
-    if hashes: lines += ["\nHashes:"] + hashes
+    for ioc_type in IOC_TYPES:
+        if iocs.get(ioc_type):
+            lines += [f"\n{IOC_LABELS[ioc_type]}:"] + iocs[ioc_type]
 
     safe_title = re.sub(r"[^a-zA-Z0-9]", "_", title)[:30]
     temp_path = os.path.join(tempfile.gettempdir(), f"ioc_dump_{safe_title}.txt")
@@ -110,19 +332,19 @@ def export_iocs(title, url, ipv4, urls, hashes):
 
 def download_ioc_file(trigger_title):
     print(f"[DEBUG] Trigger title from dropdown: {trigger_title}")
-    summaries = load_summaries()
-    ioc_index = load_ioc_index()
-    for url, entry in summaries.items():
-        if entry["title"] == trigger_title:
-            iocs = ioc_index.get(url, {})
-            print(f"[DEBUG] Found entry. Exporting IOCs for: {entry['title']}")
-            path = export_iocs(entry["title"], url, iocs.get("ipv4", []), iocs.get("url", []), iocs.get("hash", []))
-            if os.path.exists(path):
-                print(f"[INFO] File created at: {path}")
-                return path
-            else:
-                print("[ERROR] File export failed or path missing.")
-                return None
+    view = load_summary_view()
+    url = view["by_title"].get(trigger_title)
+    if url:
+        entry = view["summaries"][url]
+        iocs = load_ioc_index().get(url, {})
+        print(f"[DEBUG] Found entry. Exporting IOCs for: {entry['title']}")
+        path = export_iocs(entry["title"], url, iocs)
+        if os.path.exists(path):
+            print(f"[INFO] File created at: {path}")
+            return path
+        else:
+            print("[ERROR] File export failed or path missing.")
+            return None
     print(f"[WARN] No matching title found for: {trigger_title}")
     return None
 
@@ -130,23 +352,8 @@ def download_ioc_file(trigger_title):
 def get_source_tag(link):
     return "GitHub" if "github" in link else "RSS"
 
-def generate_cards(summaries, ioc_index, query, sort_order, page):
-    if query is None:
-        query = ""
-    if sort_order is None:
-        sort_order = "Newest First"
-    filtered = []
-    for url, entry in summaries.items():
-        combined_text = (entry["title"] + entry["summary"]).lower()
-        if query.lower() in combined_text:
-            filtered.append((url, entry))
-
-    reverse = sort_order == "Newest First"
-    filtered.sort(key=lambda x: x[1]["llm_meta"]["generated_on"], reverse=reverse)
-
-    total_pages = max(1, (len(filtered) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
-    page = max(0, min(page, total_pages - 1))
-    paged = filtered[page * ITEMS_PER_PAGE:(page + 1) * ITEMS_PER_PAGE]
+def generate_cards(view, ioc_index, query, sort_order, page):
+    page, total_pages, paged = search_page(view, query, sort_order, page)
 
     cards = ""
     for url, entry in paged:
@@ -156,17 +363,10 @@ def generate_cards(summaries, ioc_index, query, sort_order, page):
         date = entry["llm_meta"]["generated_on"].split("T")[0]
 
         iocs = ioc_index.get(url, {})
-        ipv4, urls, hashes = iocs.get("ipv4", []), iocs.get("url", []), iocs.get("hash", [])
-        total_iocs = len(ipv4) + len(urls) + len(hashes)
+        total_iocs = sum(len(iocs.get(ioc_type, [])) for ioc_type in IOC_TYPES)
 
         if total_iocs > 0:
-            ioc_details = ""
-            if ipv4:
-                ioc_details += f"<details><summary>IPv4 ({len(ipv4)})</summary><ul>" + "".join(f"<li>{ip}</li>" for ip in ipv4) + "</ul></details>"
-            if urls:
-                ioc_details += f"<details><summary>URL ({len(urls)})</summary><ul>" + "".join(f"<li>{u}</li>" for u in urls) + "</ul></details>"
-            if hashes:
-                ioc_details += f"<details><summary>Hash ({len(hashes)})</summary><ul>" + "".join(f"<li>{h}</li>" for h in hashes) + "</ul></details>"
+            ioc_details = render_ioc_details(iocs, pivot=True)
             ioc_display = f"""
                 <div style='margin-top: 8px; color: limegreen;'>✅ {total_iocs} IOCs Found</div>
                 <details><summary>🔍 View IOCs</summary>{ioc_details}</details>
@@ -175,6 +375,17 @@ def generate_cards(summaries, ioc_index, query, sort_order, page):
         else:
             ioc_display = ""
 
+        # Other outlets carrying the same story (folded into this card by dedup_articles.py)
+        others = [s for s in entry.get("sources", []) if s["link"] != url]
+        if others:
+            links = " • ".join(
+                f"<a href=\"{html_lib.escape(s['link'])}\" target=\"_blank\" style='color: #4faaff;'>{html_lib.escape(s['title'] or s['link'])}</a>"
+                for s in others
+            )
+            sources_display = f"<div style='margin-top: 8px; font-size: 0.9em;'>📰 Also reported in {len(others)} more: {links}</div>"
+        else:
+            sources_display = ""
+
         card = f"""
         <div style='padding: 14px; border-radius: 12px; background: #1f1f1f; margin-bottom: 16px; box-shadow: 0 0 6px rgba(0,0,0,0.4);'>
             <h3>{title}</h3>
@@ -182,6 +393,7 @@ def generate_cards(summaries, ioc_index, query, sort_order, page):
             <div style='margin-top: 1em; white-space: pre-wrap;'>{summary}</div>
 
             {ioc_display}
+            {sources_display}
             <div style='margin-top: 10px;'><a href="{url}" target="_blank" style='color: #4faaff;'>🔗 View Original</a></div>
         </div>
         """
@@ -190,44 +402,44 @@ def generate_cards(summaries, ioc_index, query, sort_order, page):
     pagination = generate_pagination_html(page, total_pages)
     return cards, pagination, page
 
-def get_titles_with_iocs_on_page(summaries, ioc_index, query, sort_order, page):
-    if query is None:
-        query = ""
-    if sort_order is None:
-        sort_order = "Newest First"
-
-    filtered = []
-    for url, entry in summaries.items():
-        combined_text = (entry["title"] + entry["summary"]).lower()
-        if query.lower() in combined_text:
-            filtered.append((url, entry))
-
-    reverse = sort_order == "Newest First"
-    filtered.sort(key=lambda x: x[1]["llm_meta"]["generated_on"], reverse=reverse)
-
-    total_pages = max(1, (len(filtered) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
-    page = max(0, min(page, total_pages - 1))
-    paged = filtered[page * ITEMS_PER_PAGE:(page + 1) * ITEMS_PER_PAGE]
+def get_titles_with_iocs_on_page(view, ioc_index, query, sort_order, page):
+    _, _, paged = search_page(view, query, sort_order, page)
 
     return [entry["title"] for url, entry in paged if ioc_index.get(url)]
 
 
 def update_cards(query, sort_order, page):
-    summaries = load_summaries()
+    view = load_summary_view()
     ioc_index = load_ioc_index()
-    cards_html, pagination_html, new_page = generate_cards(summaries, ioc_index, query, sort_order, page)
-    dropdown_titles = get_titles_with_iocs_on_page(summaries, ioc_index, query, sort_order, new_page)
+    cards_html, pagination_html, new_page = generate_cards(view, ioc_index, query, sort_order, page)
+    dropdown_titles = get_titles_with_iocs_on_page(view, ioc_index, query, sort_order, new_page)
     return cards_html, pagination_html, new_page, gr.update(choices=dropdown_titles)
 
 
 def list_articles_with_iocs():
-    summaries = load_summaries()
-    ioc_index = load_ioc_index()
-    return [entry["title"] for url, entry in summaries.items() if ioc_index.get(url)]
+    with_iocs = article_store.ioc_urls(store())
+    return [entry["title"] for url, entry in load_summaries().items() if url in with_iocs]
+
+def pipeline_status():
+    """(status markdown, recent output) of the running or last pipeline job."""
+    job = current_job()
+    if not job:
+        return "No pipeline run yet.", ""
+    snapshot = job.snapshot()
+    return format_status(snapshot), "\n".join(snapshot["log"][-PIPELINE_LOG_LINES:])
 
 def refresh_pipeline():
-    os.system("python3 feeds/fetcher.py && python3 feeds/github_fetcher.py && python3 generate_summaries.py")
-    return "✅ Pipeline re-run complete."
+    # Returns at once: the stages run in the background and the timer polls their progress
+    try:
+        start_pipeline()
+    except PipelineBusy as e:
+        gr.Warning(str(e))
+    return pipeline_status()
+
+def cancel_refresh():
+    if not cancel_pipeline():
+        gr.Info("No pipeline is running.")
+    return pipeline_status()
 
 
 def build_ui():
@@ -269,17 +481,30 @@ def build_ui():
         # 🔹 IOC Search Tab
         with gr.Tab("🔍 Search IOC in Feed"):
             gr.Markdown("Check if your IP, URL, hash, or domain is malicious")
-            selected_feed = gr.Dropdown(choices=list(FEED_FILES.keys()), label="Select Feed")
+            selected_feed = gr.Dropdown(choices=[ALL_FEEDS] + list(FEED_FILES.keys()), value=ALL_FEEDS, label="Select Feed")
             user_input = gr.Textbox(label="Enter IOC to search (e.g. IP, hash, URL)")
             search_btn = gr.Button("Check Now")
             result = gr.Markdown()
             search_btn.click(check_if_malicious, inputs=[selected_feed, user_input], outputs=result)
 
+        # 🔹 Bulk Triage Tab
+        with gr.Tab("📋 Bulk Triage"):
+            gr.Markdown("Check a whole list or log export against every feed and every article IOC")
+            bulk_text = gr.Textbox(label="Paste indicators (one per line, or raw log lines)", lines=10)
+            bulk_file = gr.File(label="...or upload a file")
+            with gr.Row():
+                bulk_format = gr.Radio(choices=["CSV", "JSON Lines"], value="CSV", label="Report format")
+                bulk_hits_only = gr.Checkbox(label="Only report hits", value=False)
+            bulk_btn = gr.Button("🚨 Triage")
+            bulk_result = gr.Markdown()
+            bulk_report = gr.File(label="Hit Report", interactive=False, visible=False)
+            bulk_btn.click(bulk_check, inputs=[bulk_text, bulk_file, bulk_format, bulk_hits_only], outputs=[bulk_result, bulk_report])
+
         # 🔹 Summary Cards Tab
         with gr.Tab("🧠 AI Summary Cards"):
             with gr.Row():
-                query = gr.Textbox(label="Search", placeholder="Keyword, threat, actor", scale=2)
-                sort = gr.Radio(choices=["Newest First", "Oldest First"], value="Newest First")
+                query = gr.Textbox(label="Search", placeholder="Keyword, threat, actor, IOC", scale=2)
+                sort = gr.Radio(choices=list(SORT_ORDERS), value="Newest First")
             
             html_display = gr.HTML()
             pagination_html = gr.HTML()
@@ -317,6 +542,16 @@ def build_ui():
             prev_btn.click(lambda q, s, p: update_cards(q, s, p - 1), inputs=[query, sort, page_state], outputs=[html_display, pagination_html, page_state, ioc_selector])
             next_btn.click(lambda q, s, p: update_cards(q, s, p + 1), inputs=[query, sort, page_state], outputs=[html_display, pagination_html, page_state, ioc_selector])
 
+            gr.Markdown("---")
+            gr.Markdown("### 🧭 IOC Pivot")
+            gr.Markdown("Click any IOC on a card, or enter one, to list every article that mentions it.")
+            with gr.Row():
+                pivot_input = gr.Textbox(label="Indicator, threat actor or malware", elem_id="pivot_input", scale=3)
+                pivot_btn = gr.Button("🧭 Pivot", elem_id="pivot_btn", scale=1)
+            pivot_output = gr.Markdown()
+            pivot_btn.click(pivot_ioc, inputs=pivot_input, outputs=pivot_output)
+            pivot_input.submit(pivot_ioc, inputs=pivot_input, outputs=pivot_output)
+
             gr.Markdown("---")
             gr.Markdown("### 📥 Download IOCs from a specific article")
 
@@ -359,13 +594,7 @@ def build_ui():
                 summary = summarize_with_gemini(content, url)
                 iocs = extract_iocs(content)
 
-                details_html = ""
-                if iocs["ipv4"]:
-                    details_html += f"<details><summary>IPv4 ({len(iocs['ipv4'])})</summary><ul>" + "".join(f"<li>{ip}</li>" for ip in iocs["ipv4"]) + "</ul></details>"
-                if iocs["url"]:
-                    details_html += f"<details><summary>URL ({len(iocs['url'])})</summary><ul>" + "".join(f"<li>{u}</li>" for u in iocs["url"]) + "</ul></details>"
-                if iocs["hash"]:
-                    details_html += f"<details><summary>Hash ({len(iocs['hash'])})</summary><ul>" + "".join(f"<li>{h}</li>" for h in iocs["hash"]) + "</ul></details>"
+                details_html = render_ioc_details(iocs)
 
                 # Save IOCs to file
                 safe_title = re.sub(r"[^a-zA-Z0-9]", "_", title)[:30]
@@ -386,9 +615,16 @@ def build_ui():
             analyze_btn.click(analyze_link, inputs=[user_article_url], outputs=[output_summary, output_iocs, download_user_ioc])
         # 🔹 Pipeline Refresh Section
         with gr.Accordion("🔁 Refresh Feeds + Re-Summarize", open=False):
-            gr.Markdown("Will re-fetch feeds and re-run summaries using Ollama.")
-            refresh_btn = gr.Button("🚀 Run Pipeline")
-            refresh_btn.click(fn=refresh_pipeline, outputs=[])
+            gr.Markdown("Will re-fetch feeds and re-run summaries using Ollama. Runs in the background; the dashboard stays usable.")
+            with gr.Row():
+                refresh_btn = gr.Button("🚀 Run Pipeline")
+                cancel_btn = gr.Button("🛑 Cancel")
+            pipeline_md = gr.Markdown()
+            pipeline_log = gr.Textbox(label="Output", lines=10, max_lines=PIPELINE_LOG_LINES, interactive=False)
+            refresh_btn.click(fn=refresh_pipeline, outputs=[pipeline_md, pipeline_log])
+            cancel_btn.click(fn=cancel_refresh, outputs=[pipeline_md, pipeline_log])
+            pipeline_timer = gr.Timer(PIPELINE_POLL_SECONDS)
+            pipeline_timer.tick(fn=pipeline_status, outputs=[pipeline_md, pipeline_log])
     return app
 
 